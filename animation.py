@@ -0,0 +1,109 @@
+"""
+    animation.py records what a search or maze generator draws and plays it
+    back against a frame budget.
+
+    The searches and maze generators used to pause with time.sleep after every
+    step, so the time they took grew with the size of the grid. Now they run at
+    full speed and draw into an Animation instead of the screen. Every drawing
+    call is recorded and step() marks the end of one step of the algorithm.
+    play() then draws steps_per_frame steps per frame. If that would take longer
+    than max_duration seconds the animation speeds up, so it always finishes in
+    about max_duration seconds no matter how big the grid is. In instant mode
+    everything is drawn at once.
+"""
+
+import time
+import parameters as param
+
+class Animation:
+    """
+        Init:
+            renderer: the Renderer the recorded drawing is played back on
+            steps_per_frame: the number of steps drawn per frame, can be a
+                fraction (0.5 draws one step every second frame)
+            max_duration: the longest time in seconds the playback may take
+            instant: if true play() draws everything at once
+            events: the recorded drawing calls as (function, arguments) pairs
+            ends: the number of events recorded at the end of each step
+
+        Methods:
+            draw_cell(node, colour): records drawing one cell of the grid
+            draw_rect(colour, rect): records drawing a rectangle given in pixels
+            step(): marks the end of one step
+            play(): draws the recorded steps frame by frame
+    """
+    def __init__(self, renderer, steps_per_frame=1, max_duration=param.MAX_ANIMATION_TIME, \
+        instant=param.INSTANT_ANIMATION):
+        self.renderer = renderer
+        self.steps_per_frame = steps_per_frame
+        self.max_duration = max_duration
+        self.instant = instant
+        self.events = []
+        self.ends = []
+
+    def __len__(self):
+        """
+            Returns the number of steps recorded
+        """
+        return len(self.ends)
+
+    def draw_cell(self, node, colour):
+        """
+            Records drawing the cell at the (x, y) node in the given colour
+        """
+        self.events.append((self.renderer.draw_cell, (node, colour)))
+
+    def draw_rect(self, colour, rect):
+        """
+            Records drawing a rectangle given as [x, y, width, height] in pixels
+        """
+        self.events.append((self.renderer.draw_rect, (colour, rect)))
+
+    def step(self):
+        """
+            Marks the end of a step, the events recorded since the last step
+            are drawn in the same frame
+        """
+        if not self.ends or self.ends[-1] != len(self.events):
+            self.ends.append(len(self.events))
+
+    def draw(self, first, last):
+        """
+            Draws the recorded events from first up to (not including) last
+        """
+        for function, arguments in self.events[first:last]:
+            function(*arguments)
+
+    def play(self):
+        """
+            Draws the recorded steps, steps_per_frame of them every frame. When
+            the steps left cannot be drawn before max_duration runs out at that
+            rate, more steps are drawn per frame. The recording is cleared after
+            it has been played.
+        """
+        self.step()
+        renderer = self.renderer
+        frame_time = 1 / renderer.fps
+        if self.instant or len(self.ends) <= 1:
+            self.draw(0, len(self.events))
+        else:
+            now = time.perf_counter()
+            deadline = now + self.max_duration
+            next_frame = now
+            shown = 0.0     # steps drawn so far, fractions carry over to the next frame
+            while int(shown) < len(self.ends):
+                frames_left = max(1.0, (deadline - time.perf_counter()) / frame_time)
+                rate = max(self.steps_per_frame, (len(self.ends) - shown) / frames_left)
+                first = self.ends[int(shown) - 1] if int(shown) else 0
+                shown = min(shown + rate, len(self.ends))
+                if int(shown):
+                    self.draw(first, self.ends[int(shown) - 1])
+                renderer.flush(force=True)
+
+                next_frame += frame_time
+                pause = next_frame - time.perf_counter()
+                if pause > 0:
+                    time.sleep(pause)
+        renderer.flush(force=True)
+        self.events = []
+        self.ends = []
@@ -0,0 +1,173 @@
+"""
+    batch.py answers many source/target queries on the same map.
+
+    The searches keep their state in the arrays of a GridMap, so two searches
+    cannot run on the same map at the same time. solve_batch gives every worker
+    process its own GridMap instead. The wall layout is published once in
+    shared memory (see sharedgrid.py) with its neighbour masks, and every
+    worker searches over read-only views of them, so the map is never copied
+    into the workers and the masks are built only once. Only
+    the (source, target, algorithm) queries and the results are passed
+    between the processes.
+    The queries are split into a few chunks per worker so the workers stay
+    busy even when some queries take much longer than others.
+    Queries whose source and target lie in different regions of the map (see
+    components.py) have no path. They are answered at once and never reach
+    the workers. A query asked several times is only searched once, and
+    with a pathcache.PathCache the results of earlier batches (or of the
+    visualizer) are reused while the walls stay the same.
+
+    Example:
+        import gridmap as gm
+        import batch
+
+        gridmap = gm.GridMap(100, 100)
+        queries = [((0, 0), (99, 99), 'astar'), ((5, 5), (50, 80), 'jps')]
+        for result in batch.solve_batch(gridmap, queries):
+            print(result.distance, result.expanded)
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+import gridmap as gm
+import sharedgrid
+import components
+import search
+
+CHUNKS_PER_WORKER = 4       # chunks of queries handed to each worker
+MIN_PARALLEL_QUERIES = 64   # smaller batches are answered in this process
+
+_worker_grid = None         # the SharedGrid the current worker process attached to
+_worker_map = None          # the GridMap of the current worker process
+
+def copy_map(gridmap):
+    """
+        Returns a new GridMap with the same cells, costs and moves as gridmap
+        and no search state
+    """
+    copy = gm.GridMap(gridmap.width, gridmap.height)
+    copy.cells[:] = gridmap.cells
+    if gridmap.weighted():
+        copy.costs[:] = gridmap.costs
+    copy.set_connectivity(*gridmap.movement())
+    return copy
+
+def _init_worker(handle):
+    """
+        Runs once in every worker process and builds its GridMap over the
+        shared cells and neighbour masks, with the moves of the published map
+    """
+    global _worker_grid, _worker_map
+    _worker_grid = sharedgrid.SharedGrid.attach(handle)
+    _worker_map = _worker_grid.gridmap()
+
+def _solve(gridmap, queries):
+    """
+        Answers a list of (source, target, algorithm) queries on gridmap
+    """
+    return [search.find(gridmap, source, target, algorithm) \
+        for source, target, algorithm in queries]
+
+def _solve_chunk(queries):
+    """
+        Answers a chunk of queries on the GridMap of the worker process
+    """
+    return _solve(_worker_map, queries)
+
+def normalise(queries, algorithm='astar'):
+    """
+        Returns the queries as a list of (source, target, algorithm) tuples.
+        Queries given as (source, target) use the default algorithm.
+
+        Raises ValueError for an unknown algorithm before any search is run
+    """
+    normalised = []
+    for query in queries:
+        if len(query) == 2:
+            query = (query[0], query[1], algorithm)
+        source, target, name = query
+        if name not in search.ALGORITHMS:
+            raise ValueError('Unknown algorithm: {}'.format(name))
+        normalised.append((tuple(source), tuple(target), name))
+    return normalised
+
+def solve_batch(grid, queries, workers=None, algorithm='astar', regions=None, cache=None):
+    """
+        Answers a list of (source, target, algorithm) queries on the grid (a
+        GridMap or a grid.Grid). The grid itself is not changed.
+
+        regions is a components.Components of the map. The regions of a
+        grid.Grid are used when it is not given, otherwise they are labelled
+        here. Queries without a path get an empty SearchResult.
+
+        cache is a pathcache.PathCache of the map, by default the cache of a
+        grid.Grid. Cached results are returned as they are and new ones are
+        stored in it.
+
+        The queries are shared between worker processes (os.cpu_count() by
+        default). With one worker, or fewer than MIN_PARALLEL_QUERIES queries,
+        they are answered in this process.
+
+        Returns a list with the SearchResult of each query, in the same order
+        as the queries
+    """
+    gridmap = getattr(grid, 'map', grid)
+    queries = normalise(queries, algorithm)
+    if regions is None:
+        regions = getattr(grid, 'regions', None) or components.Components(gridmap)
+    regions.update()
+    results = [None] * len(queries)
+    reachable = []
+    for number, (source, target, _) in enumerate(queries):
+        region = regions.component(source)
+        if region is not None and region == regions.component(target):
+            reachable.append(number)
+        else:
+            results[number] = search.SearchResult()
+
+    if cache is None:
+        cache = getattr(grid, 'paths', None)
+    if cache is not None:
+        cache.refresh()
+    pending = {}        # query -> the numbers of the queries asking it
+    for number in reachable:
+        query = queries[number]
+        if cache is not None and query not in pending:
+            result = cache.lookup(cache.key(*query))
+            if result is not None:
+                results[number] = result
+                continue
+        pending.setdefault(query, []).append(number)
+
+    unique = list(pending)
+    for query, result in zip(unique, _solve_all(gridmap, unique, workers)):
+        for number in pending[query]:
+            results[number] = result
+        if cache is not None:
+            cache.store(cache.key(*query), result)
+    return results
+
+def _solve_all(gridmap, queries, workers):
+    """
+        Answers the queries with up to workers processes
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, max(1, len(queries) // MIN_PARALLEL_QUERIES))
+    if workers <= 1:
+        return _solve(copy_map(gridmap), queries)
+
+    size = -(-len(queries) // (workers * CHUNKS_PER_WORKER))     # ceiling division
+    chunks = [queries[first:first + size] for first in range(0, len(queries), size)]
+    results = []
+    extras = {'costs': gridmap.costs} if gridmap.weighted() else None
+    shared = sharedgrid.SharedGrid(gridmap, extras)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, \
+            initargs=(shared.handle(),)) as executor:
+            for chunk in executor.map(_solve_chunk, chunks):
+                results.extend(chunk)
+    finally:
+        shared.close()
+        shared.unlink()
+    return results
@@ -0,0 +1,150 @@
+"""
+    Benchmarks the priority queues used by the searches.
+
+    Five queues are compared on the same workload:
+        MinHeap: the original binary heap, priorities are never updated
+            so a node is inserted again every time its priority improves
+        IndexedMinHeap: binary heap with a position map and a real decrease_key
+        heapq: the standard library heap with lazy deletion (stale entries
+            are skipped when they are popped)
+        LazyHeap: the same heapq wrapped with the interface of IndexedMinHeap,
+            the default frontier of dijkstra and astar
+        BucketQueue: Dial's bucket queue from bucketqueue.py
+
+    The workload is the open set of Dijkstra on a random grid, recorded as a list
+    of push/decrease/pop operations so every queue does exactly the same work.
+
+    Run with
+        python3 bench_heap.py [grid size] [repeats]
+"""
+
+import sys
+import time
+import heapq
+import random
+import minheap as minh
+import bucketqueue as bq
+import gridmap as gm
+
+def record_operations(gridmap, source):
+    """
+        Runs Dijkstra with a reference queue and records the sequence of queue
+        operations as ('push', item, priority) and ('pop',) tuples. A push of an
+        item that is already queued is a decrease-key.
+    """
+    operations = []
+    distance = {source: 0}
+    done = set()
+    queue = [(0, source)]
+    operations.append(('push', source, 0))
+    while queue:
+        dist, current = heapq.heappop(queue)
+        if current in done:
+            continue
+        done.add(current)
+        operations.append(('pop',))
+        for neighbour in gridmap.neighbours(current):
+            # moves get a pseudo random cost so some priorities are decreased
+            cost = 1 + (current * 7 + neighbour * 13) % 5
+            if neighbour not in done and dist + cost < distance.get(neighbour, gm.INF):
+                distance[neighbour] = dist + cost
+                heapq.heappush(queue, (dist + cost, neighbour))
+                operations.append(('push', neighbour, dist + cost))
+    return operations
+
+def run_minheap(operations):
+    """
+        Original MinHeap: every push is an insert and stale entries are skipped
+    """
+    queue = minh.MinHeap()
+    done = set()
+    for operation in operations:
+        if operation[0] == 'push':
+            queue.insert((operation[2], operation[1]))
+        else:
+            while True:
+                item = queue.extract_min()[1]
+                if item not in done:
+                    done.add(item)
+                    break
+
+def run_indexed(operations):
+    """
+        IndexedMinHeap: a push of a queued item lowers its priority in place
+    """
+    queue = minh.IndexedMinHeap()
+    for operation in operations:
+        if operation[0] == 'push':
+            queue.push(operation[1], operation[2])
+        else:
+            queue.extract_min()
+
+def run_lazy(operations):
+    """
+        LazyHeap: a push of a queued item pushes a new entry, the old one is skipped later
+    """
+    queue = minh.LazyHeap()
+    for operation in operations:
+        if operation[0] == 'push':
+            queue.push(operation[1], operation[2])
+        else:
+            queue.extract_min()
+
+def run_buckets(operations):
+    """
+        BucketQueue: one bucket per priority in the range of the move costs (1 to 5)
+    """
+    queue = bq.BucketQueue(5)
+    for operation in operations:
+        if operation[0] == 'push':
+            queue.push(operation[1], operation[2])
+        else:
+            queue.extract_min()
+
+def run_heapq(operations):
+    """
+        heapq with lazy deletion: every push is an insert and stale entries are skipped
+    """
+    queue = []
+    done = set()
+    for operation in operations:
+        if operation[0] == 'push':
+            heapq.heappush(queue, (operation[2], operation[1]))
+        else:
+            while True:
+                item = heapq.heappop(queue)[1]
+                if item not in done:
+                    done.add(item)
+                    break
+
+def main():
+    """
+        Times each queue on the recorded workload and prints the results
+    """
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    random.seed(0)
+    gridmap = gm.GridMap(size, size)
+    for index in range(gridmap.size):
+        if random.random() <= 0.2:
+            gridmap.cells[index] = gm.WALL
+    gridmap.cells[0] = gm.EMPTY
+    operations = record_operations(gridmap, 0)
+    pushes = sum(1 for operation in operations if operation[0] == 'push')
+    pops = len(operations) - pushes
+    print('{}x{} grid: {} pushes, {} pops'.format(size, size, pushes, pops))
+
+    for name, run in (('MinHeap', run_minheap), ('IndexedMinHeap', run_indexed), \
+        ('heapq (lazy deletion)', run_heapq), ('LazyHeap', run_lazy), \
+        ('BucketQueue', run_buckets)):
+        best = None
+        for _ in range(repeats):
+            start = time.perf_counter()
+            run(operations)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        print('{:<24}{:>10.4f} s'.format(name, best))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,233 @@
+"""
+    Runs MovingAI benchmark scenarios against the search algorithms.
+
+    Every query of every scenario file is answered by each algorithm and one
+    row is reported per query and algorithm:
+        map, query, bucket: the map, the number of the query and its bucket
+        algorithm: the name of the algorithm in search.ALGORITHMS, 'alt' for
+            astar with the landmark heuristic (see --landmarks) or 'hpa' for
+            hierarchical path-finding (see --cluster-size)
+        source_x, source_y, target_x, target_y: the endpoints of the query
+        time_ms: the wall time of the search in milliseconds (best of repeats)
+        expanded, opened: the statistics of the SearchResult
+        generated, pushes, pops, decreased: the counters of its SearchStats
+        peak_frontier: the largest number of nodes in the open set at once
+        length: the length of the path found, -1 if none was found
+        cost: the cost of the path found in straight moves, the same as
+            length on a 4-connected map
+        optimal: the cost of the cheapest path (found with bfs, or with
+            dijkstra on an 8-connected map)
+        gap: (cost - optimal) / optimal, empty if no path was found
+        octile_optimal: the 8-connected optimal length given by the scenario
+
+    With --connectivity 8 the maps are 8-connected (see
+    GridMap.set_connectivity). The MovingAI optimal lengths count a diagonal
+    move as sqrt(2) and do not cut corners, so with --diagonal exact the cost
+    of the optimal searches matches octile_optimal.
+
+    An algorithm that does not support the moves of a map (jps, hpa and the
+    bidirectional searches need a 4-connected map) raises ValueError; it is
+    skipped on that map with a note on standard error and has no rows.
+
+    The sample maps in misc/benchmarks are run when no scenario files are
+    given, so the benchmark works offline. The rows are written as CSV or JSON.
+
+    Run with
+        python3 benchmark.py [scenario files] [--algorithms dijkstra,astar]
+            [--format csv|json] [--output file] [--repeats n] [--limit n]
+            [--landmarks n] [--cluster-size n] [--connectivity 4|8]
+            [--diagonal integer|exact] [--corner-cutting]
+"""
+
+import os
+import sys
+import csv
+import glob
+import json
+import time
+import argparse
+import movingai
+import gridmap as gm
+import landmarks as lm
+import hpa
+import search
+
+ALGORITHMS = ('dijkstra', 'astar', 'greedy', 'bfs', 'dfs')
+SAMPLES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'misc', 'benchmarks')
+FIELDS = ('map', 'query', 'bucket', 'algorithm', 'source_x', 'source_y', 'target_x', \
+    'target_y', 'time_ms', 'expanded', 'opened', 'generated', 'pushes', 'pops', 'decreased', \
+    'peak_frontier', 'length', 'cost', 'optimal', 'gap', 'octile_optimal')
+
+def run_query(gridmap, scenario, algorithm, repeats=1, **options):
+    """
+        Answers one scenario with one algorithm, the options are passed to
+        the algorithm. algorithm can also be an hpa.Hierarchy of the map.
+
+        Returns the SearchResult and the best time in seconds
+    """
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        if isinstance(algorithm, hpa.Hierarchy):
+            result = algorithm.find(scenario.source, scenario.target)
+            if result.found():
+                result.cost = search.path_cost(gridmap, result.path)
+        else:
+            result = search.find(gridmap, scenario.source, scenario.target, algorithm, \
+                **options)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+def run_scenarios(path, algorithms=ALGORITHMS, repeats=1, limit=None, landmarks=8, \
+    cluster_size=hpa.CLUSTER_SIZE, movement=(4,)):
+    """
+        Runs every query of the scenario file at path (the first limit
+        queries if limit is given) against each algorithm. The 'alt' rows use
+        that many landmarks per map and the 'hpa' rows clusters of cluster_size
+        cells, both are prepared once before the first query of the map. The
+        maps are given the moves of movement, the arguments of
+        GridMap.set_connectivity. An algorithm that raises ValueError on a
+        map is reported on standard error and skipped for the rest of it.
+
+        Returns the list of rows, one dictionary per query and algorithm
+    """
+    rows = []
+    maps = {}
+    alts = {}
+    hierarchies = {}
+    unsupported = set()     # (map path, algorithm) pairs that raised ValueError
+    for number, scenario in enumerate(movingai.load_scenarios(path)[:limit]):
+        map_path = movingai.scenario_map_path(path, scenario.map_name)
+        if map_path not in maps:
+            maps[map_path] = movingai.load_map(map_path)
+            maps[map_path].set_connectivity(*movement)
+        gridmap = maps[map_path]
+        if gridmap.connectivity == 8:
+            optimal = search.dijkstra(gridmap, scenario.source, scenario.target).cost
+        else:
+            optimal = search.bfs(gridmap, scenario.source, scenario.target).distance
+
+        for algorithm in algorithms:
+            if (map_path, algorithm) in unsupported:
+                continue
+            try:
+                if algorithm == 'alt':
+                    if map_path not in alts:
+                        alts[map_path] = lm.Landmarks(gridmap, landmarks)
+                    result, elapsed = run_query(gridmap, scenario, 'astar', repeats, \
+                        heuristic=alts[map_path])
+                elif algorithm == 'hpa':
+                    if map_path not in hierarchies:
+                        hierarchies[map_path] = hpa.Hierarchy(gridmap, cluster_size)
+                    result, elapsed = run_query(gridmap, scenario, hierarchies[map_path], \
+                        repeats)
+                else:
+                    result, elapsed = run_query(gridmap, scenario, algorithm, repeats)
+            except ValueError as error:
+                unsupported.add((map_path, algorithm))
+                print('skipping {} on {}: {}'.format(algorithm, os.path.basename(map_path), \
+                    error), file=sys.stderr)
+                continue
+            stats = result.stats
+            gap = None
+            if result.found() and optimal > 0:
+                gap = (result.cost - optimal) / optimal
+            elif result.found():
+                gap = 0.0
+            rows.append({
+                'map': os.path.basename(map_path),
+                'query': number,
+                'bucket': scenario.bucket,
+                'algorithm': algorithm,
+                'source_x': scenario.source[0],
+                'source_y': scenario.source[1],
+                'target_x': scenario.target[0],
+                'target_y': scenario.target[1],
+                'time_ms': round(elapsed * 1000, 4),
+                'expanded': result.expanded,
+                'opened': result.opened,
+                'generated': stats.generated,
+                'pushes': stats.pushes,
+                'pops': stats.pops,
+                'decreased': stats.decreased,
+                'peak_frontier': stats.peak_open,
+                'length': result.distance,
+                'cost': round(result.cost, 4),
+                'optimal': optimal,
+                'gap': None if gap is None else round(gap, 4),
+                'octile_optimal': scenario.optimal,
+            })
+    return rows
+
+def write_rows(rows, file, output_format='csv'):
+    """
+        Writes the rows to an open file as CSV or JSON
+    """
+    if output_format == 'json':
+        json.dump(rows, file, indent=1)
+        file.write('\n')
+    else:
+        writer = csv.DictWriter(file, fieldnames=FIELDS, lineterminator='\n')
+        writer.writeheader()
+        writer.writerows(rows)
+
+def summarize(rows):
+    """
+        Returns a short text summary with the total time, nodes expanded and
+        mean gap of each algorithm
+    """
+    lines = ['{:<24}{:>12}{:>12}{:>10}'.format('algorithm', 'time (ms)', 'expanded', 'mean gap')]
+    for algorithm in dict.fromkeys(row['algorithm'] for row in rows):
+        chosen = [row for row in rows if row['algorithm'] == algorithm]
+        gaps = [row['gap'] for row in chosen if row['gap'] is not None]
+        lines.append('{:<24}{:>12.2f}{:>12}{:>10.4f}'.format(algorithm, \
+            sum(row['time_ms'] for row in chosen), sum(row['expanded'] for row in chosen), \
+            sum(gaps) / len(gaps) if gaps else 0.0))
+    return '\n'.join(lines)
+
+def main():
+    """
+        Runs the scenario files named on the command line and writes the rows
+    """
+    parser = argparse.ArgumentParser(description='Runs MovingAI scenarios against the searches')
+    parser.add_argument('scenarios', nargs='*', \
+        help='.scen files, the samples in misc/benchmarks by default')
+    parser.add_argument('--algorithms', default=','.join(ALGORITHMS), \
+        help='comma separated algorithms from search.ALGORITHMS, alt or hpa')
+    parser.add_argument('--format', dest='output_format', choices=('csv', 'json'), default='csv')
+    parser.add_argument('--output', help='file to write the rows to, standard output by default')
+    parser.add_argument('--repeats', type=int, default=1, help='times each search is timed')
+    parser.add_argument('--limit', type=int, help='only run the first queries of each file')
+    parser.add_argument('--landmarks', type=int, default=8, help='landmarks of the alt rows')
+    parser.add_argument('--cluster-size', type=int, default=hpa.CLUSTER_SIZE, \
+        help='cluster side of the hpa rows')
+    parser.add_argument('--connectivity', type=int, choices=gm.CONNECTIVITY, default=4, \
+        help='neighbours of a cell')
+    parser.add_argument('--diagonal', choices=sorted(gm.DIAGONAL_COSTS), default='integer', \
+        help='costs of the moves of an 8-connected map')
+    parser.add_argument('--corner-cutting', action='store_true', \
+        help='allow diagonal moves past one wall')
+    args = parser.parse_args()
+
+    algorithms = args.algorithms.split(',')
+    for algorithm in algorithms:
+        if algorithm not in search.ALGORITHMS and algorithm not in ('alt', 'hpa'):
+            parser.error('unknown algorithm: {}'.format(algorithm))
+    paths = args.scenarios or sorted(glob.glob(os.path.join(SAMPLES, '*.scen')))
+
+    rows = []
+    for path in paths:
+        rows.extend(run_scenarios(path, algorithms, args.repeats, args.limit, \
+            args.landmarks, args.cluster_size, \
+            (args.connectivity, args.diagonal, args.corner_cutting)))
+
+    if args.output:
+        with open(args.output, 'w', newline='', encoding='utf-8') as file:
+            write_rows(rows, file, args.output_format)
+    else:
+        write_rows(rows, sys.stdout, args.output_format)
+    print(summarize(rows), file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
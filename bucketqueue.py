@@ -0,0 +1,199 @@
+"""
+    Bucket based priority queues for grids with small integer move costs.
+
+    When every move costs an integer between 1 and C, the priorities popped by
+    Dijkstra never decrease and every queued priority lies within C of the
+    smallest one. The queue can then be a ring of C + 1 buckets (lists) indexed
+    by priority, which makes insert, decrease_key and extract_min O(1) instead
+    of the O(log n) of a binary heap (Dial's algorithm).
+
+    A* with a consistent heuristic also pops non-decreasing fscores. On a grid
+    with unit moves and the Manhattan heuristic a neighbour's fscore is either
+    the same as the current node's fscore or 2 larger, so two buckets are enough.
+
+    Both queues have the same interface as minheap.IndexedMinHeap. decrease_key
+    is lazy: the item is appended to its new bucket and the old entry is
+    skipped when it is reached.
+"""
+
+class BucketQueue:
+    """
+    Init:
+        buckets: ring of max_cost + 1 lists, priority p is stored in bucket p % len(buckets)
+        priorities: maps each queued item to its current priority
+        current: the smallest priority that can still be in the queue
+
+    Methods:
+        Constructor(max_cost) - initializes an empty queue for moves costing at most max_cost
+        insert(item, priority) - inserts item into the queue with the given priority
+        decrease_key(item, priority) - lowers the priority of an item in the queue
+        push(item, priority) - inserts the item or lowers its priority if already queued
+        priority(item) - returns the current priority of an item in the queue
+        extract_min() - returns the (priority, item) pair with minimum priority and removes it
+    """
+    def __init__(self, max_cost=1):
+        self.buckets = [[] for _ in range(max_cost + 1)]
+        self.priorities = {}
+        self.current = 0
+
+    def __len__(self):
+        """
+            Returns the number of items in the queue (stale entries are not counted)
+        """
+        return len(self.priorities)
+
+    def __contains__(self, item):
+        """
+            Returns true if the item is currently in the queue
+        """
+        return item in self.priorities
+
+    def insert(self, item, priority):
+        """
+            Inserts an item that is not in the queue yet. The priority must be
+            between the last extracted priority and that priority plus max_cost
+        """
+        if not self.current <= priority < self.current + len(self.buckets):
+            if self.priorities:
+                raise ValueError('priority {} is outside the range of the buckets'.format(priority))
+            # the queue is empty so the ring can start again at any priority
+            self.current = priority
+        self.priorities[item] = priority
+        self.buckets[priority % len(self.buckets)].append(item)
+
+    def decrease_key(self, item, priority):
+        """
+            Lowers the priority of an item that is already in the queue
+        """
+        if priority < self.priorities[item]:
+            del self.priorities[item]
+            self.insert(item, priority)
+
+    def push(self, item, priority):
+        """
+            Inserts the item if it is not in the queue, otherwise lowers its
+            priority if the new priority is smaller
+        """
+        if item in self.priorities:
+            self.decrease_key(item, priority)
+        else:
+            self.insert(item, priority)
+
+    def priority(self, item):
+        """
+            Returns the priority an item currently has in the queue
+        """
+        return self.priorities[item]
+
+    def extract_min(self):
+        """
+            returns the (priority, item) pair with minimum priority and removes
+            it from the queue. Entries left behind by decrease_key are skipped.
+        """
+        buckets = self.buckets
+        priorities = self.priorities
+        while True:
+            bucket = buckets[self.current % len(buckets)]
+            while bucket:
+                item = bucket.pop()
+                if priorities.get(item) == self.current:
+                    del priorities[item]
+                    return (self.current, item)
+            self.current += 1
+
+class TwoBucketQueue:
+    """
+    Init:
+        step: the difference between the fscores of the two buckets
+        current: list of items with the smallest fscore
+        following: list of items with fscore current_priority + step
+        current_priority: the fscore of the items in the current bucket
+        priorities: maps each queued item to its current fscore
+
+    Methods:
+        Constructor(step) - initializes an empty queue
+        insert(item, priority) - inserts item into the queue with the given fscore
+        decrease_key(item, priority) - lowers the fscore of an item in the queue
+        push(item, priority) - inserts the item or lowers its fscore if already queued
+        priority(item) - returns the current fscore of an item in the queue
+        extract_min() - returns the (fscore, item) pair with minimum fscore and removes it
+    """
+    def __init__(self, step=2):
+        self.step = step
+        self.current = []
+        self.following = []
+        self.current_priority = 0
+        self.priorities = {}
+
+    def __len__(self):
+        """
+            Returns the number of items in the queue (stale entries are not counted)
+        """
+        return len(self.priorities)
+
+    def __contains__(self, item):
+        """
+            Returns true if the item is currently in the queue
+        """
+        return item in self.priorities
+
+    def insert(self, item, priority):
+        """
+            Inserts an item that is not in the queue yet. The fscore must be
+            equal to the current fscore or the current fscore plus step.
+
+            Items with the same fscore are popped last in, first out, which
+            favours the deeper nodes and breaks ties towards the target
+        """
+        if not self.priorities and \
+            priority not in (self.current_priority, self.current_priority + self.step):
+            # the queue is empty so the buckets can start again at any fscore
+            self.current, self.following = [], []
+            self.current_priority = priority
+        if priority == self.current_priority:
+            self.current.append(item)
+        elif priority == self.current_priority + self.step:
+            self.following.append(item)
+        else:
+            raise ValueError('priority {} is outside the two buckets'.format(priority))
+        self.priorities[item] = priority
+
+    def decrease_key(self, item, priority):
+        """
+            Lowers the fscore of an item that is already in the queue
+        """
+        if priority < self.priorities[item]:
+            del self.priorities[item]
+            self.insert(item, priority)
+
+    def push(self, item, priority):
+        """
+            Inserts the item if it is not in the queue, otherwise lowers its
+            fscore if the new fscore is smaller
+        """
+        if item in self.priorities:
+            self.decrease_key(item, priority)
+        else:
+            self.insert(item, priority)
+
+    def priority(self, item):
+        """
+            Returns the fscore an item currently has in the queue
+        """
+        return self.priorities[item]
+
+    def extract_min(self):
+        """
+            returns the (fscore, item) pair with minimum fscore and removes it
+            from the queue. Entries left behind by decrease_key are skipped.
+        """
+        priorities = self.priorities
+        while True:
+            while self.current:
+                item = self.current.pop()
+                if priorities.get(item) == self.current_priority:
+                    del priorities[item]
+                    return (self.current_priority, item)
+            # the current bucket is empty, move on to the next fscore
+            self.current, self.following = self.following, self.current
+            self.current_priority += self.step
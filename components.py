@@ -0,0 +1,203 @@
+"""
+    components.py labels the connected regions of open cells of a map.
+
+    Two cells are connected when a path of open cells joins them. If the
+    source and target of a query lie in different regions there is no path,
+    and a search would only find that out after flooding the whole region of
+    the source. Comparing two labels answers it in O(1) instead.
+
+    The labels are built in one raster pass over the cells: every open cell
+    takes the label of its left or upper neighbour, and when both are open
+    with different labels the two labels are merged in a union-find over the
+    labels. The label of a cell is the root of its label in the union-find.
+
+    When walls change the labels are updated locally:
+        a wall removed: the cell takes the label of its open neighbours and
+            their labels are merged, O(1)
+        a wall added: the open neighbours of the cell may have been cut off
+            from each other. A breadth-first search is grown from each of them
+            in turn, searches that meet are merged, and a group of searches
+            that runs out of cells before meeting the others is a new region
+            and is relabelled. The searches stop as soon as only one group is
+            left, so the work is proportional to the smaller regions.
+
+    Example:
+        regions = Components(gridmap)
+        if not regions.connected((0, 0), (39, 39)):
+            print('no path')
+"""
+
+from array import array
+from collections import deque
+import gridmap as gm
+
+class Components:
+    """
+        Init:
+            map: the GridMap whose regions are labelled
+            labels: int32 array of the label of every cell, -1 for walls
+            parent: the union-find parent of every label
+            walls: the wall layout the labels are valid for
+            version: the GridMap.version the labels are valid for
+
+        Methods:
+            build(): labels every cell from scratch
+            find(label): returns the root label that a label was merged into
+            component(node): returns the region of an (x, y) node, None for a wall
+            connected(source, target): returns true if a path joins the nodes
+            update(): updates the labels for the walls changed since the last update
+            cells_changed(nodes): updates the labels after the nodes changed status
+    """
+    def __init__(self, gridmap):
+        self.map = gridmap
+        self.build()
+
+    def build(self):
+        """
+            Labels every open cell in one raster pass
+        """
+        width, size = self.map.width, self.map.size
+        self.version = self.map.version
+        walls = self.map.walls()
+        labels = array('i', [-1]) * size
+        parent = []
+        find = self.find
+        self.parent = parent
+        for index in range(size):
+            if walls[index]:
+                continue
+            left = labels[index - 1] if index % width else -1
+            upper = labels[index - width] if index >= width else -1
+            if left == -1 and upper == -1:
+                labels[index] = len(parent)
+                parent.append(len(parent))
+            elif upper == -1:
+                labels[index] = left
+            else:
+                labels[index] = upper
+                if left != -1 and left != upper:
+                    first, second = find(left), find(upper)
+                    if first != second:
+                        parent[second] = first
+        self.labels = labels
+        self.walls = bytearray(walls)
+
+    def find(self, label):
+        """
+            Returns the root label a label was merged into
+        """
+        parent = self.parent
+        while parent[label] != label:
+            parent[label] = parent[parent[label]]   # path halving
+            label = parent[label]
+        return label
+
+    def component(self, node):
+        """
+            Returns the label of the region holding an (x, y) node, or None if
+            the node is a wall. The labels are not checked for changed walls
+        """
+        label = self.labels[self.map.index(node)]
+        return None if label == -1 else self.find(label)
+
+    def connected(self, source, target):
+        """
+            Returns true if a path of open cells joins the source and target
+            nodes. The labels are updated first if the map was edited, so
+            on an unchanged map this is O(1)
+        """
+        self.update()
+        region = self.component(source)
+        return region is not None and region == self.component(target)
+
+    def update(self):
+        """
+            Updates the labels for every cell whose wall changed since the
+            labels were last updated. Returns the number of cells changed.
+            Nothing is compared while the version of the map is the same
+        """
+        if self.map.version == self.version:
+            return 0
+        walls, changed = self.map.changed_walls(self.walls)
+        for index in changed:
+            self.change(index, walls[index])
+        self.version = self.map.version
+        return len(changed)
+
+    def cells_changed(self, nodes):
+        """
+            Updates the labels after the status of the given (x, y) nodes has
+            changed (for example a wall was drawn)
+        """
+        applied = 0
+        for node in nodes:
+            index = self.map.index(node)
+            wall = self.map.cells[index] == gm.WALL
+            if wall != self.walls[index]:
+                self.change(index, wall)
+                applied += 1
+        self.version = self.map.catch_up(self.version, applied)
+
+    def change(self, index, wall):
+        """
+            Turns one cell into a wall or an open cell and updates the labels
+        """
+        self.walls[index] = wall
+        if wall:
+            self.labels[index] = -1
+            self.split(index)
+            return
+
+        roots = {self.find(self.labels[neighbour]) \
+            for neighbour in self.map.open_neighbours(index, self.walls)}
+        if not roots:
+            root = len(self.parent)
+            self.parent.append(root)
+        else:
+            root = roots.pop()
+            for other in roots:
+                self.parent[other] = root
+        self.labels[index] = root
+
+    def split(self, index):
+        """
+            Relabels the regions cut off from each other by a new wall at index
+        """
+        open_neighbours, walls = self.map.open_neighbours, self.walls
+        starts = open_neighbours(index, walls)
+        if len(starts) < 2:     # a single region cannot be cut in two
+            return
+        queues = [deque([start]) for start in starts]
+        owner = {start: number for number, start in enumerate(starts)}
+        group = list(range(len(starts)))    # union-find over the searches
+
+        def root(number):
+            while group[number] != number:
+                number = group[number]
+            return number
+
+        alive = set(group)
+        while len(alive) > 1:
+            for number, queue in enumerate(queues):
+                if not queue:
+                    continue
+                current = queue.popleft()
+                for neighbour in open_neighbours(current, walls):
+                    other = owner.get(neighbour)
+                    if other is None:
+                        owner[neighbour] = number
+                        queue.append(neighbour)
+                    elif root(other) != root(number):   # two searches met
+                        first, second = root(other), root(number)
+                        group[second] = first
+                        alive.discard(second)
+            for first in list(alive):
+                members = [number for number in range(len(queues)) if root(number) == first]
+                if len(alive) > 1 and not any(queues[number] for number in members):
+                    # this group ran out of cells without meeting the others
+                    label = len(self.parent)
+                    self.parent.append(label)
+                    for cell, number in owner.items():
+                        if root(number) == first:
+                            self.labels[cell] = label
+                    alive.discard(first)
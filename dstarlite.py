@@ -0,0 +1,222 @@
+"""
+    dstarlite.py contains an incremental planner based on D* Lite.
+
+    A normal search starts from nothing every time it is run. D* Lite keeps
+    its search state between queries so that when one endpoint moves, or a few
+    walls change, only the part of the search affected by the change is redone.
+
+    The search grows from a fixed endpoint (the root) towards the endpoint that
+    moves. Every cell keeps two values:
+        g: the distance to the root found by the last search
+        rhs: a one step lookahead, 0 for the root otherwise min(g(neighbour) + 1)
+    A cell is consistent when g == rhs. Only inconsistent cells are queued and
+    they are processed in order of their key, so after a change only the cells
+    whose distance actually changed are expanded again.
+
+    When the moving endpoint moves, the keys already in the queue are kept and
+    km grows by the distance moved so the heuristic stays a lower bound. If the
+    root itself moves, the state is thrown away and the search starts again
+    with the endpoint that did not move as the new root.
+"""
+
+from array import array
+import minheap as minh
+import gridmap as gm
+import search
+
+class DStarLite:
+    """
+        Init:
+            map: the GridMap to plan on
+            g: int32 array of the distance from each cell to the root
+            rhs: int32 array of the one step lookahead distance of each cell
+            openset: indexed min heap of the inconsistent cells
+            km: key modifier, the total distance the moving endpoint has moved
+            root: index of the fixed endpoint the search grows from
+            start: index of the moving endpoint
+            last: the (source, target) indices of the last query
+            walls: copy of the wall layout the search state is valid for
+            version: the GridMap.version the search state is valid for
+
+        Methods:
+            reset(): throws away the search state
+            cells_changed(nodes): repairs the search after the nodes changed status
+            plan(source, target, observer): returns a SearchResult with the shortest
+                path from source to target, reusing the previous search where possible
+            record(path): writes the path into the search state of the map
+    """
+    def __init__(self, gridmap):
+        self.map = gridmap
+        self.reset()
+
+    def reset(self):
+        """
+            Throws away the search state. The next plan starts from nothing
+        """
+        self.g = array('i', [gm.INF]) * self.map.size
+        self.rhs = array('i', [gm.INF]) * self.map.size
+        self.openset = minh.IndexedMinHeap()
+        self.km = 0
+        self.root = None
+        self.start = None
+        self.last = None
+        self.walls = bytearray(self.map.walls())
+        self.version = self.map.version
+
+    def heuristic(self, first, second):
+        """
+            Manhattan distance between two cell indices
+        """
+        width = self.map.width
+        return abs(first % width - second % width) + abs(first // width - second // width)
+
+    def key(self, index):
+        """
+            Priority of a cell in the queue, [min(g, rhs) + h(start, cell) + km, min(g, rhs)]
+        """
+        distance = min(self.g[index], self.rhs[index])
+        return (distance + self.heuristic(self.start, index) + self.km, distance)
+
+    def update_vertex(self, index):
+        """
+            Recomputes the rhs value of a cell and queues it if it is inconsistent
+        """
+        if index != self.root:
+            best = gm.INF
+            if self.map.cells[index] != gm.WALL:
+                for neighbour in self.map.neighbours(index):
+                    if self.g[neighbour] + 1 < best:
+                        best = self.g[neighbour] + 1
+            self.rhs[index] = best
+        if index in self.openset:
+            self.openset.remove(index)
+        if self.g[index] != self.rhs[index]:
+            self.openset.insert(index, self.key(index))
+
+    def compute_shortest_path(self, observer=None):
+        """
+            Processes inconsistent cells until the moving endpoint is consistent
+            and no queued cell could still lower its distance.
+
+            Returns the number of cells expanded
+        """
+        g, rhs, openset = self.g, self.rhs, self.openset
+        start = self.start
+        expanded = 0
+        while openset and (openset.find_min()[0] < self.key(start) or rhs[start] != g[start]):
+            old_key, current = openset.extract_min()
+            new_key = self.key(current)
+            if old_key < new_key:       # the key was out of date, queue it again
+                openset.insert(current, new_key)
+                continue
+
+            expanded += 1
+            if observer is not None:
+                observer('visit', self.map.coords(current))
+            if g[current] > rhs[current]:   # overconsistent, the distance went down
+                g[current] = rhs[current]
+                for neighbour in self.map.neighbours(current):
+                    self.update_vertex(neighbour)
+            else:                           # underconsistent, the distance went up
+                g[current] = gm.INF
+                self.update_vertex(current)
+                for neighbour in self.map.neighbours(current):
+                    self.update_vertex(neighbour)
+            if observer is not None:
+                observer('step', None)
+        return expanded
+
+    def cells_changed(self, nodes):
+        """
+            Repairs the search after the status of the given (x, y) nodes has
+            changed (for example a wall was drawn). Only the nodes and their
+            neighbours are updated, the next plan processes the consequences.
+        """
+        applied = 0
+        for node in nodes:
+            index = self.map.index(node)
+            wall = self.map.cells[index] == gm.WALL
+            applied += wall != self.walls[index]
+            self.walls[index] = wall
+            if self.root is None:
+                continue
+            self.update_vertex(index)
+            xpos, ypos = node
+            for neighbour in ((xpos-1, ypos), (xpos+1, ypos), (xpos, ypos-1), (xpos, ypos+1)):
+                if self.map.in_bounds(neighbour):
+                    self.update_vertex(self.map.index(neighbour))
+        self.version = self.map.catch_up(self.version, applied)
+
+    def initialize(self, root):
+        """
+            Starts a new search growing from the root cell
+        """
+        self.reset()
+        self.root = root
+        self.rhs[root] = 0
+
+    def plan(self, source, target, observer=None):
+        """
+            Finds the shortest path from source to target. The endpoint that did
+            not move since the last query is kept as the root, so dragging either
+            endpoint reuses the previous search.
+
+            The keys and the step costs assume every move costs 1, so the map
+            has to be 4-connected without terrain costs.
+
+            Inputs: the source node, the target node and an optional observer
+            Outputs: a SearchResult with the shortest path
+        """
+        if not self.map.uniform():
+            raise ValueError('D* Lite needs a 4-connected map without terrain costs')
+        source, target = self.map.index(source), self.map.index(target)
+        if len(self.g) != self.map.size:
+            self.reset()
+        elif self.map.version != self.version:
+            if self.walls != self.map.walls():
+                # the walls changed without cells_changed being called
+                self.reset()
+            self.version = self.map.version
+
+        if self.root == target:
+            moving = source
+        elif self.root == source:
+            moving = target
+        else:
+            # keep whichever endpoint did not move as the new root
+            if self.last is not None and self.last[0] == source:
+                self.initialize(source)
+                moving = target
+            else:
+                self.initialize(target)
+                moving = source
+        self.last = (source, target)
+
+        if self.start is None:
+            self.start = moving
+            self.openset.insert(self.root, self.key(self.root))
+        else:
+            self.km += self.heuristic(self.start, moving)
+            self.start = moving
+
+        expanded = self.compute_shortest_path(observer)
+        if self.g[moving] == gm.INF:    # no paths are found
+            return search.SearchResult(expanded=expanded)
+
+        # walk downhill from the moving endpoint to the root
+        path = [moving]
+        current = moving
+        while current != self.root:
+            current = min(self.map.neighbours(current), key=self.g.__getitem__)
+            path.append(current)
+        if moving == target:
+            path.reverse()
+        self.record(path)
+        return search.SearchResult([self.map.coords(index) for index in path], expanded)
+
+    def record(self, path):
+        """
+            Writes the path into the search state of the map, the same way the
+            searches in search.py leave it, so the visualizer can find and clear it
+        """
+        search.record_path(self.map, [self.map.coords(index) for index in path])
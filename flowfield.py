@@ -0,0 +1,289 @@
+"""
+    flowfield.py contains flow fields for many agents heading to one target.
+
+    Every agent that searches on its own repeats most of the work of the
+    others. A flow field is computed once per target instead: a breadth-first
+    search grown from the target (see wavefront.py) gives every cell its
+    distance to the target, and the parent of a cell in that search is its
+    next step towards the target. The next steps are stored as one direction
+    byte per cell, so an agent anywhere on the map follows the directions to
+    the target in O(path length) without searching.
+
+    The distances count every move as 1 and the directions are the four
+    straight moves, so a field is only built on a 4-connected map without
+    terrain costs (GridMap.uniform). If the map gains terrain costs or
+    diagonal moves later, update and cells_changed raise ValueError instead
+    of steering agents along paths that are no longer the shortest.
+
+    When walls change the field is repaired instead of recomputed:
+        a wall added: only the cells whose route went through the new wall
+            (the cells whose directions lead into it) lose their distance
+        a wall removed: the opened cell has no distance yet
+    Those cells are given the best distance offered by their neighbours and
+    the changes are spread with a small Dijkstra search, which also lowers
+    the distance of cells that a removed wall gives a shorter route. When
+    most of the map changed, or the target itself did, the field is
+    recomputed from scratch.
+
+    Example:
+        fields = FlowFields(gridmap)
+        field = fields.field((39, 39))
+        for agent in agents:
+            agent.path = field.path(agent.node)
+"""
+
+import heapq
+from array import array
+from collections import OrderedDict
+import gridmap as gm
+import wavefront as wf
+
+# Directions stored in FlowField.directions
+NONE, LEFT, RIGHT, UP, DOWN = range(5)
+
+CAPACITY = 16           # flow fields kept by a FlowFields cache
+REBUILD_FRACTION = 8    # recompute from scratch when 1/8 of the map changed
+
+def check_uniform(gridmap):
+    """
+        Raises ValueError unless every move of the map costs 1, the moves the
+        flow fields are computed for
+    """
+    if not gridmap.uniform():
+        raise ValueError('Flow fields need a 4-connected map without terrain costs')
+
+class FlowField:
+    """
+        Init:
+            map: the GridMap the field is computed on
+            target: the index of the target cell
+            typecode: the array type of distance, 'H' (16 bits) when every
+                distance fits, 'I' otherwise
+            unreachable: the distance of the cells that cannot reach the target
+            distance: the distance of every cell to the target
+            directions: bytearray of the direction (LEFT, RIGHT, UP, DOWN) of
+                the next step of every cell, NONE for the target, walls and
+                cells that cannot reach the target
+            offsets: the index offset of each direction
+            walls: the wall layout the field is valid for
+            version: the GridMap.version the field is valid for
+
+        Methods:
+            build(): computes the whole field
+            update(): repairs the field for the walls changed since the last update
+            cells_changed(nodes): repairs the field after the nodes changed status
+            distance_to(node): returns the distance of a node to the target, -1
+                if it cannot reach it
+            next_step(node): returns the next node towards the target
+            path(node): returns the path from a node to the target
+    """
+    def __init__(self, gridmap, target):
+        check_uniform(gridmap)
+        self.map = gridmap
+        self.target = gridmap.index(target)
+        self.typecode = 'H' if gridmap.size < 0xffff else 'I'
+        self.unreachable = (1 << (8 * array(self.typecode).itemsize)) - 1
+        width = gridmap.width
+        self.offsets = (0, -1, 1, -width, width)
+        self.build()
+
+    def build(self):
+        """
+            Computes the distance and the next step of every cell with one
+            breadth-first search from the target
+        """
+        gridmap = self.map
+        self.version = gridmap.version
+        self.walls = bytearray(gridmap.walls())
+        field = wf.distance_field(gridmap, [gridmap.coords(self.target)])
+        if wf.NUMPY and not isinstance(field.distance, array):
+            np = wf.np
+            distance = field.distance.astype(self.typecode)
+            distance[field.distance == gm.INF] = self.unreachable
+            self.distance = array(self.typecode, distance.tobytes())
+            step = field.parent - np.arange(gridmap.size)
+            directions = np.zeros(gridmap.size, dtype=np.uint8)
+            reached = field.parent != gm.NO_PARENT
+            for direction in (LEFT, RIGHT, UP, DOWN):   # vertical last, for one column maps
+                directions[reached & (step == self.offsets[direction])] = direction
+            self.directions = bytearray(directions.tobytes())
+            return
+
+        unreachable = self.unreachable
+        self.distance = array(self.typecode, (min(distance, unreachable) \
+            for distance in field.distance))
+        self.directions = bytearray(gridmap.size)
+        moves = {offset: direction for direction, offset in enumerate(self.offsets)}
+        for index, parent in enumerate(field.parent):
+            if parent != gm.NO_PARENT:
+                self.directions[index] = moves[parent - index]
+
+    def update(self):
+        """
+            Repairs the field for every cell whose wall changed since the
+            field was last updated. Returns the number of cells changed.
+            Nothing is compared while the version of the map is the same.
+            Raises ValueError if the map gained terrain costs or diagonal moves
+        """
+        if self.map.version == self.version:
+            return 0
+        check_uniform(self.map)
+        walls, changed = self.map.changed_walls(self.walls)
+        if changed:
+            self.repair(changed, walls)
+        self.version = self.map.version
+        return len(changed)
+
+    def cells_changed(self, nodes):
+        """
+            Repairs the field after the status of the given (x, y) nodes has
+            changed (for example a wall was drawn)
+        """
+        check_uniform(self.map)
+        walls = bytearray(self.walls)
+        changed = []
+        for node in nodes:
+            index = self.map.index(node)
+            wall = self.map.cells[index] == gm.WALL
+            if wall != walls[index]:
+                walls[index] = wall
+                changed.append(index)
+        if changed:
+            self.repair(changed, walls)
+        self.version = self.map.catch_up(self.version, len(changed))
+
+    def repair(self, changed, walls):
+        """
+            Updates the field for the changed cells, walls is the new wall layout
+        """
+        if self.target in changed or len(changed) * REBUILD_FRACTION > self.map.size:
+            self.build()
+            return
+        distance, directions, offsets = self.distance, self.directions, self.offsets
+        unreachable, open_neighbours = self.unreachable, self.map.open_neighbours
+
+        # the cells that routed through a new wall lose their distance
+        lost = []
+        for index in changed:
+            if walls[index] and distance[index] != unreachable:
+                distance[index] = unreachable
+                lost.append(index)
+        pending = list(lost)
+        while pending:
+            current = pending.pop()
+            for neighbour in open_neighbours(current, self.walls):
+                if distance[neighbour] != unreachable and \
+                    neighbour + offsets[directions[neighbour]] == current:
+                    distance[neighbour] = unreachable
+                    lost.append(neighbour)
+                    pending.append(neighbour)
+        self.walls[:] = walls
+        for index in lost:
+            directions[index] = NONE
+        for index in changed:
+            if walls[index]:
+                distance[index] = unreachable
+                directions[index] = NONE
+
+        # give the lost and opened cells the best distance of their neighbours
+        # and spread every improvement
+        queue = []
+        for index in lost + [index for index in changed if not walls[index]]:
+            if walls[index]:
+                continue
+            for neighbour in open_neighbours(index, self.walls):
+                if distance[neighbour] != unreachable:
+                    heapq.heappush(queue, (distance[neighbour] + 1, index, neighbour))
+        while queue:
+            cost, current, via = heapq.heappop(queue)
+            if cost >= distance[current]:
+                continue
+            distance[current] = cost
+            directions[current] = offsets.index(via - current)
+            for neighbour in open_neighbours(current, self.walls):
+                if cost + 1 < distance[neighbour]:
+                    heapq.heappush(queue, (cost + 1, neighbour, current))
+
+    def distance_to(self, node):
+        """
+            Returns the distance from the node to the target, -1 if the node
+            cannot reach the target
+        """
+        distance = self.distance[self.map.index(node)]
+        return -1 if distance == self.unreachable else distance
+
+    def next_step(self, node):
+        """
+            Returns the next (x, y) node on the way from node to the target,
+            None at the target or if the node cannot reach the target
+        """
+        index = self.map.index(node)
+        direction = self.directions[index]
+        if direction == NONE:
+            return None
+        return self.map.coords(index + self.offsets[direction])
+
+    def path(self, node):
+        """
+            Returns the path as (x, y) nodes from the node to the target by
+            following the directions, empty if the node cannot reach the target.
+            The walls are not checked, call update first if they may have changed
+        """
+        index = self.map.index(node)
+        if self.distance[index] == self.unreachable:
+            return []
+        directions, offsets = self.directions, self.offsets
+        path = [index]
+        while directions[index] != NONE:
+            index += offsets[directions[index]]
+            path.append(index)
+        return [self.map.coords(index) for index in path]
+
+class FlowFields:
+    """
+        Init:
+            map: the GridMap the fields are computed on
+            capacity: the number of fields kept, the least recently used field
+                is dropped when a new target needs room
+            fields: OrderedDict of target index -> FlowField, the most recently
+                used last
+
+        Methods:
+            field(target): returns the up to date FlowField of a target
+            path(source, target): returns the path from source to target
+            clear(): drops every field
+    """
+    def __init__(self, gridmap, capacity=CAPACITY):
+        self.map = gridmap
+        self.capacity = capacity
+        self.fields = OrderedDict()
+
+    def field(self, target):
+        """
+            Returns the FlowField of the (x, y) target, computing it the first
+            time and repairing it if the walls changed
+        """
+        index = self.map.index(target)
+        field = self.fields.get(index)
+        if field is None:
+            field = FlowField(self.map, target)
+            self.fields[index] = field
+            while len(self.fields) > self.capacity:
+                self.fields.popitem(last=False)
+        else:
+            field.update()
+            self.fields.move_to_end(index)
+        return field
+
+    def path(self, source, target):
+        """
+            Returns the path from source to target along the flow field of the
+            target, empty if there is none
+        """
+        return self.field(target).path(source)
+
+    def clear(self):
+        """
+            Drops every field
+        """
+        self.fields.clear()
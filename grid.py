@@ -3,7 +3,8 @@
 
     Node Class:
         each cell of a grid is defined by a node object which contains
-        several parameters.
+        several parameters. The parameters are not stored on the node itself,
+        the node is a view onto one cell of the gridmap.GridMap arrays.
 
         init:
             status: classifies the cell as a start, end, wall or empty node
@@ -16,119 +17,318 @@
                 NOTE: heuristic is a standalone function and computes the manhattan
                 distance (abs(x1 - y1) + abs(x2 - y2))
 
+    Graph Class:
+        dictionary-like view of the GridMap which maps each (x, y) node to
+        its Node object. This keeps graph[node].status and friends working.
+
     Grid Class:
-        Grid class defines and renders the whole grid. Stores each cell as a
-        node object and together forms the graph.
+        Grid class defines and renders the whole grid. Stores the cells in a
+        GridMap and exposes them as Node objects through the graph.
 
         init:
             display: the current display
+            map: the array representation of the grid
             graph: the cells of the grid where each cell is a node object
 """
 
-from collections import defaultdict
-from collections import deque
+from collections.abc import Mapping
 import math
-import time
 import random
-import pygame
 import parameters as param
-import minheap as minh
-
-def heuristic(source, target):
-    """
-        This function will compute the heuristic function for A*
-        The chosen heuristic will be the Manhattan distance
-
-        abs(x1 - y1) + abs(x2 - y2) if x = (x1, x2) and y = (y1, y2)
-    """
-    return abs(source[0]-target[0]) + abs(source[1]-target[1])
+import renderer
+import animation as anim
+import gridmap as gm
+import search
+import dstarlite
+import mapfile
+import landmarks as lm
+import components
+import pathcache
+import movingai
+from search import heuristic    # kept so grid.heuristic still works
 
 class Node:
     """
         Init:
-            status: classifies the cell as a start, end, wall or empty node
+            gridmap: the GridMap that stores the parameters of the node
             xpos: the x position of the node on the grid
             ypos: the y position of the node on the grid
+
+        Properties (read from and written to the gridmap):
+            status: classifies the cell as a start, end, wall or empty node
             previous: what was the previous node that travelled to this node
             distance: computed distance from the source to this node
             fscore: computed fscore (fscore = distance + heuristic(node, target))
-            visited: boolean variable that determines if the node is in the openset set
+            visited: boolean variable that determines if the node has been expanded
+            inset: boolean variable that determines if the node is in the openset set
 
         Methods:
+            current(): returns true if the search parameters belong to the current search
             Move(new xpos, new ypos): moves the position of a node to the new position
             reset_parameters(): resets the parameter of a node to the default values
     """
-    def __init__(self, xpos, ypos, status='empty'):
-        self.status = status    # categories = [start, end, empty, wall]
-        self.pos = (xpos, ypos)
-        self.previous = (-1, -1)
-        self.distance = math.inf
-        self.fscore = math.inf
-        self.visited = False
-        self.inset = False
+    def __init__(self, gridmap, xpos, ypos):
+        self.map = gridmap
+        self.index = gridmap.index((xpos, ypos))
+
+    @property
+    def pos(self):
+        """
+            The (x, y) position of the node
+        """
+        return self.map.coords(self.index)
+
+    @property
+    def status(self):
+        """
+            categories = [start, end, empty, wall]
+        """
+        return self.map.status(self.index)
+
+    @status.setter
+    def status(self, name):
+        self.map.set_status(self.index, name)
+
+    @property
+    def previous(self):
+        """
+            The previous node on the path, (-1, -1) if there is none
+        """
+        index = self.map.previous[self.index] if self.current() else gm.NO_PARENT
+        return (-1, -1) if index == gm.NO_PARENT else self.map.coords(index)
+
+    @previous.setter
+    def previous(self, node):
+        self.map.touch(self.index)
+        self.map.previous[self.index] = gm.NO_PARENT if node == (-1, -1) else self.map.index(node)
+
+    @property
+    def distance(self):
+        """
+            The distance from the source, math.inf if it has not been reached
+        """
+        distance = self.map.distance[self.index] if self.current() else gm.INF
+        return math.inf if distance == gm.INF else distance
+
+    @distance.setter
+    def distance(self, value):
+        self.map.touch(self.index)
+        self.map.distance[self.index] = gm.INF if value == math.inf else value
+
+    @property
+    def fscore(self):
+        """
+            The fscore of the node, math.inf if it has not been computed
+        """
+        fscore = self.map.fscore[self.index] if self.current() else gm.INF
+        return math.inf if fscore == gm.INF else fscore
+
+    @fscore.setter
+    def fscore(self, value):
+        self.map.touch(self.index)
+        self.map.fscore[self.index] = gm.INF if value == math.inf else value
+
+    @property
+    def visited(self):
+        """
+            True if the node has been expanded
+        """
+        return self.current() and bool(self.map.visited[self.index])
+
+    @visited.setter
+    def visited(self, value):
+        self.map.touch(self.index)
+        self.map.visited[self.index] = bool(value)
+
+    @property
+    def inset(self):
+        """
+            True if the node has been added to the open set
+        """
+        return self.current() and bool(self.map.inset[self.index])
+
+    @inset.setter
+    def inset(self, value):
+        self.map.touch(self.index)
+        self.map.inset[self.index] = bool(value)
+
+    def current(self):
+        """
+            Returns true if the search parameters of the node belong to the
+            current search, otherwise they are stale and read as the defaults
+        """
+        return self.map.is_current(self.index)
 
     def move(self, newx, newy):
         """
             This function moves the current node to a different position
         """
-        self.pos = (newx, newy)
+        self.index = self.map.index((newx, newy))
 
     def reset_parameters(self):
         """
             Resets the initial parameters for all nodes in the graph
         """
-        self.previous = (-1, -1)
-        self.distance = math.inf
-        self.fscore = math.inf
-        self.visited = False
-        self.inset = False
+        self.map.reset_cell(self.index)
+
+class Graph(Mapping):
+    """
+        Init:
+            gridmap: the GridMap that the graph is a view of
+
+        Iterating over the graph gives the (x, y) position of every cell and
+        graph[x, y] returns the Node for that cell.
+    """
+    def __init__(self, gridmap):
+        self.map = gridmap
+
+    def __getitem__(self, node):
+        if not self.map.in_bounds(node):
+            raise KeyError(node)
+        return Node(self.map, node[0], node[1])
+
+    def __iter__(self):
+        for xpos in range(self.map.width):
+            for ypos in range(self.map.height):
+                yield (xpos, ypos)
+
+    def __len__(self):
+        return self.map.size
+
+    def __contains__(self, node):
+        return self.map.in_bounds(node)
 
 class Grid:
     """
         Init
             display: The current display for rendering purposes
-            graph: the graph represented as a list of Node objects
+            renderer: draws onto the display and updates only the parts that changed
+            width: the number of cells along the x axis
+            height: the number of cells along the y axis
+            map: the array representation of the grid used by the searches
+            graph: the graph represented as a dictionary of Node objects
+            planner: the incremental D* Lite planner used while dragging
+            regions: the connected regions of the map, used to answer queries
+                with no path without searching
+            paths: the cache of the results of recent searches on the map
+            last_result: the SearchResult (with its SearchStats) of the last search
+            landmarks: the ALT landmarks of the map, made the first time they are used
 
         Methods
             build_graph(): builds the graph to the size of the grid
+            load_map(path): replaces the grid with the map saved in a map file
+            load_movingai(path): replaces the grid with a MovingAI .map file
+            use_map(gridmap): replaces the map of the grid and draws its walls
+            save_map(path, source, target): saves the grid to a map file
+            set_status(node, name): changes the status of a node
             generate_obstacles(): randomly generate wall obstacles determined by
                 the chance variable in parameter.py
             render_node(node, colour): renders the node onto the display
+            animation(name): returns an empty animation played at the speed set for name
             find_neighbours(node): returns the neighbours of the input node
-            find_path(target): returns the path found as a list of nodes
+            is_wall(node): returns true if the node is a wall
+            visualizer(canvas): returns an observer that renders a search
+            search(algorithm, source, target, animation): runs an algorithm from search.py
+            replan(source, target): returns the shortest path from the incremental planner
+            find_path(result): returns the path found as a list of nodes
             dijkstra(source, target): returns the shortest path from source to target
                 with dijkstra's pathfinding algorithm
             astar(source, target): returns the shortest path from source to target
                 with astar pathfininding algorithm
+            alt(source, target): returns the shortest path from source to target
+                with astar and the landmark (ALT) heuristic
+            jps(source, target): returns the shortest path from source to target
+                with jump point search
     """
-    def __init__(self, display):
+    def __init__(self, display, width=param.LIMIT, height=param.LIMIT):
         self.display = display
-        self.graph = defaultdict()
+        self.renderer = renderer.Renderer(display)
+        self.width = width
+        self.height = height
+        self.map = gm.GridMap(width, height)
+        self.graph = Graph(self.map)
+        self.planner = dstarlite.DStarLite(self.map)
+        self.regions = components.Components(self.map)
+        self.paths = pathcache.PathCache(self.map)
+        self.last_result = None
+        self.landmarks = None
 
     def build_graph(self):
         """
             Builds the graph by initiating an empty node for each
             cell of the grid
         """
-        for i in range(param.LIMIT):
-            for j in range(param.LIMIT):
-                self.graph[i, j] = Node(i, j)
+        self.map = gm.GridMap(self.width, self.height)
+        self.graph = Graph(self.map)
+        self.planner = dstarlite.DStarLite(self.map)
+        self.regions = components.Components(self.map)
+        self.paths = pathcache.PathCache(self.map)
+
+    def load_map(self, path):
+        """
+            Replaces the grid with the map in the map file at path (see
+            mapfile.py) and draws its walls. The file is memory mapped, changes
+            to the grid do not change the file until save_map is called.
+
+            Returns the (source, target) nodes stored in the file, None for
+            each one the file does not have
+        """
+        gridmap, source, target = mapfile.load(path, writable=True)
+        self.use_map(gridmap)
+        return source, target
+
+    def load_movingai(self, path):
+        """
+            Replaces the grid with the MovingAI benchmark map at path (see
+            movingai.py) and draws its walls. The map does not need to be square
+        """
+        self.use_map(movingai.load_map(path))
+
+    def use_map(self, gridmap):
+        """
+            Makes gridmap the map of the grid, resizes the grid to it and draws
+            its walls
+        """
+        self.width = gridmap.width
+        self.height = gridmap.height
+        self.map = gridmap
+        self.graph = Graph(self.map)
+        self.planner = dstarlite.DStarLite(self.map)
+        self.regions = components.Components(self.map)
+        self.paths = pathcache.PathCache(self.map)
+        for index in range(self.map.size):
+            if self.map.cells[index] == gm.WALL:
+                self.renderer.draw_cell(self.map.coords(index), param.BLACK)
+
+    def save_map(self, path, source=None, target=None):
+        """
+            Saves the walls of the grid and the source and target nodes to the
+            map file at path
+        """
+        mapfile.save(path, self.map, source, target)
+
+    def set_status(self, node, name):
+        """
+            Sets the status of a node and tells the incremental planner and
+            the region labels so they only repair the map around the node
+        """
+        self.map.set_status(self.map.index(node), name)
+        self.planner.cells_changed([node])
+        self.regions.cells_changed([node])
 
     def generate_obstacles(self):
         """
             Randomly generate wall obstacles on the graph. Each node in the graph
             has a chance to become a wall and is based on the CHANCE variable in parameter.py
         """
+        animation = self.animation('obstacles')
         for node in self.graph:
             empty_node = (self.graph[node].status != 'start' and self.graph[node].status != 'end')
             if random.random() <= param.CHANCE and empty_node:  # node has CHANCE % to be a wall
                 self.graph[node].status = 'wall'
-                xpos = node[0] * param.NODE_SIZE
-                ypos = node[1] * param.NODE_SIZE
-                pygame.draw.rect(self.display, param.BLACK, \
-                    [xpos, ypos, param.NODE_SIZE, param.NODE_SIZE])
-                time.sleep(0.001)
-                pygame.display.update()
+                animation.draw_cell(node, param.BLACK)
+                animation.step()
+        animation.play()
 
     def recursive_backtracking(self):
         """
@@ -137,24 +337,31 @@ class Grid:
             of the line.
         """
         # draw the boarder
+        animation = self.animation('border')
         for node in self.graph:
-            if (node[0] in range(param.LIMIT) and node[1] in (0, param.LIMIT-1)) or \
-                (node[1] in range(param.LIMIT) and node[0] in (0, param.LIMIT-1)) and \
+            if (node[0] in range(self.width) and node[1] in (0, self.height-1)) or \
+                (node[1] in range(self.height) and node[0] in (0, self.width-1)) and \
                 self.graph[node].status not in ['source', 'target']:
-                pygame.draw.rect(self.display, param.BLACK, \
-                    [node[0]*param.NODE_SIZE, node[1]*param.NODE_SIZE,\
-                    param.NODE_SIZE, param.NODE_SIZE])
+                animation.draw_cell(node, param.BLACK)
                 self.graph[node].status = 'wall'
-                time.sleep(0.006)
-                pygame.display.update()
+                animation.step()
+        animation.play()
         # start recursive call
-        self.division(1, 1, param.LIMIT-2, param.LIMIT-2)
+        animation = self.animation('division')
+        self.division(1, 1, self.width-2, self.height-2, animation)
+        animation.play()
 
-    def division(self, xpos, ypos, width, height):
+    def division(self, xpos, ypos, width, height, canvas=None):
         """
             Recursively draws a wall and places a passage through the wall. Two new regions
             are created after the wall is made. Apply division on both regions
+
+            The walls are drawn onto canvas (a Renderer or an Animation),
+            the renderer of the grid by default
         """
+        if canvas is None:
+            canvas = self.renderer
+
         # if the dimensions of width and height are less than 2 then return
         if width < 2 or height < 2:
             return
@@ -181,8 +388,8 @@ class Grid:
             # choose a random area in the wall to carve out the passage
             passage_x = random.randint(xpos, xpos + width - 1)//2*2+1
             passage_y = wall_y
-            if passage_x > param.LIMIT - 2:
-                passage_x = param.LIMIT - 2
+            if passage_x > self.width - 2:
+                passage_x = self.width - 2
 
             # Set the parameters of the new areas (one on each side of wall)
             new_x1, new_y1 = xpos, ypos
@@ -210,8 +417,8 @@ class Grid:
             # choose a random spot to carve out the passage
             passage_x = wall_x
             passage_y = random.randint(ypos, ypos + height - 1)//2*2+1
-            if passage_y > param.LIMIT - 2:
-                passage_y = param.LIMIT - 2
+            if passage_y > self.height - 2:
+                passage_y = self.height - 2
 
             # Set the parameters for the new areas
             new_x1, new_y1 = xpos, ypos
@@ -228,76 +435,144 @@ class Grid:
             self.graph[wall_x, passage_y].status = 'empty'
 
         # render walls and passage
-        pygame.draw.rect(self.display, param.BLACK, \
+        canvas.draw_rect(param.BLACK, \
             [wall_x * param.NODE_SIZE, wall_y * param.NODE_SIZE, \
             wall_w * param.NODE_SIZE, wall_h * param.NODE_SIZE])
-        pygame.draw.rect(self.display, param.CREAM, \
-            [passage_x * param.NODE_SIZE, passage_y * param.NODE_SIZE, \
-            param.NODE_SIZE, param.NODE_SIZE])
-
-        time.sleep(0.06)
-        pygame.display.update()
+        canvas.draw_cell((passage_x, passage_y), param.CREAM)
+        canvas.step()
 
         # recurse through both sides of the wall
-        self.division(new_x1, new_y1, new_w1, new_h1)
-        self.division(new_x2, new_y2, new_w2, new_h2)
+        self.division(new_x1, new_y1, new_w1, new_h1, canvas)
+        self.division(new_x2, new_y2, new_w2, new_h2, canvas)
 
-    def render_node(self, node, colour):
+    def render_node(self, node, colour, canvas=None):
         """
-            Renders the input node onto the grid
+            Renders the input node onto the grid (or onto canvas if given)
         """
         # render in the neighbours for the current computation
-        xpos = node[0] * param.NODE_SIZE
-        ypos = node[1] * param.NODE_SIZE
-        if self.graph[node].status == 'empty':
-            pygame.draw.rect(self.display, colour, \
-                [xpos, ypos, param.NODE_SIZE, param.NODE_SIZE])
+        if self.map.cells[self.map.index(node)] == gm.EMPTY:
+            (self.renderer if canvas is None else canvas).draw_cell(node, colour)
+
+    def animation(self, name):
+        """
+            Returns an empty animation that is played back at the speed set
+            for name in param.STEPS_PER_FRAME
+        """
+        return anim.Animation(self.renderer, param.STEPS_PER_FRAME[name])
 
     def find_neighbours(self, node):
         """
             Finds the neighbours for a node which is not a wall.
 
-            This function checks the top, bottom, left and right for neighbours.
+            The neighbours are read from the neighbour masks of the map (see
+            GridMap.adjacency), so they follow its connectivity: left, right,
+            top and bottom, and the diagonals on an 8-connected map.
                 1) if the node in question is a wall, then no checks will be done
                 2) If the neighbouring cell is a wall, then it will not be counted as a neighbour
         """
-        neighbours = []
-        xpos = node[0]
-        ypos = node[1]
-
-        if self.graph[node].status == 'wall':  # do not check nodes which are walls
-            return neighbours
+        if self.map.is_wall(node):  # do not check nodes which are walls
+            return []
+        links, moves = self.map.adjacency(), self.map.moves
+        index = self.map.index(node)
+        return [self.map.coords(index + offset) for offset in moves[links[index]]]
 
-        # main check for the neighbours (left, right, top , bottom)
-        if xpos > 0 and self.graph[xpos-1, ypos] != 'wall':
-            neighbours.append((xpos-1, ypos))
-        if xpos < param.LIMIT-1 and self.graph[xpos+1, ypos] != 'wall':
-            neighbours.append((xpos+1, ypos))
-        if ypos > 0 and self.graph[xpos, ypos-1] != 'wall':
-            neighbours.append((xpos, ypos-1))
-        if ypos < param.LIMIT-1 and self.graph[xpos, ypos+1] != 'wall':
-            neighbours.append((xpos, ypos+1))
+    def is_wall(self, node):
+        """
+            Returns true if the node is a wall and cannot be traversed
+        """
+        return self.map.is_wall(node)
 
-        return neighbours
+    def visualizer(self, canvas=None):
+        """
+            Returns an observer for the search engine which renders the search
+            onto the display. Visited nodes are rendered in light blue and nodes
+            added to the open set in purple.
 
-    def find_path(self, target):
+            If canvas is None the cells are drawn straight onto the display,
+            otherwise they are recorded into the canvas animation one step
+            of the search at a time
         """
-            Finds the path by backtracking. Start at the target node and keeping
-            recording the previous node until the source node is reached.
+        def observer(event, node):
+            if event == 'visit':
+                self.render_node(node, param.LT_BLUE, canvas)
+            elif event == 'open':
+                self.render_node(node, param.PURPLE, canvas)
+            elif event == 'step' and canvas is not None:
+                canvas.step()
+        return observer
+
+    def find_path(self, result):
+        """
+            Converts a search result into the path used by the visualizer.
 
             target -> prev node -> prev node -> ... -> source
+
+            If no path was found then return -1
+        """
+        if not result.found():
+            return -1
+        print('The distance of the path is', result.distance)
+        return list(reversed(result.path))
+
+    def search(self, algorithm, source, target, animation=None, bidirectional=False, **options):
+        """
+            Runs the named algorithm from the headless search engine and renders
+            its progress onto the display.
+
+            The search runs at full speed. If an animation is given the search is
+            recorded into it and played back afterwards, otherwise the result is
+            drawn at once.
+
+            If bidirectional is true the bidirectional version of the algorithm
+            is used when there is one (dijkstra, astar and bfs). The
+            bidirectional searches count moves, so on a map with terrain costs
+            or diagonal moves the one way search is used instead. Extra keyword
+            options (such as heuristic) are passed to the algorithm.
+
+            If the source and target lie in different regions of the map there
+            is no path and nothing is searched. If the same query was answered
+            since the walls last changed, its path is taken from the cache and
+            only the path is drawn
+        """
+        if not self.regions.connected(source, target):
+            self.last_result = search.SearchResult()
+            return self.find_path(self.last_result)
+        if bidirectional and self.map.uniform():
+            algorithm = search.BIDIRECTIONAL.get(algorithm, algorithm)
+        self.paths.refresh()
+        key = self.paths.key(source, target, algorithm, options)
+        result = self.paths.lookup(key)
+        if result is not None:
+            search.record_path(self.map, result.path)
+            self.last_result = result
+            return self.find_path(result)
+
+        result = search.find(self.map, source, target, algorithm, self.visualizer(animation), \
+            **options)
+        self.paths.store(key, result)
+        self.last_result = result
+        if animation is not None:
+            animation.play()
+        return self.find_path(result)
+
+    def replan(self, source, target):
         """
-        path = []
-        node = target
-        path_dist = self.graph[target].distance
-        path.append(node)
-        while len(path) <= path_dist:
-            node = self.graph[node].previous
-            path.append(node)
-        print('The distance of the path is', path_dist)
-        return path
+            Finds the shortest path with the incremental D* Lite planner. The
+            planner keeps its search between calls, so when the source or target
+            is moved a little or a few walls change only the affected part of the
+            search is redone. Nothing is rendered apart from the path.
+
+            The planner counts every move as 1 on a 4-connected map, so on a
+            map with terrain costs or diagonal moves a full A* search is run
+            instead.
+        """
+        if not self.map.uniform():
+            return self.search('astar', source, target)
+        if not self.regions.connected(source, target):
+            return -1
+        return self.find_path(self.planner.plan(source, target))
 
-    def dijkstra(self, source, target, speed=None):
+    def dijkstra(self, source, target, speed=None, bidirectional=False):
         """
             Dijkstra's algorithm finds the shortest path between a source and target node.
                 1) All nodes are initially unvisited
@@ -313,47 +588,13 @@ class Grid:
             Inputs: the source node and the target node.
             Outputs: the computed path and its length. If there are no paths then return -1
 
-            Helper function
-                find_neighbours(node): used to help compute neighbours for a given node.
-        """
-        openset = minh.MinHeap()
-        # set the distance of source to 0
-        self.graph[source].distance = 0
-        # insert source node (dist, node)
-        openset.insert((self.graph[source].distance, source))
-
-        while openset:
-            # Set the current node as the node with minimum fscore value
-            extracted_min = openset.extract_min()
-            current = extracted_min[1]
-
-            if current == target:           # reached the target! return path
-                return self.find_path(target)
-
-            self.graph[current].visited = True                  # mark current as visited
-            self.render_node(current, param.LT_BLUE)            # render the current node
-            current_neighbours = self.find_neighbours(current)  # find neighbours
-            tentative_dist = self.graph[current].distance + 1   # set the tentative distance
-
-            for neighbour in current_neighbours:
-                if not self.graph[neighbour].visited:
-                    # Update distance, previous, fscore
-                    if tentative_dist < self.graph[neighbour].distance:
-                        self.graph[neighbour].distance = tentative_dist
-                        self.graph[neighbour].previous = current
-
-                    # Add the node to the openset set
-                    if not self.graph[neighbour].inset:
-                        self.graph[neighbour].inset = True
-                        openset.insert((tentative_dist, neighbour))
-                        self.render_node(neighbour, param.PURPLE)
-            if speed is None:
-                time.sleep(0.0025)
-                pygame.display.update() # update display
-        #no paths are found
-        return -1
-
-    def astar(self, source, target, speed=None):
+            The search itself is done by search.dijkstra, or by
+            search.bidirectional_dijkstra if bidirectional is true
+        """
+        animation = self.animation('dijkstra') if speed is None else None
+        return self.search('dijkstra', source, target, animation, bidirectional)
+
+    def astar(self, source, target, speed=None, bidirectional=False):
         """
             The A* algorithm is an extention of Dijkstra where a heuristic is applied to
             guide the search towards the target node. The heuristic of choice here
@@ -379,50 +620,29 @@ class Grid:
             Inputs: the source node and the target node
             Outputs: The computed path and the length
 
-            Helper Function:
-                find_neighbours(node): finds the neighbours for the current node
-                heuristic(node, target): computes the heuristic value
-        """
-        openset = minh.MinHeap()
-        self.graph[source].distance = 0     # set the distance of source to 0
-        # pre-compute the heuristic value for all nodes
-        heuristic_value = dict((node, heuristic(node, target)) for node in self.graph)
-        # compute the fscore (fscore = distance + heuristic)
-        self.graph[source].fscore = self.graph[source].distance + heuristic_value[source]
-        # insert source node (fscore, dist, node)
-        openset.insert((self.graph[source].fscore, self.graph[source].distance, source))
-
-        while openset:
-            # Set the current node as the node with minimum fscore value
-            extracted_min = openset.extract_min()
-            current = extracted_min[2]
-
-            if current == target:           # reached the target! return path
-                return self.find_path(target)
-
-            self.graph[current].visited = True                  # mark current as visited
-            self.render_node(current, param.LT_BLUE)            # render the current node
-            current_neighbours = self.find_neighbours(current)  # find neighbours
-            tentative_dist = self.graph[current].distance + 1   # set the tentative distance
-
-            for neighbour in current_neighbours:
-                if not self.graph[neighbour].visited:
-                    # Update distance, previous, fscore
-                    if tentative_dist < self.graph[neighbour].distance:
-                        self.graph[neighbour].distance = tentative_dist
-                        self.graph[neighbour].previous = current
-                        self.graph[neighbour].fscore = tentative_dist + heuristic_value[neighbour]
-
-                    # Add the node to the openset set
-                    if not self.graph[neighbour].inset:
-                        self.graph[neighbour].inset = True
-                        openset.insert((self.graph[neighbour].fscore, tentative_dist, neighbour))
-                        self.render_node(neighbour, param.PURPLE)
-            if speed is None:
-                time.sleep(0.0075)
-                pygame.display.update() # update display
-        #no paths are found
-        return -1
+            The search itself is done by search.astar, or by
+            search.bidirectional_astar if bidirectional is true
+        """
+        animation = self.animation('astar') if speed is None else None
+        return self.search('astar', source, target, animation, bidirectional)
+
+    def alt(self, source, target, speed=None, bidirectional=False):
+        """
+            A* with the ALT heuristic. A few landmarks are chosen on the map and
+            the exact distance from each of them to every cell is stored. The
+            triangle inequality then gives a lower bound on the distance to the
+            target that takes the walls into account, so far fewer nodes are
+            expanded in mazes than with the Manhattan distance.
+
+            The landmarks are chosen the first time and again whenever the walls
+            or the moves (the Diagonal toggle) have changed. The search itself is done by search.astar (or
+            search.bidirectional_astar) with a landmarks.Landmarks heuristic
+        """
+        if self.landmarks is None or self.landmarks.map is not self.map:
+            self.landmarks = lm.Landmarks(self.map, param.LANDMARKS)
+        animation = self.animation('alt') if speed is None else None
+        return self.search('astar', source, target, animation, bidirectional, \
+            heuristic=self.landmarks)
 
     def greedy(self, source, target, speed=None):
         """
@@ -448,49 +668,12 @@ class Grid:
             Inputs: source node and target node
             Outputs: path from source to target, not guaranteed optimal
 
-            Helper function:
-                find_neighbours(node): finds the neighbours of a node
-                heuristic(node, target): computes the heuristic value
-        """
-        openset = minh.MinHeap()
-        self.graph[source].distance = 0         # set the initial distance to 0
-        # pre-compute the heuristic value for all nodes
-        heuristic_value = dict((node, heuristic(node, target)) for node in self.graph)
-        openset.insert((heuristic_value[source], source))      # insert source to openset set
-
-        while openset:
-            # Set the current node as the node with minimum heuristic value
-            extracted_min = openset.extract_min()
-            current = extracted_min[1]
-
-            if current == target:   #reached the target! return path
-                return self.find_path(target)
-
-            self.graph[current].visited = True                  # mark as visited
-            self.render_node(current, param.LT_BLUE)            # render current node
-            current_neighbours = self.find_neighbours(current)  # find neighbours
-            tentative_dist = self.graph[current].distance + 1   # set the tentative distance
-
-            for neighbour in current_neighbours:
-                # Compute the distance (heuristic) of all neighbours and add to openset set
-                if not self.graph[neighbour].visited:
-                    # Update previous, distance if tentative distance is better
-                    if tentative_dist < self.graph[neighbour].distance:
-                        self.graph[neighbour].previous = current
-                        self.graph[neighbour].distance = tentative_dist
-
-                    # Insert into openset
-                    if not self.graph[neighbour].inset:
-                        self.graph[neighbour].inset = True
-                        openset.insert((heuristic_value[neighbour], neighbour))
-                        self.render_node(neighbour, param.PURPLE)
-            if speed is None:
-                time.sleep(0.04)
-                pygame.display.update()
-        # no paths found
-        return -1
-
-    def bfs(self, source, target, speed=None):
+            The search itself is done by search.greedy
+        """
+        animation = self.animation('greedy') if speed is None else None
+        return self.search('greedy', source, target, animation)
+
+    def bfs(self, source, target, speed=None, bidirectional=False):
         """
             The breadth-first search algorithm searches through each node of the
             current depth of the graph before moving onto the next depth level. BFS
@@ -498,138 +681,35 @@ class Grid:
             the path found is optimal (from the source to target node). If the graph
             has no edge weights then the search will be the same as Dijkstra
 
-            The data structure for this algorithm will be a queue. I will be using
-            collections.deque instead of implenting one from scratch
-        """
-        openset = deque()
-        self.graph[source].distance = 0     # set initial distance to 0
-        openset.append(source)              # insert the source node into the open set
-
-        while openset:
-            current = openset.popleft()
-
-            if current == target:   # reached the target! return path
-                return self.find_path(target)
-
-            self.graph[current].visited = True                  # mark as visited
-            self.render_node(current, param.LT_BLUE)            # render current node
-            current_neighbours = self.find_neighbours(current)  # find neighbours
-            tentative_dist = self.graph[current].distance + 1   # tentative distance
-
-            for neighbour in current_neighbours:
-                if not self.graph[neighbour].visited:
-                    if tentative_dist < self.graph[neighbour].distance:
-                        # update the previous and distance
-                        self.graph[neighbour].previous = current
-                        self.graph[neighbour].distance = self.graph[current].distance + 1
-
-                    # add the neighbour into the queue if it wasn't in it before
-                    if not self.graph[neighbour].inset:
-                        self.graph[neighbour].inset = True
-                        openset.append(neighbour)
-                        self.render_node(neighbour, param.PURPLE)
-            if speed is None:
-                pygame.display.update()
-        # no paths found!
-        return -1
+            The search itself is done by search.bfs, or by
+            search.bidirectional_bfs if bidirectional is true
+        """
+        animation = self.animation('bfs') if speed is None else None
+        return self.search('bfs', source, target, animation, bidirectional)
 
     def dfs(self, source, target, speed=None):
         """
             DFS (depth first search) looks at the maze as a tree and searches along the height
             of the tree first. This kind of search is not optimal so it will not return the
             shortest path
+
+            The search itself is done by search.dfs
+        """
+        animation = self.animation('dfs') if speed is None else None
+        return self.search('dfs', source, target, animation)
+
+    def jps(self, source, target, speed=None):
+        """
+            Jump Point Search is A* for uniform-cost grids that skips over the
+            nodes along straight corridors and open rooms. It only expands the
+            jump points, nodes where the optimal path could change direction, and
+            finds a path of the same length as A*.
+
+            The search itself is done by search.jump_point_search, which only
+            moves along the cardinal directions and counts every move as 1. On
+            an 8-connected map or a map with terrain costs search.astar is used
+            instead
         """
-        openset = deque()
-        self.graph[source].distance = 0     # set initial distance to 0
-        openset.append(source)
-
-        while openset:
-            current = openset.pop()
-
-            if current == target:       # reached target! return path
-                return self.find_path(target)
-
-            self.graph[current].visited = True                  # mark current node as visited
-            self.render_node(current, param.LT_BLUE)            # render the current node
-            current_neighbours = self.find_neighbours(current)  # find neighbours
-
-            for neighbour in current_neighbours:
-                if not self.graph[neighbour].visited:
-                    self.graph[neighbour].previous = current
-                    self.graph[neighbour].distance = self.graph[current].distance + 1
-
-                    # add the neighbour into the queue if it wasn't in it before
-                    if not self.graph[neighbour].inset:
-                        self.graph[neighbour].inset = True
-                        openset.append(neighbour)
-                        self.render_node(neighbour, param.PURPLE)
-            if speed is None:
-                pygame.display.update()
-                time.sleep(0.03)
-        # no path found
-        return -1
-
-        # def dijkstra(self, source, target, speed=None):
-        # """
-        #     Dijkstra's algorithm finds the shortest path between a source and target node.
-        #         1) All nodes are initially unvisited
-        #         2) set the source node as the current node
-        #         3) Initialize the tentative distance of the source node as 0
-        #             all other nodes have distance of infinity
-        #         4) While target node is unvisited
-        #             a) compute the distance between current node and each neighbour node
-        #             b) if computed distance is smaller than replace as current distance
-        #             c) remove the current node from the unvisited list and continue
-        #         5) Display result
-
-        #     Inputs: the source node and the target node.
-        #     Outputs: the computed path and its length. If there are no paths then return -1
-
-        #     Helper function
-        #         find_neighbours(node): used to help compute neighbours for a given node.
-        # """
-        # unvisited = minh.MinHeap()          # build the min heap priority queue
-        # self.graph[source].distance = 0     # set the distance of source to 0
-        # unvisited.build_heap([(self.graph[node].distance, node) for node in self.graph])
-
-        # while unvisited:
-        #     extracted_min = unvisited.extract_min()   # set current and extract from unvisited
-        #     current = extracted_min[1]
-
-        #     if current == target:   # at the target node! don't need to search further
-        #         return self.find_path(target)
-
-        #     if self.graph[current].distance == math.inf:
-        #         # the distance is inf only when there's no other nodes to consider
-        #         return -1
-
-        #     if self.graph[current].status == 'wall':
-        #         # skip the current node if it's a wall since we can't traverse it
-        #         continue
-
-        #     self.graph[current].visited = True                  # mark current as visited
-        #     self.render_node(current, param.LT_BLUE)            # render the curent node
-        #     tentative_dist = self.graph[current].distance + 1   # tentative distance
-        #     current_neighbours = self.find_neighbours(current)  # find neighbours
-
-        #     for neighbour in current_neighbours:
-        #         # Check if the current path found is better than the previously record one
-        #         if not self.graph[neighbour].visited and \
-        #             tentative_dist < self.graph[neighbour].distance:
-
-        #             # update distance and previous
-        #             self.graph[neighbour].distance = tentative_dist
-        #             self.graph[neighbour].previous = current
-
-        #             # update priority queue
-        #             for index, node in enumerate(unvisited.items()):
-        #                 if node == 0:   # skip the 0th element
-        #                     continue
-        #                 if neighbour == node[1]:
-        #                     unvisited.decrease_key(index, (tentative_dist, neighbour))
-        #             self.render_node(neighbour, param.PURPLE)
-        #     if speed is None:
-        #         time.sleep(0.0003)
-        #         pygame.display.update()
-        # # no path found
-        # return -1
+        animation = self.animation('jps') if speed is None else None
+        algorithm = 'jps' if self.map.uniform() else 'astar'
+        return self.search(algorithm, source, target, animation)
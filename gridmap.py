@@ -0,0 +1,590 @@
+"""
+    gridmap.py contains the compact array representation of the grid.
+
+    Instead of one Node object per cell, the grid is stored as a handful of
+    flat typed arrays. A cell at (x, y) is stored at the linear index
+    y * width + x, the same numbering used by main.convert2single.
+
+    GridMap Class:
+        init:
+            width: the number of cells along the x axis
+            height: the number of cells along the y axis
+            size: the total number of cells (width * height)
+            cells: bytearray holding the status code of every cell, or a
+                read-only view of cells shared with other processes
+            costs: bytearray of the cost (1 to 255) of moving into every cell
+            distance: int32 array of the computed distance from the source
+            previous: int32 array of the index of the previous cell on the path
+            fscore: int32 array of the computed fscore (distance + heuristic)
+            visited: bytearray flagging the cells that have been expanded
+            inset: bytearray flagging the cells that have been added to the open set
+            reverse_distance: int32 array of the computed distance to the target
+                (used by the backward half of the bidirectional searches)
+            reverse_previous: int32 array of the index of the next cell towards the target
+
+            stamp: uint32 array of the epoch in which each cell was last touched
+            epoch: the number of the current search
+            touched: list of the cells touched by the current search
+
+        The visited and inset flags are bit masks. One-way searches only use the
+        FORWARD bit, bidirectional searches set BACKWARD for the cells reached
+        from the target.
+
+        The search state of a cell (distance, previous, fscore, visited, inset and
+        the reverse arrays) only counts if the cell is stamped with the current
+        epoch. Starting a new search just increases the epoch, which makes every
+        cell stale in O(1). A search calls touch(index) the first time it sees a
+        cell, which resets that one cell and stamps it.
+
+        The search state arrays are only created the first time they are used,
+        so making a GridMap over a large cells buffer (a memory mapped map file
+        for example) costs nothing until it is searched.
+
+        Terrain costs are kept apart from the status codes: the cost of a move
+        is the cost of the cell moved into, read from costs with the same
+        index as cells. Every cell costs 1 until a cost is set, so the
+        searches index the array the same way on weighted and unweighted maps.
+
+        A map is 4-connected (left, right, top and bottom neighbours) unless
+        set_connectivity makes it 8-connected. A diagonal move then costs 14
+        and a straight move 10 ('integer', every distance stays an integer
+        and the bucket queues still work) or sqrt(2) and 1 ('exact', the
+        distances become floats). A diagonal move is only allowed past open
+        cells: without corner cutting both cells beside the move must be open,
+        with corner cutting one of them is enough, so a move never slips
+        between two walls that touch at a corner. Either way two cells joined
+        by a diagonal move are also joined through the open cell beside it,
+        so the connected regions are the same as on the 4-connected map. The
+        cost of moving into a cell is the cost of the move times the cost of
+        the cell.
+
+        The neighbours of a cell are read from a table built once from the
+        walls: links holds one byte per cell whose bit k is set when the
+        move by offsets[k] is allowed, and moves[mask] is the tuple of the
+        offsets allowed by a mask. A search iterates over
+        moves[links[current]] without building a list or checking bounds and
+        walls. set_status patches the masks of the 3x3 block around a cell
+        whose wall changed, so the masks are always current without looking
+        at the rest of the map.
+
+        version counts the edits of the map. set_status, set_cost,
+        clear_costs and set_connectivity raise it whenever the walls, costs
+        or moves change, so anything computed from the map (cached paths,
+        landmark tables, connected regions) only has to compare one integer
+        to know it is still valid. Cells or costs written directly, by this
+        process or another one sharing the buffers, are not seen by the
+        version or the neighbour masks; call invalidate() after such writes.
+"""
+
+import math
+from array import array
+
+# Status codes stored in GridMap.cells
+EMPTY = 0
+WALL = 1
+START = 2
+END = 3
+
+STATUS_NAMES = ('empty', 'wall', 'start', 'end')
+STATUS_CODES = {'empty': EMPTY, 'wall': WALL, 'start': START, 'end': END,
+                'source': START, 'target': END}
+
+# Translation table from status codes to 1 for walls and 0 for everything else
+WALL_TABLE = bytes(code == WALL for code in range(256))
+# and from the 0 and 1 of a wall layout to 1 for open cells and 0 for walls
+OPEN_TABLE = bytes(code == 0 for code in range(256))
+
+INF = 2**31 - 1     # distance of a cell that has not been reached
+MAX_COST = 255      # largest cost of a cell, costs are stored in one byte
+NO_PARENT = -1      # previous of a cell that has not been reached
+
+# Neighbours of a cell on a map, see GridMap.set_connectivity
+CONNECTIVITY = (4, 8)
+
+# Costs of a (straight, diagonal) move on an 8-connected map by name
+DIAGONAL_COSTS = {
+    'integer': (10, 14),
+    'exact': (1, math.sqrt(2)),
+}
+
+# Bits of the visited and inset flags
+FORWARD = 1
+BACKWARD = 2
+
+# Search state arrays of a GridMap: name -> (array typecode or None for a
+# bytearray, value of a cell that has not been touched)
+SEARCH_STATE = {
+    'distance': ('i', INF),
+    'previous': ('i', NO_PARENT),
+    'fscore': ('i', INF),
+    'visited': (None, 0),
+    'inset': (None, 0),
+    'reverse_distance': ('i', INF),
+    'reverse_previous': ('i', NO_PARENT),
+    'stamp': ('I', 0),
+}
+
+# Search state arrays that hold costs, arrays of doubles when a diagonal move
+# costs sqrt(2)
+COST_STATE = ('distance', 'fscore', 'reverse_distance')
+
+class GridMap:
+    """
+        Init:
+            width: the number of cells along the x axis
+            height: the number of cells along the y axis
+            cells: optional buffer with the status code of every cell. The
+                GridMap uses it without copying, a read-only buffer (such as
+                a view of shared memory) gives a map whose walls cannot change
+            costs: optional buffer with the cost of every cell, used the same
+                way as cells. Made with every cost 1 the first time it is used
+            connectivity: 4 or 8, the number of neighbours of a cell
+            diagonal: the name of the DIAGONAL_COSTS of an 8-connected map
+            corner_cutting: true if a diagonal move only needs one of the two
+                cells beside it to be open
+            straight_cost: the cost of a straight move, 1 on a 4-connected map
+            diagonal_cost: the cost of a diagonal move, two straight moves on
+                a 4-connected map
+            offsets: the index offsets of the neighbours of a cell, the
+                straight ones first
+            steps: dictionary of index offset -> the cost of that move
+            links: bytearray of the neighbour mask of every cell, bit k is set
+                if the move by offsets[k] is allowed. Made the first time it
+                is used
+            moves: the offsets of the moves allowed by each mask, a tuple for
+                every possible mask
+            version: the number of edits of the walls, costs or moves
+            weighted_at: (version, weighted()) of the last version the costs
+                were counted for
+
+        Methods:
+            index(node): converts an (x, y) node into its linear index
+            coords(index): converts a linear index into its (x, y) node
+            in_bounds(node): returns true if the node lies on the grid
+            is_wall(node): returns true if the node is a wall
+            status(index): returns the status name of a cell
+            set_status(index, name): sets the status of a cell by name
+            walls(): returns the wall layout as bytes of 0 and 1
+            changed_walls(layout): returns the walls and the cells whose wall
+                differs from an older wall layout
+            catch_up(version, applied): returns the version a copy of the walls
+                is valid for after it applied some wall changes itself
+            open_neighbours(index, walls): returns the straight neighbours of a
+                cell that are open in a wall layout
+            set_cost(index, cost): sets the cost of moving into a cell
+            weighted(): returns true if some cell costs more than 1
+            max_cost(): returns the largest cost of a cell
+            clear_costs(): sets the cost of every cell back to 1
+            invalidate(): raises the version and drops the neighbour masks after
+                cells or costs were written directly
+            set_connectivity(connectivity, diagonal, corner_cutting): chooses
+                the neighbours of a cell and the cost of a diagonal move
+            movement(): returns the arguments of set_connectivity of the map
+            uniform(): returns true if every move costs 1
+            max_move_cost(): returns the largest cost of a single move
+            neighbours(index): returns the indices of the neighbours which are not walls
+            link(index): computes the neighbour mask of one cell
+            build_links(): computes the neighbour mask of every cell
+            relink(index): patches the masks around a cell whose wall changed
+            adjacency(): returns the neighbour masks
+            reset(): resets the search state of every cell
+            touch(index): resets and stamps a cell the first time a search sees it
+            is_current(index): returns true if the cell was touched by the current search
+            reset_cell(index): resets the search state of one cell
+    """
+    def __init__(self, width, height, cells=None, costs=None):
+        self.width = width
+        self.height = height
+        self.size = width * height
+        if cells is None:
+            cells = bytearray(self.size)
+        elif len(cells) != self.size:
+            raise ValueError('expected {} cells, got {}'.format(self.size, len(cells)))
+        self.cells = cells
+        if costs is not None:
+            if len(costs) != self.size:
+                raise ValueError('expected {} costs, got {}'.format(self.size, len(costs)))
+            self.costs = costs
+        self.epoch = 1
+        self.touched = []
+        self.version = 0
+        self.weighted_at = (-1, False)
+        self.set_connectivity(4)
+
+    def __getattr__(self, name):
+        """
+            Creates a search state array, the costs or the neighbour masks the
+            first time they are used
+        """
+        if name == 'costs':
+            self.costs = bytearray(b'\x01') * self.size
+            return self.costs
+        if name == 'links':
+            self.build_links()
+            return self.links
+        if name not in SEARCH_STATE:
+            raise AttributeError(name)
+        typecode, default = SEARCH_STATE[name]
+        if name in COST_STATE and isinstance(self.diagonal_cost, float):
+            typecode = 'd'
+        if typecode is None:
+            values = bytearray(self.size)
+        else:
+            values = array(typecode, [default]) * self.size
+        setattr(self, name, values)
+        return values
+
+    def index(self, node):
+        """
+            Converts an (x, y) node into its linear index y * width + x
+        """
+        return node[1] * self.width + node[0]
+
+    def coords(self, index):
+        """
+            Converts a linear index into its (x, y) node
+        """
+        return (index % self.width, index // self.width)
+
+    def in_bounds(self, node):
+        """
+            Returns true if the node lies on the grid
+        """
+        return 0 <= node[0] < self.width and 0 <= node[1] < self.height
+
+    def is_wall(self, node):
+        """
+            Returns true if the node is a wall and cannot be traversed
+        """
+        return self.cells[node[1] * self.width + node[0]] == WALL
+
+    def status(self, index):
+        """
+            Returns the status name of a cell
+        """
+        return STATUS_NAMES[self.cells[index]]
+
+    def set_status(self, index, name):
+        """
+            Sets the status of a cell by name ('empty', 'wall', 'start', 'end').
+        The neighbour masks around the cell are patched if its wall changed
+        """
+        code = STATUS_CODES[name]
+        wall = code == WALL
+        changed = wall != (self.cells[index] == WALL)
+        self.cells[index] = code
+        if changed:
+            self.version += 1
+            if 'links' in self.__dict__:
+                self.relink(index)
+
+    def walls(self):
+        """
+            Returns the wall layout as bytes with 1 for walls and 0 for every
+            other cell. The start and end cells do not change the layout
+        """
+        if isinstance(self.cells, memoryview):
+            return self.cells.tobytes().translate(WALL_TABLE)
+        return self.cells.translate(WALL_TABLE)
+
+    def changed_walls(self, layout):
+        """
+            Returns the current walls and a list of the cells whose wall
+            differs from layout, an older wall layout of the map. The layouts
+            are compared a row at a time so unchanged rows are skipped quickly
+        """
+        walls = self.walls()
+        if walls == layout:
+            return walls, []
+        width, changed = self.width, []
+        for start in range(0, self.size, width):
+            if walls[start:start + width] != layout[start:start + width]:
+                changed.extend(index for index in range(start, start + width) \
+                    if walls[index] != layout[index])
+        return walls, changed
+
+    def catch_up(self, version, applied):
+        """
+            Returns the version a copy of the walls (such as the walls of the
+            region labels) is valid for after it applied applied wall changes
+            itself, starting from version. Every wall changed with set_status
+            raises the version by one, so if the map moved on by exactly
+            applied edits those were the only ones and the copy is current.
+            Otherwise version is returned and the copy is compared in full
+            the next time it is updated
+        """
+        if self.version == version + applied:
+            return self.version
+        return version
+
+    def open_neighbours(self, index, walls):
+        """
+            Returns the left, right, top and bottom neighbours of a cell that
+            are open in the wall layout walls, which may be older than the cells
+        """
+        width = self.width
+        neighbours = []
+        if index % width and not walls[index - 1]:
+            neighbours.append(index - 1)
+        if index % width < width - 1 and not walls[index + 1]:
+            neighbours.append(index + 1)
+        if index >= width and not walls[index - width]:
+            neighbours.append(index - width)
+        if index < self.size - width and not walls[index + width]:
+            neighbours.append(index + width)
+        return neighbours
+
+    def set_cost(self, index, cost):
+        """
+            Sets the cost of moving into a cell, an integer from 1 to MAX_COST
+        """
+        if not 1 <= cost <= MAX_COST:
+            raise ValueError('cell costs must be between 1 and {}'.format(MAX_COST))
+        if self.costs[index] != cost:
+            self.costs[index] = cost
+            self.version += 1
+
+    def weighted(self):
+        """
+            Returns true if moving into some cell costs more than 1. The costs
+            are only counted once per version of the map
+        """
+        if 'costs' not in self.__dict__:
+            return False
+        version, weighted = self.weighted_at
+        if version != self.version:
+            costs = self.costs
+            if isinstance(costs, memoryview):
+                costs = costs.tobytes()
+            weighted = costs.count(1) != self.size
+            self.weighted_at = (self.version, weighted)
+        return weighted
+
+    def max_cost(self):
+        """
+            Returns the largest cost of moving into a cell
+        """
+        return max(self.costs) if self.weighted() else 1
+
+    def clear_costs(self):
+        """
+            Sets the cost of every cell back to 1
+        """
+        if 'costs' in self.__dict__:
+            self.costs[:] = bytearray(b'\x01') * self.size
+            self.version += 1
+
+    def invalidate(self):
+        """
+            Raises the version of the map and drops the neighbour masks, they
+            are built again when next used. Call it after writing cells or
+            costs directly instead of through set_status and set_cost
+        """
+        self.version += 1
+        self.__dict__.pop('links', None)
+
+    def set_connectivity(self, connectivity=4, diagonal='integer', corner_cutting=False):
+        """
+            Makes the map 4-connected or 8-connected. diagonal names the
+            DIAGONAL_COSTS of an 8-connected map and corner_cutting allows a
+            diagonal move with only one of the cells beside it open. The
+            offsets and move costs are computed once here for the searches
+        """
+        if connectivity not in CONNECTIVITY:
+            raise ValueError('Unknown connectivity: {}'.format(connectivity))
+        if diagonal not in DIAGONAL_COSTS:
+            raise ValueError('Unknown diagonal cost: {}'.format(diagonal))
+        width = self.width
+        if connectivity == 8 and width < 3:
+            # the offsets of a straight and a diagonal move would be the same
+            raise ValueError('an 8-connected map must be at least 3 cells wide')
+        floats = isinstance(self.__dict__.get('diagonal_cost'), float)
+        self.connectivity = connectivity
+        self.diagonal = diagonal
+        self.corner_cutting = corner_cutting
+        self.offsets = (-1, 1, -width, width)
+        if connectivity == 8:
+            self.straight_cost, self.diagonal_cost = DIAGONAL_COSTS[diagonal]
+            self.offsets += (-width - 1, -width + 1, width - 1, width + 1)
+        else:
+            self.straight_cost, self.diagonal_cost = 1, 2
+        self.steps = {offset: self.straight_cost if number < 4 else self.diagonal_cost \
+            for number, offset in enumerate(self.offsets)}
+        self.moves = [tuple(offset for bit, offset in enumerate(self.offsets) if mask >> bit & 1) \
+            for mask in range(1 << len(self.offsets))]
+        self.version += 1
+        if 'links' in self.__dict__:
+            self.build_links()
+        if floats != isinstance(self.diagonal_cost, float):
+            # the cost arrays change type, they are made again when next used
+            for name in COST_STATE:
+                self.__dict__.pop(name, None)
+            self.reset()
+
+    def movement(self):
+        """
+            Returns (connectivity, diagonal, corner_cutting), the arguments of
+            set_connectivity that give another map the same moves
+        """
+        return (self.connectivity, self.diagonal, self.corner_cutting)
+
+    def uniform(self):
+        """
+            Returns true if every move costs 1: the map is 4-connected and
+            has no terrain costs
+        """
+        return self.connectivity == 4 and not self.weighted()
+
+    def max_move_cost(self):
+        """
+            Returns the largest cost of a single move, a diagonal move into
+            the most expensive cell on an 8-connected map
+        """
+        longest = self.diagonal_cost if self.connectivity == 8 else self.straight_cost
+        return longest * self.max_cost()
+
+    def neighbours(self, index):
+        """
+            Returns the indices of the neighbours of a cell, the left, right,
+            top and bottom neighbours and on an 8-connected map the diagonal
+            ones after them. Cells outside the grid and walls are not included
+        """
+        return [index + offset for offset in self.moves[self.links[index]]]
+
+    def link(self, index):
+        """
+            Returns the neighbour mask of a cell computed from its cells: bit
+            k is set if the move by offsets[k] is allowed. A diagonal move is
+            allowed if the cells beside it are open (one of them with corner
+            cutting)
+        """
+        cells, width = self.cells, self.width
+        xpos = index % width
+        has_left = xpos > 0
+        has_right = xpos < width - 1
+        has_up = index >= width
+        has_down = index < self.size - width
+        open_left = has_left and cells[index-1] != WALL
+        open_right = has_right and cells[index+1] != WALL
+        open_up = has_up and cells[index-width] != WALL
+        open_down = has_down and cells[index+width] != WALL
+        mask = open_left | open_right << 1 | open_up << 2 | open_down << 3
+        if self.connectivity == 4:
+            return mask
+
+        if self.corner_cutting:
+            pass_up_left = open_left or open_up
+            pass_up_right = open_right or open_up
+            pass_down_left = open_left or open_down
+            pass_down_right = open_right or open_down
+        else:
+            pass_up_left = open_left and open_up
+            pass_up_right = open_right and open_up
+            pass_down_left = open_left and open_down
+            pass_down_right = open_right and open_down
+        if pass_up_left and has_left and has_up and cells[index-width-1] != WALL:
+            mask |= 1 << 4
+        if pass_up_right and has_right and has_up and cells[index-width+1] != WALL:
+            mask |= 1 << 5
+        if pass_down_left and has_left and has_down and cells[index+width-1] != WALL:
+            mask |= 1 << 6
+        if pass_down_right and has_right and has_down and cells[index+width+1] != WALL:
+            mask |= 1 << 7
+        return mask
+
+    def build_links(self):
+        """
+            Computes the neighbour mask of every cell. The open cells are
+            read into one big integer with a byte per cell, so shifting it by
+            whole bytes lines every cell up with a neighbour and each bit of
+            the masks is computed for the whole map in a few integer operations
+        """
+        width, size = self.width, self.size
+        walls = self.walls()
+        everything = (1 << 8 * size) - 1
+        opened = int.from_bytes(walls.translate(OPEN_TABLE), 'little')
+        not_first = int.from_bytes((b'\x00' + b'\x01' * (width - 1)) * self.height, 'little')
+        not_last = int.from_bytes((b'\x01' * (width - 1) + b'\x00') * self.height, 'little')
+
+        def beside(offset):
+            # for every cell, 1 if the cell at index + offset is open
+            if offset > 0:
+                return opened >> 8 * offset
+            return (opened << -8 * offset) & everything
+
+        left = beside(-1) & not_first
+        right = beside(1) & not_last
+        up = beside(-width)
+        down = beside(width)
+        links = left | right << 1 | up << 2 | down << 3
+        if self.connectivity == 8:
+            passes = (lambda first, second: first | second) if self.corner_cutting \
+                else (lambda first, second: first & second)
+            links |= (beside(-width - 1) & not_first & passes(left, up)) << 4
+            links |= (beside(-width + 1) & not_last & passes(right, up)) << 5
+            links |= (beside(width - 1) & not_first & passes(left, down)) << 6
+            links |= (beside(width + 1) & not_last & passes(right, down)) << 7
+        self.links = bytearray(links.to_bytes(size, 'little'))
+
+    def relink(self, index):
+        """
+            Recomputes the masks around a cell whose wall changed: its
+            neighbours move into it and the diagonal moves of the cells next
+            to it pass beside it
+        """
+        width, links = self.width, self.links
+        xpos, ypos = index % width, index // width
+        for row in range(max(ypos - 1, 0), min(ypos + 2, self.height)):
+            for column in range(max(xpos - 1, 0), min(xpos + 2, width)):
+                cell = row * width + column
+                links[cell] = self.link(cell)
+
+    def adjacency(self):
+        """
+            Returns the neighbour masks, building them the first time. They are
+            kept up to date by set_status and set_connectivity, so this is
+            O(1) and does not look at the walls
+        """
+        return self.links
+
+    def reset(self):
+        """
+            Resets the search state of every cell so a new search can start.
+            This only moves on to the next epoch, the cells are reset when
+            they are touched
+        """
+        self.epoch += 1
+        self.touched = []
+        if self.epoch >= 1 << (8 * array('I').itemsize):
+            # the epoch counter wrapped around, clear the stamps for real
+            self.stamp = array('I', [0]) * self.size
+            self.epoch = 1
+
+    def touch(self, index):
+        """
+            Resets the search state of a cell and stamps it with the current
+            epoch. Does nothing if the cell has already been touched
+        """
+        if self.stamp[index] == self.epoch:
+            return
+        self.stamp[index] = self.epoch
+        self.distance[index] = INF
+        self.previous[index] = NO_PARENT
+        self.fscore[index] = INF
+        self.visited[index] = 0
+        self.inset[index] = 0
+        self.reverse_distance[index] = INF
+        self.reverse_previous[index] = NO_PARENT
+        self.touched.append(index)
+
+    def is_current(self, index):
+        """
+            Returns true if the search state of the cell belongs to the current search
+        """
+        return self.stamp[index] == self.epoch
+
+    def reset_cell(self, index):
+        """
+            Resets the search state of a single cell
+        """
+        self.stamp[index] = 0
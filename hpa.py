@@ -0,0 +1,393 @@
+"""
+    hpa.py contains hierarchical path-finding (HPA*) for large maps.
+
+    A flat search expands every cell between the source and the target, which
+    costs too much per query on maps thousands of cells wide. HPA* splits the
+    map into square clusters and builds a small abstract graph once:
+        entrances: every run of open cells along the border of two clusters
+            whose cells are open on both sides. A short run gets one pair of
+            transition cells in its middle, a run of ENTRANCE_SPLIT cells or
+            more gets a pair at each end
+        inter edges: each transition cell is linked to the cell facing it in
+            the other cluster with cost 1
+        intra edges: the transition cells of a cluster are linked to each other
+            with their distance inside the cluster, found with a breadth-first
+            search that does not leave the cluster
+
+    A query links the source and target to the transition cells of their
+    clusters, runs A* on the abstract graph and then refines each abstract
+    edge of the result into cells, searching only inside the one cluster the
+    edge crosses. The path is not always the shortest one (it must go through
+    the transition cells) but it is usually within a few percent of it.
+
+    The edges count every move as 1 and the abstract search uses the
+    Manhattan distance, so the map must be 4-connected without terrain costs
+    (GridMap.uniform); other maps raise ValueError, as jump point search does.
+
+    When walls change only the clusters holding the changed cells are rebuilt,
+    together with the entrances on their borders. A neighbouring cluster only
+    gets new intra edges if its transition cells changed.
+
+    Example:
+        hierarchy = Hierarchy(gridmap, 16)
+        result = hierarchy.find((0, 0), (900, 700))
+"""
+
+from collections import deque
+import minheap as minh
+import gridmap as gm
+import search
+
+CLUSTER_SIZE = 16       # cells along each side of a cluster
+ENTRANCE_SPLIT = 6      # entrances at least this long get two transitions
+
+class Hierarchy:
+    """
+        Init:
+            map: the GridMap to plan on
+            size: the number of cells along each side of a cluster
+            columns: the number of clusters along the x axis
+            rows: the number of clusters along the y axis
+            entrances: dict of (cluster, cluster) -> list of (cell, cell)
+                transition pairs on the border of two neighbouring clusters,
+                the first cluster is the left or upper one
+            inter: dict of transition cell -> list of the cells facing it
+                in neighbouring clusters
+            nodes: the transition cells of each cluster
+            intra: the intra edges of each cluster, dict of transition cell ->
+                list of (cell, distance) inside the cluster
+            walls: the wall layout the abstract graph was built for
+            version: the GridMap.version the abstract graph was built for
+            rebuilt: the number of clusters rebuilt by the last update
+
+        Methods:
+            cluster(index): returns the cluster holding a cell index
+            bounds(cluster): returns the (x0, y0, x1, y1) cells of a cluster
+            build(): builds the whole abstract graph
+            update(): rebuilds the clusters whose walls changed since the last update
+            cells_changed(nodes): rebuilds the clusters holding the (x, y) nodes
+            find(source, target, observer): returns a SearchResult with a path
+                from source to target
+    """
+    def __init__(self, gridmap, size=CLUSTER_SIZE):
+        if size < 2:
+            raise ValueError('Clusters must be at least 2 cells wide')
+        if not gridmap.uniform():
+            raise ValueError('HPA* needs a 4-connected map without terrain costs')
+        self.map = gridmap
+        self.size = size
+        self.columns = -(-gridmap.width // size)
+        self.rows = -(-gridmap.height // size)
+        self.rebuilt = 0
+        self.build()
+
+    def cluster(self, index):
+        """
+            Returns the number of the cluster holding a cell index
+        """
+        width = self.map.width
+        return (index // width // self.size) * self.columns + index % width // self.size
+
+    def bounds(self, cluster):
+        """
+            Returns the cells (x0, y0, x1, y1) covered by a cluster, x1 and y1
+            are excluded
+        """
+        xpos = cluster % self.columns * self.size
+        ypos = cluster // self.columns * self.size
+        return (xpos, ypos, min(xpos + self.size, self.map.width), \
+            min(ypos + self.size, self.map.height))
+
+    def borders(self, cluster):
+        """
+            Returns the (cluster, cluster) keys of the borders of a cluster
+            with its left, right, upper and lower neighbours
+        """
+        column, row = cluster % self.columns, cluster // self.columns
+        keys = []
+        if column > 0:
+            keys.append((cluster - 1, cluster))
+        if column < self.columns - 1:
+            keys.append((cluster, cluster + 1))
+        if row > 0:
+            keys.append((cluster - self.columns, cluster))
+        if row < self.rows - 1:
+            keys.append((cluster, cluster + self.columns))
+        return keys
+
+    def build(self):
+        """
+            Builds the entrances and the intra edges of every cluster
+        """
+        count = self.columns * self.rows
+        self.version = self.map.version
+        self.walls = self.map.walls()
+        self.entrances = {}
+        self.inter = {}
+        self.nodes = [[] for _ in range(count)]
+        self.intra = [{} for _ in range(count)]
+        for cluster in range(count):
+            for key in self.borders(cluster):
+                if key[0] == cluster:
+                    self.link(key)
+        for cluster in range(count):
+            self.nodes[cluster] = self.transitions(cluster)
+            self.connect(cluster)
+        self.rebuilt = count
+
+    def scan(self, key):
+        """
+            Returns the transition pairs of the border between two clusters
+        """
+        first, second = key
+        width, walls = self.map.width, self.walls
+        x0, y0, x1, y1 = self.bounds(first)
+        # with a single column of clusters the cluster below is also first + 1
+        if second == first + self.columns:  # horizontal border, step along the rows
+            cells = range((y1 - 1) * width + x0, (y1 - 1) * width + x1)
+            across = width
+        else:                               # vertical border, step down the columns
+            cells = range(y0 * width + x1 - 1, (y1 - 1) * width + x1, width)
+            across = 1
+
+        pairs = []
+        run = []
+        for cell in list(cells) + [None]:
+            if cell is not None and not walls[cell] and not walls[cell + across]:
+                run.append(cell)
+                continue
+            if len(run) >= ENTRANCE_SPLIT:
+                pairs.append((run[0], run[0] + across))
+                pairs.append((run[-1], run[-1] + across))
+            elif run:
+                middle = run[len(run) // 2]
+                pairs.append((middle, middle + across))
+            run = []
+        return pairs
+
+    def link(self, key):
+        """
+            Replaces the transition pairs and inter edges of a border
+        """
+        inter = self.inter
+        for pair in self.entrances.get(key, ()):
+            for cell, other in (pair, pair[::-1]):
+                inter[cell].remove(other)
+                if not inter[cell]:
+                    del inter[cell]
+        self.entrances[key] = self.scan(key)
+        for pair in self.entrances[key]:
+            for cell, other in (pair, pair[::-1]):
+                inter.setdefault(cell, []).append(other)
+
+    def transitions(self, cluster):
+        """
+            Returns the sorted transition cells of a cluster
+        """
+        cells = set()
+        for key in self.borders(cluster):
+            side = 0 if key[0] == cluster else 1
+            cells.update(pair[side] for pair in self.entrances[key])
+        return sorted(cells)
+
+    def sweep(self, source, cluster, goal=None):
+        """
+            Breadth-first search from the source cell that does not leave the
+            cluster. Stops early once the goal cell is reached.
+
+            Returns (distance, previous), dicts over the cells reached
+        """
+        width = self.map.width
+        neighbours = self.map.neighbours
+        x0, y0, x1, y1 = self.bounds(cluster)
+        distance = {source: 0}
+        previous = {source: source}
+        queue = deque([source])
+        while queue:
+            current = queue.popleft()
+            if current == goal:
+                break
+            following = distance[current] + 1
+            for neighbour in neighbours(current):
+                if neighbour not in distance and x0 <= neighbour % width < x1 \
+                    and y0 <= neighbour // width < y1:
+                    distance[neighbour] = following
+                    previous[neighbour] = current
+                    queue.append(neighbour)
+        return distance, previous
+
+    def connect(self, cluster):
+        """
+            Computes the intra edges between the transition cells of a cluster
+        """
+        nodes = self.nodes[cluster]
+        edges = {cell: [] for cell in nodes}
+        for number, cell in enumerate(nodes[:-1]):
+            distance = self.sweep(cell, cluster)[0]
+            for other in nodes[number + 1:]:
+                if other in distance:
+                    edges[cell].append((other, distance[other]))
+                    edges[other].append((cell, distance[other]))
+        self.intra[cluster] = edges
+
+    def rebuild(self, clusters):
+        """
+            Rebuilds the entrances around the given clusters and the intra
+            edges of every cluster whose walls or transition cells changed
+        """
+        dirty = set(clusters)
+        keys = {key for cluster in dirty for key in self.borders(cluster)}
+        for key in keys:
+            self.link(key)
+        for cluster in {cluster for key in keys for cluster in key} | dirty:
+            nodes = self.transitions(cluster)
+            if cluster in dirty or nodes != self.nodes[cluster]:
+                self.nodes[cluster] = nodes
+                self.connect(cluster)
+                self.rebuilt += 1
+
+    def update(self):
+        """
+            Rebuilds the clusters whose walls changed since the abstract graph
+            was last built or updated. Returns the number of clusters rebuilt.
+            Nothing is compared while the version of the map is the same
+        """
+        self.rebuilt = 0
+        if self.map.version == self.version:
+            return 0
+        walls, changed = self.map.changed_walls(self.walls)
+        self.version = self.map.version
+        if not changed:
+            return 0
+        self.walls = walls
+        self.rebuild({self.cluster(index) for index in changed})
+        return self.rebuilt
+
+    def cells_changed(self, nodes):
+        """
+            Rebuilds the clusters holding the given (x, y) nodes after their
+            status changed (for example a wall was drawn)
+        """
+        walls = bytearray(self.walls)
+        clusters = set()
+        applied = 0
+        for node in nodes:
+            index = self.map.index(node)
+            wall = self.map.cells[index] == gm.WALL
+            applied += wall != walls[index]
+            walls[index] = wall
+            clusters.add(self.cluster(index))
+        self.walls = bytes(walls)
+        self.version = self.map.catch_up(self.version, applied)
+        self.rebuilt = 0
+        self.rebuild(clusters)
+
+    def find(self, source, target, observer=None):
+        """
+            Finds a path from source to target through the abstract graph and
+            refines it into cells. The walls are checked for changes first.
+            Raises ValueError if the map is no longer 4-connected without
+            terrain costs.
+
+            The observer is notified of the transition cells opened and
+            expanded by the abstract search. The counters of the result are
+            those of the abstract search.
+
+            Inputs: the source node, the target node and an optional observer
+            Outputs: a SearchResult with the path found
+        """
+        if not self.map.uniform():
+            raise ValueError('HPA* needs a 4-connected map without terrain costs')
+        stats = search.SearchStats()
+        observer = search._observe(observer)
+        self.update()
+        gridmap = self.map
+        coords, width = gridmap.coords, gridmap.width
+        source, target = gridmap.index(source), gridmap.index(target)
+        if gridmap.cells[source] == gm.WALL or gridmap.cells[target] == gm.WALL:
+            return search.SearchResult(stats=stats)
+
+        # link the endpoints to the transition cells of their clusters
+        start, end = self.cluster(source), self.cluster(target)
+        extra = {source: [], target: []}
+        reached = self.sweep(source, start)[0]
+        if start == end and target in reached:
+            extra[source].append((target, reached[target]))
+        for cell in self.nodes[start]:
+            if cell in reached:
+                extra[source].append((cell, reached[cell]))
+        reached = self.sweep(target, end)[0]
+        for cell in self.nodes[end]:
+            if cell in reached:
+                extra.setdefault(cell, []).append((target, reached[cell]))
+        stats.phase('setup')
+
+        target_x, target_y = target % width, target // width
+        def estimate(index):
+            return abs(index % width - target_x) + abs(index // width - target_y)
+        stats.phase('heuristic')
+
+        # A* over the transition cells
+        distance = {source: 0}
+        previous = {source: source}
+        closed = set()
+        openset = minh.IndexedMinHeap()
+        openset.insert(source, (estimate(source), 0))
+        expanded = opened = generated = decreased = 0
+        peak, found = 1, False
+        while openset:
+            current = openset.extract_min()[1]
+            if current == target:
+                found = True
+                break
+            closed.add(current)
+            expanded += 1
+            if observer is not None:
+                observer('visit', coords(current))
+            edges = self.intra[self.cluster(current)].get(current, [])
+            edges = edges + [(cell, 1) for cell in self.inter.get(current, ())] \
+                + extra.get(current, [])
+            generated += len(edges)
+            for neighbour, cost in edges:
+                tentative = distance[current] + cost
+                if neighbour in closed or tentative >= distance.get(neighbour, gm.INF):
+                    continue
+                distance[neighbour] = tentative
+                previous[neighbour] = current
+                priority = (tentative + estimate(neighbour), tentative)
+                if neighbour in openset:
+                    openset.decrease_key(neighbour, priority)
+                    decreased += 1
+                else:
+                    opened += 1
+                    openset.insert(neighbour, priority)
+                    if observer is not None:
+                        observer('open', coords(neighbour))
+            if len(openset) > peak:
+                peak = len(openset)
+            if observer is not None:
+                observer('step', None)
+        stats.phase('search')
+        stats.count(expanded, generated, opened + 1, expanded + found, decreased, peak)
+        if not found:
+            stats.phase('path')
+            return search.SearchResult(None, expanded, opened, stats)
+
+        # refine every abstract edge into cells
+        abstract = [target]
+        while abstract[-1] != source:
+            abstract.append(previous[abstract[-1]])
+        abstract.reverse()
+        path = [source]
+        for cell, following in zip(abstract, abstract[1:]):
+            cluster = self.cluster(cell)
+            if cluster != self.cluster(following):     # inter edge, one step
+                path.append(following)
+                continue
+            steps = self.sweep(cell, cluster, following)[1]
+            segment = [following]
+            while segment[-1] != cell:
+                segment.append(steps[segment[-1]])
+            path.extend(reversed(segment[:-1]))
+        stats.phase('path')
+        return search.SearchResult([coords(index) for index in path], expanded, opened, stats)
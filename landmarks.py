@@ -0,0 +1,217 @@
+"""
+    landmarks.py contains the ALT heuristic (A*, Landmarks and the Triangle
+    inequality).
+
+    The Manhattan distance ignores walls, so in a maze it is far below the
+    real distance and A* expands almost as many nodes as Dijkstra. ALT picks a
+    few cells as landmarks and stores the exact distance from every landmark
+    to every cell. For any landmark L the triangle inequality gives
+
+        dist(node, target) >= |dist(L, target) - dist(L, node)|
+
+    so the largest of these bounds (and the Manhattan distance) is an
+    admissible and consistent heuristic that knows about the walls.
+
+    Landmark selection strategies:
+        'farthest': each new landmark is the cell farthest from the landmarks
+            chosen so far (starting from the cell farthest from a random cell)
+        'border': the open cells closest to points spread along the border
+        'random': random open cells
+
+    The distance tables count moves and are swept with a breadth-first search
+    from each landmark. Every move costs at least a straight move, so the
+    bounds times the cost of a straight move are lower bounds on weighted and
+    8-connected maps too, where the octile distance takes the place of the
+    Manhattan distance. The tables are kept as compact unsigned arrays. They
+    are only valid for the walls and the moves (GridMap.movement) they were
+    computed on: a table of 4-connected moves overestimates on an 8-connected
+    map. When either changes the tables are rebuilt the next time the
+    heuristic is used.
+
+    Example:
+        alt = Landmarks(gridmap, 8)
+        search.find(gridmap, source, target, 'astar', heuristic=alt)
+"""
+
+import random
+from array import array
+from collections import deque
+import gridmap as gm
+
+STRATEGIES = ('farthest', 'border', 'random')
+
+def sweep(gridmap, source, typecode='I'):
+    """
+        Breadth-first search over the whole map from the source index.
+
+        Returns an array with the distance of every cell from the source,
+        the largest value of the typecode for cells that cannot be reached
+    """
+    unreachable = (1 << (8 * array(typecode).itemsize)) - 1
+    table = array(typecode, [unreachable]) * gridmap.size
+    table[source] = 0
+    links, moves = gridmap.adjacency(), gridmap.moves
+    queue = deque([source])
+    while queue:
+        current = queue.popleft()
+        following = table[current] + 1
+        for offset in moves[links[current]]:
+            neighbour = current + offset
+            if table[neighbour] == unreachable:
+                table[neighbour] = following
+                queue.append(neighbour)
+    return table
+
+class Landmarks:
+    """
+        Init:
+            map: the GridMap the landmarks are placed on
+            count: the number of landmarks
+            strategy: how the landmarks are chosen, one of STRATEGIES
+            seed: seed of the random choices of the strategies
+            typecode: the array type of the distance tables, 'H' (16 bits)
+                when every distance fits, 'I' otherwise
+            unreachable: the table value of cells a landmark cannot reach
+            nodes: the cell indices of the landmarks
+            tables: the distance table of each landmark
+            walls: the wall layout the tables were computed for
+            movement: the GridMap.movement the tables were computed for
+            version: the GridMap.version the tables were last checked against
+
+        Methods:
+            update(): recomputes the landmarks and tables if the walls or moves changed
+            select(): chooses the landmarks and sweeps their tables
+            estimator(gridmap, target): returns the ALT estimate function for
+                the target index, used by search.make_heuristic
+    """
+    def __init__(self, gridmap, count=8, strategy='farthest', seed=0):
+        if strategy not in STRATEGIES:
+            raise ValueError('Unknown landmark strategy: {}'.format(strategy))
+        self.map = gridmap
+        self.count = count
+        self.strategy = strategy
+        self.seed = seed
+        self.typecode = 'H' if gridmap.size < 0xffff else 'I'
+        self.unreachable = (1 << (8 * array(self.typecode).itemsize)) - 1
+        self.nodes = []
+        self.tables = []
+        self.walls = None
+        self.movement = None
+        self.version = None
+        self.update()
+
+    def update(self):
+        """
+            Chooses the landmarks again if the walls or the moves of the map
+            changed since the tables were computed. Nothing is compared while
+            the version of the map is the same. Returns true if they were
+            recomputed
+        """
+        if self.map.version == self.version:
+            return False
+        self.version = self.map.version
+        walls, movement = self.map.walls(), self.map.movement()
+        if walls == self.walls and movement == self.movement:
+            return False     # only the terrain costs changed
+        self.walls = walls
+        self.movement = movement
+        self.select()
+        return True
+
+    def select(self):
+        """
+            Chooses the landmarks with the strategy and sweeps their tables
+        """
+        gridmap = self.map
+        rng = random.Random(self.seed)
+        open_cells = [index for index in range(gridmap.size) if gridmap.cells[index] != gm.WALL]
+        self.nodes = []
+        self.tables = []
+        if not open_cells:
+            return
+
+        if self.strategy == 'random':
+            self.nodes = rng.sample(open_cells, min(self.count, len(open_cells)))
+            self.tables = [sweep(gridmap, node, self.typecode) for node in self.nodes]
+        elif self.strategy == 'border':
+            self.nodes = self.border_cells(open_cells)
+            self.tables = [sweep(gridmap, node, self.typecode) for node in self.nodes]
+        else:
+            self.farthest(rng.choice(open_cells))
+
+    def border_cells(self, open_cells):
+        """
+            Returns the open cells closest to count points spread evenly
+            around the border of the map
+        """
+        width, height = self.map.width, self.map.height
+        perimeter = 2 * (width + height)
+        nodes = []
+        for number in range(self.count):
+            position = number * perimeter // self.count
+            if position < width:
+                point = (position, 0)
+            elif position < width + height:
+                point = (width - 1, position - width)
+            elif position < 2 * width + height:
+                point = (2 * width + height - 1 - position, height - 1)
+            else:
+                point = (0, perimeter - 1 - position)
+            closest = min(open_cells, key=lambda index: \
+                abs(index % width - point[0]) + abs(index // width - point[1]))
+            if closest not in nodes:
+                nodes.append(closest)
+        return nodes
+
+    def farthest(self, start):
+        """
+            Farthest point selection: the first landmark is the cell farthest
+            from start and every following landmark is the reachable cell
+            whose closest landmark is the farthest away
+        """
+        unreachable = self.unreachable
+        closest = sweep(self.map, start, self.typecode)
+        for _ in range(self.count):
+            best, node = 0, None
+            for index, value in enumerate(closest):
+                if value != unreachable and value > best:
+                    best, node = value, index
+            if node is None:        # every reachable cell is a landmark
+                return
+            table = sweep(self.map, node, self.typecode)
+            if self.nodes:
+                closest = array(self.typecode, map(min, closest, table))
+            else:       # start itself is not a landmark
+                closest = table
+            self.nodes.append(node)
+            self.tables.append(table)
+
+    def estimator(self, gridmap, target):
+        """
+            Returns a function that gives the ALT lower bound on the distance
+            from a cell index to the target index. The landmarks are updated
+            first if the walls or moves changed
+        """
+        if gridmap is not self.map:
+            raise ValueError('The landmarks were computed for a different map')
+        self.update()
+        width, unreachable = gridmap.width, self.unreachable
+        straight = gridmap.straight_cost
+        saving = gridmap.diagonal_cost - 2 * straight     # 0 on a 4-connected map
+        target_x, target_y = target % width, target // width
+        # landmarks that cannot reach the target give no bound
+        bounds = [(table, table[target]) for table in self.tables \
+            if table[target] != unreachable]
+
+        def estimate(index):
+            delta_x, delta_y = abs(index % width - target_x), abs(index // width - target_y)
+            best = straight * (delta_x + delta_y) + saving * min(delta_x, delta_y)
+            for table, to_target in bounds:
+                to_node = table[index]
+                if to_node != unreachable:
+                    bound = straight * (to_target - to_node if to_target > to_node \
+                        else to_node - to_target)
+                    if bound > best:
+                        best = bound
+            return best
+        return estimate
@@ -4,9 +4,10 @@
 
 import sys
 import random
-import time
+import argparse
 import pygame
 import grid as g
+import animation as anim
 import parameters as param
 import button as bt
 
@@ -14,7 +15,8 @@ import button as bt
 def convert2single(xpos, ypos):
     """
     Helper function that converts an (x,y) coordinate to a
-    single number using the formula y * MAXY + x
+    single number using the formula y * MAXY + x. This is the
+    index used by the arrays of gridmap.GridMap
     """
     return ypos * param.LIMIT + xpos
 
@@ -22,116 +24,139 @@ def convert2xy(num):
     """
     Helper function that converts a single number to an
     (x,y) coordinate. X is computed by num % MAXY and Y
-    is computed by num / MAXY
+    is computed by num // MAXY
     """
     x_pos = num % param.LIMIT
-    y_pos = num / param.LIMIT
+    y_pos = num // param.LIMIT
     return (x_pos, y_pos)
 
-def render_walls(graph, mousepos, display):
+def empty_colour(gridmap, node):
     """
-    This function renders the walls onto the display
+    Returns the colour of an empty cell, which shows the cost of its terrain
+    """
+    cost = gridmap.costs[gridmap.index(node)] if gridmap.weighted() else 1
+    return param.TERRAIN_COLOURS.get(cost, param.BROWN)
+
+def render_walls(graph, mousepos, renderer, brush=param.BRUSHES[0]):
+    """
+    This function renders the walls, or the terrain of the brush, onto the display
     """
     (xpos, ypos) = (mousepos[0] // param.NODE_SIZE, mousepos[1] // param.NODE_SIZE)
+    _, cost, colour = brush
 
     # only colour empty nodes within the grid
     if graph.graph[xpos, ypos].status == 'empty' and mousepos[1] < param.HEIGHT:
-        # locate the top left corner position of the square
-        xstart = xpos * param.NODE_SIZE
-        ystart = ypos * param.NODE_SIZE
-        # colour in the obstacle
-        pygame.draw.rect(display, param.BLACK, \
-            [xstart, ystart, param.NODE_SIZE, param.NODE_SIZE])
-        # change the status of nodes that have become obstacles ('wall')
-        graph.graph[xpos, ypos].status = 'wall'
-
-def render_path(source, target, path, display, speed=None):
+        # colour in the obstacle or the terrain
+        renderer.draw_cell((xpos, ypos), colour)
+        if cost is None:
+            # change the status of nodes that have become obstacles ('wall')
+            graph.set_status((xpos, ypos), 'wall')
+        else:
+            graph.map.set_cost(graph.map.index((xpos, ypos)), cost)
+
+def render_path(source, target, path, renderer, speed=None):
     """
-    This function renders the computed path onto the display
+    This function renders the computed path onto the display. Unless a
+    speed is given the path is animated one cell at a time
     """
+    canvas = renderer if speed is not None else \
+        anim.Animation(renderer, param.STEPS_PER_FRAME['path'])
     for node in reversed(path):
         # Don't colour in the source and target node
         if node in [source, target]:
             continue
-        xstart = node[0] * param.NODE_SIZE
-        ystart = node[1] * param.NODE_SIZE
         # colour in the path
-        pygame.draw.rect(display, param.YELLOW, \
-            [xstart, ystart, param.NODE_SIZE, param.NODE_SIZE])
-        if speed is None:
-            time.sleep(0.03)
-            pygame.display.update()
+        canvas.draw_cell(node, param.YELLOW)
+        canvas.step()
+    if speed is None:
+        canvas.play()
 
-def render_node(node, colour, display):
+def render_node(node, colour, renderer):
     """
     This function renders a cell onto the grid corresponding to
     the node
     """
-    startx = node[0] * param.NODE_SIZE
-    starty = node[1] * param.NODE_SIZE
-    # render the colour
-    pygame.draw.rect(display, colour, \
-        [startx, starty, param.NODE_SIZE, param.NODE_SIZE]) # (x, y, width, height)
+    renderer.draw_cell(node, colour)
 
-def clear_path(graph, display):
+def clear_path(graph, renderer):
     """
-    Clear all paths and search process from previous search
+    Clear all paths and search process from previous search.
+    Only the cells touched by the previous search are redrawn and
+    the search parameters are reset by starting a new epoch
     """
-    for node in graph:
-        graph[node].reset_parameters()
+    gridmap = graph.map
+    for index in gridmap.touched:
+        node = gridmap.coords(index)
         if graph[node].status in ['empty']:
-            render_node(node, param.CREAM, display)
+            render_node(node, empty_colour(gridmap, node), renderer)
         if graph[node].status in ['start']:
-            render_node(node, param.RED, display)
+            render_node(node, param.RED, renderer)
         if graph[node].status in ['end']:
-            render_node(node, param.GREEN, display)
+            render_node(node, param.GREEN, renderer)
+    gridmap.reset()
 
-def clear_everything(graph, display):
+def clear_everything(graph, renderer):
     """
-    Resets the board completely
+    Resets the board completely, the terrain costs included
     """
+    graph.map.reset()
+    graph.map.clear_costs()
     for node in graph:
-        graph[node].reset_parameters()
         if graph[node].status in ['empty', 'wall']:
             graph[node].status = 'empty'
-            render_node(node, param.CREAM, display)
+            render_node(node, param.CREAM, renderer)
         if graph[node].status in ['start']:
-            render_node(node, param.RED, display)
+            render_node(node, param.RED, renderer)
         if graph[node].status in ['end']:
-            render_node(node, param.GREEN, display)
+            render_node(node, param.GREEN, renderer)
 
-def start():
+def start(map_path=None):
     """
-    Main function that handles most of the rendering and logic
+    Main function that handles most of the rendering and logic.
+    If a map file is given the grid is loaded from it and pressing S saves
+    the grid back to it (to param.MAP_PATH otherwise)
     """
     # Variables for click and drag functions
     clicked = False
     clicked_node = None
     drag = False
     alg_selected = ''
+    bidirectional = False
+    brush = 0       # index of the brush in param.BRUSHES painted by right dragging
+    diagonal = False
 
     # initiate pygame
     pygame.init()
     pygame.display.set_caption('Path Finding Visualizer')
-    display = pygame.display.set_mode((param.WIDTH, param.HEIGHT+100))
+    display = pygame.display.set_mode((param.WIDTH, param.HEIGHT+param.MENU_HEIGHT))
     display.fill(param.CREAM)
 
     # Initiate and render the grid
     grid = g.Grid(display)
     grid.build_graph()
+    renderer = grid.renderer
+    renderer.mark_all()
+
+    source = target = None
+    if map_path is not None:
+        source, target = grid.load_map(map_path)
+        if (grid.width, grid.height) != (param.LIMIT, param.LIMIT):
+            print('The map in {} is {}x{}, only {}x{} maps can be shown'.format( \
+                map_path, grid.width, grid.height, param.LIMIT, param.LIMIT))
+            pygame.quit()
+            sys.exit(1)
 
     # Initiate and draw the start and end nodes
-    source = (random.randint(1, param.LIMIT-2), random.randint(1, param.LIMIT-2))
-    target = (random.randint(1, param.LIMIT-2), random.randint(1, param.LIMIT-2))
-
-    while source == target: # if the source and target are the same then re-randomize
+    while source is None or target is None or source == target or \
+        grid.is_wall(source) or grid.is_wall(target):
+        # if the source and target are missing, the same or walls then re-randomize
         source = (random.randint(1, param.LIMIT-2), random.randint(1, param.LIMIT-2))
         target = (random.randint(1, param.LIMIT-2), random.randint(1, param.LIMIT-2))
 
     grid.graph[source].status = 'start'
     grid.graph[target].status = 'end'
-    render_node(source, param.RED, display)     # render source node (red)
-    render_node(target, param.GREEN, display)   # render target node (green)
+    render_node(source, param.RED, renderer)     # render source node (red)
+    render_node(target, param.GREEN, renderer)   # render target node (green)
 
     # Set up the buttons
     buttons= []
@@ -151,6 +176,14 @@ def start():
         param.HEIGHT+param.BT_HEIGHT+8, param.BT_WIDTH, param.BT_HEIGHT, 'Reset')
     escape = bt.Button(reset.xpos + param.BT_WIDTH + param.BUFFER, param.HEIGHT+param.BT_HEIGHT+8, \
         param.BT_WIDTH, param.BT_HEIGHT, 'Quit')
+    bfs = bt.Button(2, param.HEIGHT+2*param.BT_HEIGHT+12, \
+        param.BT_WIDTH, param.BT_HEIGHT, 'BFS')
+    bidir = bt.Button(bfs.xpos + param.BT_WIDTH + param.BUFFER, \
+        param.HEIGHT+2*param.BT_HEIGHT+12, param.BT_WIDTH, param.BT_HEIGHT, 'Bidirectional: Off')
+    jps = bt.Button(bidir.xpos + param.BT_WIDTH + param.BUFFER, \
+        param.HEIGHT+2*param.BT_HEIGHT+12, param.BT_WIDTH, param.BT_HEIGHT, 'Jump Point')
+    alt = bt.Button(jps.xpos + param.BT_WIDTH + param.BUFFER, \
+        param.HEIGHT+2*param.BT_HEIGHT+12, param.BT_WIDTH, param.BT_HEIGHT, 'A* (Landmarks)')
 
     buttons.append(dijk)
     buttons.append(astar)
@@ -160,6 +193,18 @@ def start():
     buttons.append(recursive)
     buttons.append(reset)
     buttons.append(escape)
+    buttons.append(bfs)
+    buttons.append(bidir)
+    buttons.append(jps)
+    paint = bt.Button(2, param.HEIGHT+3*param.BT_HEIGHT+16, \
+        param.BT_WIDTH, param.BT_HEIGHT, 'Brush: ' + param.BRUSHES[brush][0])
+
+    diag = bt.Button(paint.xpos + param.BT_WIDTH + param.BUFFER, \
+        param.HEIGHT+3*param.BT_HEIGHT+16, param.BT_WIDTH, param.BT_HEIGHT, 'Diagonal: Off')
+
+    buttons.append(alt)
+    buttons.append(paint)
+    buttons.append(diag)
 
     # draw the buttons
     for bts in buttons:
@@ -193,22 +238,24 @@ def start():
                         clicked_node = cell_num
 
                 elif event.button == 1:     # button management
-                    algorithms = [dijk, astar, greedy, dfs]
-                    other_functions = [randmaze, recursive, reset, escape]
+                    algorithms = [dijk, astar, greedy, dfs, bfs, jps, alt]
+                    other_functions = [randmaze, recursive, reset, escape, bidir, paint, diag]
 
                     for alg in algorithms:      # loop through algorithms
                         if alg.ypos < mousepos[1] < alg.ypos + alg.height and \
                             alg.xpos < mousepos[0] < alg.xpos + alg.width:
 
-                            clear_path(grid.graph, display)   # clear the previous results
+                            clear_path(grid.graph, renderer)   # clear the previous results
 
                             # compute the solution
                             solution = -1
                             if alg == dijk:
-                                solution = grid.dijkstra(source, target)
+                                solution = grid.dijkstra(source, target, \
+                                    bidirectional=bidirectional)
                                 alg_selected = 'dijk'
                             elif alg == astar:
-                                solution = grid.astar(source, target)
+                                solution = grid.astar(source, target, \
+                                    bidirectional=bidirectional)
                                 alg_selected = 'astar'
                             elif alg == greedy:
                                 solution = grid.greedy(source, target)
@@ -216,10 +263,21 @@ def start():
                             elif alg == dfs:
                                 solution = grid.dfs(source, target)
                                 alg_selected = 'dfs'
+                            elif alg == bfs:
+                                solution = grid.bfs(source, target, \
+                                    bidirectional=bidirectional)
+                                alg_selected = 'bfs'
+                            elif alg == jps:
+                                solution = grid.jps(source, target)
+                                alg_selected = 'jps'
+                            elif alg == alt:
+                                solution = grid.alt(source, target, \
+                                    bidirectional=bidirectional)
+                                alg_selected = 'alt'
 
                             if solution != -1:
                                 # render in the blocks for the path found
-                                render_path(source, target, solution, display)
+                                render_path(source, target, solution, renderer)
 
                     for func in other_functions:    # loop through other functions
                         if func.ypos < mousepos[1] < func.ypos + func.height and \
@@ -227,27 +285,47 @@ def start():
 
                             if func == randmaze:
                                 # generate obstacles randomly
-                                clear_everything(grid.graph, display)   # resets board
+                                clear_everything(grid.graph, renderer)   # resets board
                                 grid.generate_obstacles()
-                                render_node(source, param.RED, display)
-                                render_node(target, param.GREEN, display)
+                                render_node(source, param.RED, renderer)
+                                render_node(target, param.GREEN, renderer)
                                 alg_selected = ''
                             if func == recursive:
                                 # generate a perfect maze with recursive backtracking
-                                clear_everything(grid.graph, display)
+                                clear_everything(grid.graph, renderer)
                                 grid.recursive_backtracking()
-                                render_node(source, param.RED, display)
-                                render_node(target, param.GREEN, display)
+                                render_node(source, param.RED, renderer)
+                                render_node(target, param.GREEN, renderer)
                                 alg_selected = ''
                             if func == reset:
                                 start()
                             if func == escape:
                                 pygame.quit()
                                 sys.exit()
+                            if func == bidir:
+                                # toggle the bidirectional versions of dijkstra, A* and BFS
+                                bidirectional = not bidirectional
+                                bidir.message = 'Bidirectional: ' + \
+                                    ('On' if bidirectional else 'Off')
+                            if func == paint:
+                                # switch to the next brush painted by right dragging
+                                brush = (brush + 1) % len(param.BRUSHES)
+                                paint.message = 'Brush: ' + param.BRUSHES[brush][0]
+                            if func == diag:
+                                # toggle the diagonal moves of every search
+                                diagonal = not diagonal
+                                grid.map.set_connectivity(8 if diagonal else 4, \
+                                    param.DIAGONAL_COST, param.CORNER_CUTTING)
+                                diag.message = 'Diagonal: ' + ('On' if diagonal else 'Off')
 
                 elif event.button == 3: # left click starts drag mode
                     drag = True
 
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_s:
+                # save the grid to a map file
+                grid.save_map(map_path or param.MAP_PATH, source, target)
+                print('Saved the grid to', map_path or param.MAP_PATH)
+
             elif event.type == pygame.MOUSEBUTTONUP:
                 # update click variables
                 clicked = False
@@ -260,7 +338,7 @@ def start():
                 if xpos >= param.LIMIT or ypos >= param.LIMIT:
                     # mouse out of bounds
                     continue
-                render_walls(grid, mousepos, display)
+                render_walls(grid, mousepos, renderer, param.BRUSHES[brush])
 
             elif event.type == pygame.MOUSEMOTION and clicked:
                 # move the node if it's in source or target
@@ -276,38 +354,48 @@ def start():
 
                     if clicked_node == source: # render new location of node
                         if alg_selected == '':
-                            render_node(clicked_node, param.CREAM, display)
-                        render_node(cell_num, param.RED, display)
+                            render_node(clicked_node, empty_colour(grid.map, clicked_node), \
+                                renderer)
+                        render_node(cell_num, param.RED, renderer)
                         clicked_node = source = cell_num
                     elif clicked_node == target:
                         if alg_selected == '':
-                            render_node(clicked_node, param.CREAM, display)
-                        render_node(cell_num, param.GREEN, display)
+                            render_node(clicked_node, empty_colour(grid.map, clicked_node), \
+                                renderer)
+                        render_node(cell_num, param.GREEN, renderer)
                         clicked_node = target = cell_num
                     grid.graph[source].status = 'source'
                     grid.graph[target].status = 'target'
 
                     # compute new solution if a solution was computed before
                     solution = -1
-                    if alg_selected == 'dijk':
-                        clear_path(grid.graph, display)
-                        solution = grid.dijkstra(source, target, 1)
-                    elif alg_selected == 'astar':
-                        clear_path(grid.graph, display)
-                        solution = grid.astar(source, target, 1)
+                    if alg_selected in ('bfs', 'jps') and grid.map.connectivity == 8:
+                        clear_path(grid.graph, renderer)
+                        solution = grid.bfs(source, target, 1)
+                    elif alg_selected in ('dijk', 'astar', 'bfs', 'jps', 'alt'):
+                        # all of these find a shortest path, so the incremental
+                        # planner repairs the last path instead of searching again
+                        # (replan runs A* on maps with terrain costs or diagonal moves)
+                        clear_path(grid.graph, renderer)
+                        solution = grid.replan(source, target)
                     elif alg_selected == 'greedy':
-                        clear_path(grid.graph, display)
+                        clear_path(grid.graph, renderer)
                         solution = grid.greedy(source, target, 1)
                     elif alg_selected == 'dfs':
-                        clear_path(grid.graph, display)
+                        clear_path(grid.graph, renderer)
                         solution = grid.dfs(source, target, 1)
 
                     if solution != -1:
-                        render_path(source, target, solution, display, 1)
+                        render_path(source, target, solution, renderer, 1)
 
-        pygame.display.update()
+        # only the buttons and the cells that changed are sent to the screen
+        renderer.mark([0, param.HEIGHT, param.WIDTH, param.MENU_HEIGHT])
+        renderer.flush()
     pygame.quit()
     sys.exit()
 
 if __name__ == '__main__':
-    start()
+    parser = argparse.ArgumentParser(description='Path Finding Visualizer')
+    parser.add_argument('--map', dest='map_path', \
+        help='load the grid from a map file, pressing S saves the grid back to it')
+    start(parser.parse_args().map_path)
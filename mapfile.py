@@ -0,0 +1,90 @@
+"""
+    mapfile.py saves and loads grids in a compact binary format.
+
+    A map file is a fixed size header followed by one byte per cell:
+
+        offset  size  contents
+        0       4     magic number b'GMAP'
+        4       1     format version (1)
+        5       3     padding
+        8       4     width, unsigned little endian
+        12      4     height, unsigned little endian
+        16      4     index of the start cell, -1 if there is none
+        20      4     index of the end cell, -1 if there is none
+        24      w*h   the cells, 1 for walls and 0 for everything else
+
+    The cells are stored in the same order as GridMap.cells (y * width + x),
+    so a loaded map does not decode anything: the file is memory mapped and
+    the GridMap searches straight over the mapped bytes. The operating system
+    only reads the pages of the file that are actually used, so even a map
+    with millions of cells opens instantly.
+"""
+
+import os
+import mmap
+import struct
+import gridmap as gm
+
+MAGIC = b'GMAP'
+VERSION = 1
+HEADER = struct.Struct('<4sB3xIIii')
+
+def save(path, gridmap, source=None, target=None):
+    """
+        Saves the walls of gridmap and the (x, y) source and target nodes to
+        path. The file is written next to path and then renamed, so a map that
+        is loaded from path can be saved back to it
+    """
+    start = gridmap.index(source) if source is not None else -1
+    end = gridmap.index(target) if target is not None else -1
+    header = HEADER.pack(MAGIC, VERSION, gridmap.width, gridmap.height, start, end)
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as file:
+        file.write(header)
+        file.write(gridmap.walls())
+    os.replace(temporary, path)
+
+def read_header(data, path=''):
+    """
+        Unpacks and checks the header of a map file.
+
+        Returns (width, height, start index, end index)
+    """
+    if len(data) < HEADER.size:
+        raise ValueError('{} is too short to be a map file'.format(path))
+    magic, version, width, height, start, end = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError('{} is not a map file'.format(path))
+    if version != VERSION:
+        raise ValueError('{} has unsupported map format version {}'.format(path, version))
+    if len(data) != HEADER.size + width * height:
+        raise ValueError('{} should hold {} cells'.format(path, width * height))
+    return width, height, start, end
+
+def load(path, writable=False):
+    """
+        Memory maps the map file at path.
+
+        If writable is false the walls of the returned GridMap are read-only.
+        Otherwise the cells can be changed, the changes stay in memory and do
+        not change the file (copy on write), and the start and end nodes are
+        marked in the cells.
+
+        Returns (gridmap, source, target), source and target are (x, y) nodes
+        or None if the file has none
+    """
+    with open(path, 'rb') as file:
+        access = mmap.ACCESS_COPY if writable else mmap.ACCESS_READ
+        data = mmap.mmap(file.fileno(), 0, access=access)
+    width, height, start, end = read_header(data, path)
+    cells = memoryview(data)[HEADER.size:]
+
+    gridmap = gm.GridMap(width, height, cells)
+    source = gridmap.coords(start) if start != -1 else None
+    target = gridmap.coords(end) if end != -1 else None
+    if writable:
+        if source is not None:
+            gridmap.cells[start] = gm.START
+        if target is not None:
+            gridmap.cells[end] = gm.END
+    return gridmap, source, target
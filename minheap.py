@@ -7,6 +7,8 @@
 
 """
 
+import heapq
+
 class MinHeap:
     """
     Init:
@@ -133,3 +135,237 @@ class MinHeap:
         while index > 0:
             self.heapify_down(index)
             index -= 1
+
+class IndexedMinHeap:
+    """
+    A min heap that also keeps track of where each item is stored in the heap.
+    The position map lets decrease_key find an item in O(1) and fix the heap in
+    O(log n), so the searches can lower the priority of a queued node instead
+    of inserting it twice.
+
+    Init:
+        heap: array of (priority, item) pairs representing the heap
+        position: maps each item in the heap to its index in the heap array
+
+    Methods:
+        Constructor() - initializes an empty indexed binary heap
+        insert(item, priority) - inserts item into the heap with the given priority
+        decrease_key(item, priority) - lowers the priority of an item in the heap
+        push(item, priority) - inserts the item or lowers its priority if already queued
+        remove(item) - removes an item from the heap
+        priority(item) - returns the current priority of an item in the heap
+        find_min() - returns the (priority, item) pair with minimum priority
+        extract_min() - returns the (priority, item) pair with minimum priority and removes it
+    """
+    def __init__(self):
+        self.heap = [0]
+        self.position = {}
+
+    def __len__(self):
+        """
+            Returns the size of the heap.
+            There is a -1 because of the extra 0 at 0th index
+        """
+        return len(self.heap) - 1
+
+    def __contains__(self, item):
+        """
+            Returns true if the item is currently in the heap
+        """
+        return item in self.position
+
+    def swap(self, i, j):
+        """
+            Swaps two entries of the heap and updates their positions
+        """
+        heap = self.heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self.position[heap[i][1]] = i
+        self.position[heap[j][1]] = j
+
+    def heapify_up(self, index):
+        """
+            Moves the entry at index up until its parent is not larger than it
+        """
+        heap = self.heap
+        while index > 1 and heap[index][0] < heap[index // 2][0]:
+            self.swap(index, index // 2)
+            index //= 2
+
+    def heapify_down(self, index):
+        """
+            Moves the entry at index down until neither child is smaller than it
+        """
+        heap = self.heap
+        size = len(self)
+        while index * 2 <= size:
+            min_child = index * 2
+            if min_child + 1 <= size and heap[min_child + 1][0] < heap[min_child][0]:
+                min_child += 1
+            if not heap[min_child][0] < heap[index][0]:
+                break
+            self.swap(index, min_child)
+            index = min_child
+
+    def insert(self, item, priority):
+        """
+            Inserts an item that is not in the heap yet
+        """
+        self.heap.append((priority, item))
+        self.position[item] = len(self)
+        self.heapify_up(len(self))
+
+    def decrease_key(self, item, priority):
+        """
+            Lowers the priority of an item that is already in the heap
+        """
+        index = self.position[item]
+        if priority < self.heap[index][0]:
+            self.heap[index] = (priority, item)
+            self.heapify_up(index)
+
+    def push(self, item, priority):
+        """
+            Inserts the item if it is not in the heap, otherwise lowers its
+            priority if the new priority is smaller
+        """
+        if item in self.position:
+            self.decrease_key(item, priority)
+        else:
+            self.insert(item, priority)
+
+    def remove(self, item):
+        """
+            Removes an item from the heap. The last entry takes its place and is
+            moved up or down to restore the heap structure
+        """
+        index = self.position.pop(item)
+        last = self.heap.pop()
+        if index <= len(self):
+            self.heap[index] = last
+            self.position[last[1]] = index
+            self.heapify_up(index)
+            self.heapify_down(self.position[last[1]])
+
+    def priority(self, item):
+        """
+            Returns the priority an item currently has in the heap
+        """
+        return self.heap[self.position[item]][0]
+
+    def find_min(self):
+        """
+            returns the (priority, item) pair with minimum priority
+        """
+        return self.heap[1]
+
+    def extract_min(self):
+        """
+            returns the (priority, item) pair with minimum priority and removes
+            it from the heap
+        """
+        min_value = self.heap[1]
+        last = self.heap.pop()
+        del self.position[min_value[1]]
+        if len(self):
+            # move the last element to the root and heapify
+            self.heap[1] = last
+            self.position[last[1]] = 1
+            self.heapify_down(1)
+        return min_value
+
+class LazyHeap:
+    """
+    The standard library heapq with lazy deletion, with the same interface as
+    IndexedMinHeap. Lowering the priority of an item pushes a new entry and
+    leaves the old one in the heap, the stale entries are skipped when they
+    come out. heapq runs in C, so although the heap holds a few more entries
+    it is several times faster than the pure Python heaps (see bench_heap.py).
+
+    Init:
+        heap: heapq list of (priority, item) entries, stale ones included
+        priority_of: maps each queued item to its current priority
+
+    Methods:
+        Constructor() - initializes an empty heap
+        insert(item, priority) - inserts item into the heap with the given priority
+        decrease_key(item, priority) - lowers the priority of an item in the heap
+        push(item, priority) - inserts the item or lowers its priority if already queued
+        priority(item) - returns the current priority of an item in the heap
+        find_min() - returns the (priority, item) pair with minimum priority
+        extract_min() - returns the (priority, item) pair with minimum priority and removes it
+    """
+    def __init__(self):
+        self.heap = []
+        self.priority_of = {}
+
+    def __len__(self):
+        """
+            Returns the number of items queued, stale entries are not counted
+        """
+        return len(self.priority_of)
+
+    def __contains__(self, item):
+        """
+            Returns true if the item is currently in the heap
+        """
+        return item in self.priority_of
+
+    def insert(self, item, priority):
+        """
+            Inserts an item that is not in the heap yet
+        """
+        self.priority_of[item] = priority
+        heapq.heappush(self.heap, (priority, item))
+
+    def decrease_key(self, item, priority):
+        """
+            Lowers the priority of an item that is already in the heap, the
+            entry with the old priority becomes stale
+        """
+        if priority < self.priority_of[item]:
+            self.priority_of[item] = priority
+            heapq.heappush(self.heap, (priority, item))
+
+    def push(self, item, priority):
+        """
+            Inserts the item if it is not in the heap, otherwise lowers its
+            priority if the new priority is smaller
+        """
+        if item in self.priority_of:
+            self.decrease_key(item, priority)
+        else:
+            self.insert(item, priority)
+
+    def priority(self, item):
+        """
+            Returns the priority an item currently has in the heap
+        """
+        return self.priority_of[item]
+
+    def prune(self):
+        """
+            Drops the stale entries from the top of the heap
+        """
+        heap, priority_of = self.heap, self.priority_of
+        while priority_of.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+
+    def find_min(self):
+        """
+            returns the (priority, item) pair with minimum priority
+        """
+        self.prune()
+        return self.heap[0]
+
+    def extract_min(self):
+        """
+            returns the (priority, item) pair with minimum priority and removes
+            it from the heap
+        """
+        heap, priority_of = self.heap, self.priority_of
+        while True:
+            entry = heapq.heappop(heap)
+            if priority_of.get(entry[1]) == entry[0]:
+                del priority_of[entry[1]]
+                return entry
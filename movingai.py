@@ -0,0 +1,115 @@
+"""
+    movingai.py reads the grid benchmark formats of the Moving AI Lab
+    (https://movingai.com/benchmarks/formats.html).
+
+    A .map file is a short header followed by one line of characters per row:
+
+        type octile
+        height 3
+        width 4
+        map
+        ..@.
+        .T..
+        ....
+
+    '.', 'G' and 'S' are passable, every other character ('@', 'O', 'T', 'W')
+    is loaded as a wall.
+
+    A .scen file starts with a 'version 1' line and then holds one query per
+    line, separated by tabs:
+
+        bucket  map  map width  map height  start x  start y  goal x  goal y  optimal length
+
+    The optimal length in a scenario is measured with 8-connected (octile)
+    moves, it is kept as it is and not compared with 4-connected paths.
+"""
+
+import os
+import gridmap as gm
+
+PASSABLE = '.GS'
+
+class Scenario:
+    """
+        Init:
+            bucket: the difficulty bucket of the query
+            map_name: the map file named by the scenario
+            width: the width of the map
+            height: the height of the map
+            source: the (x, y) start node
+            target: the (x, y) goal node
+            optimal: the optimal octile path length given by the scenario
+    """
+    def __init__(self, bucket, map_name, width, height, source, target, optimal):
+        self.bucket = bucket
+        self.map_name = map_name
+        self.width = width
+        self.height = height
+        self.source = source
+        self.target = target
+        self.optimal = optimal
+
+    def __repr__(self):
+        return 'Scenario({}, {} -> {})'.format(self.map_name, self.source, self.target)
+
+def load_map(path):
+    """
+        Reads a .map file.
+
+        Returns a GridMap with its walls set, raises ValueError if the file
+        is not a valid map
+    """
+    with open(path, encoding='utf-8') as file:
+        lines = file.read().splitlines()
+
+    header = {}
+    row = 0
+    while row < len(lines) and lines[row].strip() != 'map':
+        fields = lines[row].split()
+        if len(fields) == 2:
+            header[fields[0]] = fields[1]
+        row += 1
+    if 'width' not in header or 'height' not in header or row == len(lines):
+        raise ValueError('{} is not a MovingAI map'.format(path))
+
+    width, height = int(header['width']), int(header['height'])
+    rows = lines[row + 1:row + 1 + height]
+    if len(rows) != height or any(len(line) < width for line in rows):
+        raise ValueError('{} should have {} rows of {} cells'.format(path, height, width))
+
+    gridmap = gm.GridMap(width, height)
+    for ypos, line in enumerate(rows):
+        for xpos in range(width):
+            if line[xpos] not in PASSABLE:
+                gridmap.cells[ypos * width + xpos] = gm.WALL
+    return gridmap
+
+def load_scenarios(path):
+    """
+        Reads a .scen file.
+
+        Returns the list of its Scenarios in the order of the file
+    """
+    scenarios = []
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            fields = line.split('\t') if '\t' in line else line.split()
+            if len(fields) < 9 or fields[0] == 'version':
+                continue
+            scenarios.append(Scenario(int(fields[0]), fields[1].strip(), \
+                int(fields[2]), int(fields[3]), (int(fields[4]), int(fields[5])), \
+                (int(fields[6]), int(fields[7])), float(fields[8])))
+    return scenarios
+
+def scenario_map_path(scenario_path, map_name):
+    """
+        Finds the map file named in a scenario. Scenarios name their map with
+        the path used by the benchmark sets (such as 'maps/dao/arena.map'), the
+        map is looked for next to the scenario file and then by that path
+    """
+    folder = os.path.dirname(scenario_path)
+    for candidate in (os.path.join(folder, os.path.basename(map_name)), \
+        os.path.join(folder, map_name), map_name):
+        if os.path.exists(candidate):
+            return candidate
+    raise FileNotFoundError('Cannot find the map {} of {}'.format(map_name, scenario_path))
@@ -10,12 +10,45 @@ HEIGHT = 800
 NODE_SIZE = 20
 LIMIT = WIDTH // NODE_SIZE    # total number of cells
 
+# Rendering parameters
+FPS = 60                  # maximum screen updates per second
+MAX_DIRTY_RECTS = 64      # above this many changed rectangles, update their bounding box
+
+# Animation parameters
+STEPS_PER_FRAME = {       # steps of each animation drawn per frame
+    'dijkstra': 7,
+    'astar': 2,
+    'greedy': 0.5,
+    'bfs': 10,
+    'dfs': 0.5,
+    'jps': 1,
+    'alt': 2,
+    'path': 0.5,          # cells of the path found
+    'obstacles': 16,      # random walls
+    'border': 3,          # cells of the border of the maze
+    'division': 0.25,     # walls of the recursive division maze
+}
+MAX_ANIMATION_TIME = 5    # seconds, longer animations are sped up to fit
+INSTANT_ANIMATION = False # draw every animation in one go
+
 # Button parameters
 NUM_BTS = 4               # buttons per row
 BUFFER = 8                # buffer spaces between buttons
 BT_HEIGHT = 45
+NUM_ROWS = 4              # rows of buttons below the grid
+MENU_HEIGHT = NUM_ROWS * (BT_HEIGHT + 4) + 4
 BT_WIDTH = ((WIDTH-4) - (BUFFER*(NUM_BTS-1))) // NUM_BTS
 
+# Number of landmarks of the ALT heuristic
+LANDMARKS = 8
+
+# Diagonal moves switched on with the Diagonal button (see GridMap.set_connectivity)
+DIAGONAL_COST = 'integer' # a diagonal move costs 14 and a straight move 10
+CORNER_CUTTING = False    # diagonal moves need both cells beside them open
+
+# Map file saved when S is pressed (unless main.py was started with --map)
+MAP_PATH = 'grid.gmap'
+
 # Font
 FONT_PATH = '/home/johnx/Projects/path-finding/misc/OpenSans-Semibold.ttf'
 
@@ -37,3 +70,18 @@ LT_YELLOW = (155, 155, 0)
 GREY = (143, 143, 143)
 LT_GREY = (175, 200, 175)
 BROWN = (186, 127, 50)
+SAND = (230, 205, 140)
+MUD = (150, 110, 70)
+WATER = (110, 160, 230)
+
+# Brushes painted by right dragging: (name, cost of the cells painted, colour).
+# The wall brush has no cost, the others set the cost of moving into a cell
+BRUSHES = (
+    ('Wall', None, BLACK),
+    ('Sand', 3, SAND),
+    ('Mud', 6, MUD),
+    ('Water', 12, WATER),
+    ('Ground', 1, CREAM),
+)
+# Colour of an empty cell by its cost, other costs are drawn in BROWN
+TERRAIN_COLOURS = {cost: colour for _, cost, colour in BRUSHES if cost is not None}
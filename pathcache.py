@@ -0,0 +1,133 @@
+"""
+    pathcache.py keeps the results of recent searches so that a query that is
+    asked again on an unchanged map is answered without searching.
+
+    A result is stored under the version of the cache and the query (source,
+    target, algorithm and options). The cache remembers GridMap.version, which
+    every edit of the walls, terrain costs or moves raises; when the map
+    version moved on, the version of the cache goes up and every stored
+    result is dropped, since a wall removed anywhere can shorten any path.
+    Cells written directly need GridMap.invalidate() to be seen.
+
+    The cache holds at most capacity results and drops the least recently
+    used one to make room. It counts its hits and misses.
+
+    Example:
+        cache = PathCache(gridmap)
+        result = cache.find((0, 0), (39, 39), 'astar')     # searches
+        result = cache.find((0, 0), (39, 39), 'astar')     # from the cache
+"""
+
+from collections import OrderedDict
+import search
+
+CAPACITY = 256      # results kept by a PathCache
+
+class PathCache:
+    """
+        Init:
+            map: the GridMap the searches run on
+            capacity: the number of results kept
+            version: the version of the cache, raised whenever the walls, costs
+                or moves of the map change
+            map_version: the GridMap.version the current version stands for
+            entries: OrderedDict of (version, source, target, algorithm,
+                options) -> SearchResult, the most recently used last
+            hits: the number of queries answered from the cache
+            misses: the number of queries that had to be searched
+
+        Methods:
+            refresh(): raises the version if the map was edited, returns the version
+            invalidate(): raises the version and drops every result
+            key(source, target, algorithm, options): returns the key of a query
+            lookup(key): returns the stored result of a key, None if there is none
+            store(key, result): stores the result of a key
+            find(source, target, algorithm, observer, **options): returns the
+                SearchResult of a query, from the cache or from search.find
+            stats(): returns the counters as a dictionary
+    """
+    def __init__(self, gridmap, capacity=CAPACITY):
+        self.map = gridmap
+        self.capacity = capacity
+        self.version = 0
+        self.map_version = gridmap.version
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def refresh(self):
+        """
+            Raises the version and drops the stored results if the walls,
+            costs or moves of the map changed since the current version started.
+            Returns the version
+        """
+        if self.map.version != self.map_version:
+            self.invalidate()
+        return self.version
+
+    def invalidate(self):
+        """
+            Starts a new version of the map and drops every stored result
+        """
+        self.version += 1
+        self.entries.clear()
+        self.map_version = self.map.version
+
+    def key(self, source, target, algorithm, options=None):
+        """
+            Returns the key of a query in the current version
+        """
+        return (self.version, tuple(source), tuple(target), algorithm, \
+            tuple(sorted((options or {}).items())))
+
+    def lookup(self, key):
+        """
+            Returns the stored SearchResult of a key, or None. Counts a hit or
+            a miss. The map version is not checked, call refresh first
+        """
+        result = self.entries.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return result
+
+    def store(self, key, result):
+        """
+            Stores the SearchResult of a key, dropping the least recently used
+            results if the cache is full
+        """
+        if key[0] != self.version:
+            return
+        self.entries[key] = result
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def find(self, source, target, algorithm='astar', observer=None, **options):
+        """
+            Returns the SearchResult of the query. The map version is checked first,
+            then a stored result is returned if there is one, otherwise the
+            search is run with search.find (notifying the observer) and its
+            result is stored
+        """
+        self.refresh()
+        key = self.key(source, target, algorithm, options)
+        result = self.lookup(key)
+        if result is None:
+            result = search.find(self.map, source, target, algorithm, observer, **options)
+            self.store(key, result)
+        return result
+
+    def stats(self):
+        """
+            Returns the hits, misses, hit rate, size and version of the cache
+        """
+        total = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, \
+            'hit_rate': self.hits / total if total else 0.0, \
+            'size': len(self.entries), 'version': self.version}
@@ -0,0 +1,149 @@
+"""
+    renderer.py collects the parts of the display that have changed and only
+    pushes those to the screen.
+
+    Calling pygame.display.update() with no arguments copies the whole window
+    to the screen, even if a single cell changed. The Renderer draws cells onto
+    the display surface and remembers which cells (and other rectangles) were
+    drawn. flush() merges the dirty cells into as few rectangles as possible
+    and passes only those to pygame.display.update(rects). Flushes are capped
+    at param.FPS frames per second, anything drawn in between is kept and sent
+    with the next frame, so drawing speed no longer limits the searches.
+"""
+
+import time
+from collections import defaultdict
+import pygame
+import parameters as param
+
+def merge_cells(cells):
+    """
+        Merges a set of (x, y) cells into rectangles of cells.
+
+        Neighbouring cells on the same row are joined into runs, then runs that
+        cover the same columns on consecutive rows are joined into one rectangle.
+
+        Returns a list of (x, y, width, height) rectangles measured in cells
+    """
+    rows = defaultdict(list)
+    for xpos, ypos in cells:
+        rows[ypos].append(xpos)
+
+    rects = []
+    open_runs = {}      # (first column, last column) -> [first row, last row]
+    for ypos in sorted(rows):
+        columns = sorted(rows[ypos])
+        runs = []
+        first = last = columns[0]
+        for xpos in columns[1:]:
+            if xpos == last + 1:
+                last = xpos
+            else:
+                runs.append((first, last))
+                first = last = xpos
+        runs.append((first, last))
+
+        for run in runs:
+            rows_covered = open_runs.get(run)
+            if rows_covered is not None and rows_covered[1] == ypos - 1:
+                rows_covered[1] = ypos      # extend the rectangle down one row
+                continue
+            if rows_covered is not None:
+                rects.append((run[0], rows_covered[0], run[1] - run[0] + 1, \
+                    rows_covered[1] - rows_covered[0] + 1))
+            open_runs[run] = [ypos, ypos]
+
+    for run, rows_covered in open_runs.items():
+        rects.append((run[0], rows_covered[0], run[1] - run[0] + 1, \
+            rows_covered[1] - rows_covered[0] + 1))
+    return rects
+
+class Renderer:
+    """
+        Init:
+            display: the display surface to draw on
+            fps: the maximum number of times per second the screen is updated
+            cells: the (x, y) cells drawn since the last flush
+            rects: other rectangles (in pixels) changed since the last flush
+            last_flush: the time of the last flush
+
+        Methods:
+            draw_cell(node, colour): draws one cell of the grid
+            draw_rect(colour, rect): draws a rectangle given in pixels
+            mark(rect): marks a rectangle given in pixels as changed
+            mark_all(): marks the whole display as changed
+            step(): flushes the changes if the last flush was a frame ago
+            dirty_rects(): returns the merged rectangles that need to be updated
+            flush(force): pushes the changed rectangles to the screen
+    """
+    def __init__(self, display, fps=param.FPS):
+        self.display = display
+        self.fps = fps
+        self.cells = set()
+        self.rects = set()
+        self.last_flush = 0
+
+    def draw_cell(self, node, colour):
+        """
+            Draws the cell at the (x, y) node in the given colour
+        """
+        pygame.draw.rect(self.display, colour, \
+            [node[0] * param.NODE_SIZE, node[1] * param.NODE_SIZE, \
+            param.NODE_SIZE, param.NODE_SIZE])
+        self.cells.add((node[0], node[1]))
+
+    def draw_rect(self, colour, rect):
+        """
+            Draws a rectangle given as [x, y, width, height] in pixels
+        """
+        pygame.draw.rect(self.display, colour, rect)
+        self.mark(rect)
+
+    def mark(self, rect):
+        """
+            Marks a rectangle given as [x, y, width, height] in pixels as changed.
+            Marking the same rectangle again before the next flush does nothing
+        """
+        self.rects.add(tuple(rect))
+
+    def mark_all(self):
+        """
+            Marks the whole display as changed
+        """
+        self.rects.add(tuple(self.display.get_rect()))
+
+    def step(self):
+        """
+            Marks the end of one step of an animation drawn straight onto the
+            display, so a Renderer can be used wherever an Animation is expected
+        """
+        self.flush()
+
+    def dirty_rects(self):
+        """
+            Returns the rectangles (in pixels) that changed since the last flush.
+            If there are more than param.MAX_DIRTY_RECTS they are replaced by
+            the one rectangle that covers all of them
+        """
+        size = param.NODE_SIZE
+        rects = [pygame.Rect(xpos * size, ypos * size, width * size, height * size) \
+            for xpos, ypos, width, height in merge_cells(self.cells)] if self.cells else []
+        rects.extend(pygame.Rect(rect) for rect in self.rects)
+        if len(rects) > param.MAX_DIRTY_RECTS:
+            rects = [rects[0].unionall(rects[1:])]
+        return rects
+
+    def flush(self, force=False):
+        """
+            Pushes the changed rectangles to the screen. Unless force is true
+            nothing happens if the last flush was less than one frame ago, the
+            changes are kept for the next flush
+        """
+        now = time.perf_counter()
+        if not force and now - self.last_flush < 1 / self.fps:
+            return
+        if self.cells or self.rects:
+            pygame.display.update(self.dirty_rects())
+            self.cells = set()
+            self.rects = set()
+        self.last_flush = now
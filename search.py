@@ -0,0 +1,1237 @@
+"""
+    search.py contains the headless search engine used by the visualizer.
+
+    None of the functions in this file touch pygame. Each search takes a
+    gridmap.GridMap, a source and a target and returns a SearchResult holding
+    the path and a few statistics about the search. The visualizer is attached
+    as an optional observer which is notified of every node that is opened or
+    visited.
+
+    The searches work on the linear cell indices of the GridMap and keep their
+    distance, previous, visited and inset state in its flat arrays. The
+    neighbours of a cell are the offsets moves[links[cell]] of its neighbour
+    mask (see GridMap.adjacency). Nodes are only converted to (x, y) tuples
+    for the observer and the returned path.
+
+    Heuristics:
+        astar, greedy and bidirectional_astar take a heuristic argument. It is
+        the name of one of the HEURISTICS, an object with an estimator(gridmap,
+        target) method such as landmarks.Landmarks, or any function
+        h(node, target) on (x, y) nodes such as heuristic below. The estimate of a cell is only
+        computed when the search reaches the cell, so setting up a search costs
+        the same on any size of map. Without a heuristic the searches use the
+        Manhattan distance on a 4-connected map and the octile distance on an
+        8-connected one, the tightest lower bounds for each.
+
+    Costs:
+        moving into a cell costs gridmap.costs[cell] (1 unless terrain costs
+        are set) times the cost of the move, gridmap.steps[offset]: 1 on a
+        4-connected map, 10 or 14 (or 1 and sqrt(2)) on an 8-connected map.
+        dijkstra, astar and greedy add up those costs, so dijkstra and astar
+        find the cheapest path and SearchResult.cost is its cost, counted in
+        straight moves. The other searches count every move as 1 and find the
+        path with the fewest moves, find() still reports the cost of that
+        path. The bidirectional dijkstra and astar searches and jps would
+        only find the fewest moves too, so they raise ValueError unless every
+        move costs 1 (GridMap.uniform).
+
+    Frontier:
+        dijkstra and astar take a frontier argument which selects the priority
+        queue used for the open set
+            'lazy': minheap.LazyHeap, heapq with lazy deletion, the default
+                and the fastest for general priorities
+            'heap': minheap.IndexedMinHeap, a binary heap with a real
+                decrease_key, it keeps fewer entries but is slower
+            'bucket': the bucket queues from bucketqueue.py, O(1) per operation
+                on grids with integer move costs (not with the 'exact'
+                diagonal costs)
+        dijkstra also takes 'wavefront', which expands a whole layer of equal
+        distance at once with wavefront.py (NumPy when it is installed). It
+        needs every move to cost 1, then the layers are exactly the order
+        Dijkstra expands in.
+
+    Observer:
+        an optional callable observer(event, node) where event is one of
+            'open': the node was added to the open set
+            'visit': the node was taken from the open set and expanded
+            'step': one iteration of the main loop has finished (node is None)
+
+    Hooks:
+        callables added with add_hook are called like an observer by every
+        search, on top of the observer passed to the search. A profiler or
+        tracer can attach this way without changing the callers. When no hooks
+        are added the searches do not pay anything for them.
+
+    Statistics:
+        every SearchResult carries a SearchStats with the counters of the
+        search (nodes expanded and generated, open set pushes, pops and
+        decreases, peak open set size) and the time spent in each phase.
+"""
+
+import time
+from collections import deque
+import minheap as minh
+import bucketqueue as bq
+import gridmap as gm
+import wavefront as wf
+
+def heuristic(source, target):
+    """
+        This function will compute the heuristic function for A*
+        The chosen heuristic will be the Manhattan distance
+
+        abs(x1 - y1) + abs(x2 - y2) if x = (x1, x2) and y = (y1, y2)
+    """
+    return abs(source[0]-target[0]) + abs(source[1]-target[1])
+
+def manhattan(gridmap, target):
+    """
+        Returns a function that gives the Manhattan distance from a cell index
+        to the target index, in units of the cost of a straight move
+    """
+    width, straight = gridmap.width, gridmap.straight_cost
+    target_x, target_y = target % width, target // width
+    def estimate(index):
+        return straight * (abs(index % width - target_x) + abs(index // width - target_y))
+    return estimate
+
+def octile(gridmap, target):
+    """
+        Returns a function that gives the octile distance from a cell index
+        to the target index: the cost of moving diagonally until the target
+        is in line and then straight. On a 4-connected map a diagonal move
+        costs two straight moves and this is the Manhattan distance
+    """
+    width, straight = gridmap.width, gridmap.straight_cost
+    saving = gridmap.diagonal_cost - 2 * straight     # of a diagonal over two straight moves
+    target_x, target_y = target % width, target // width
+    def estimate(index):
+        delta_x = abs(index % width - target_x)
+        delta_y = abs(index // width - target_y)
+        return straight * (delta_x + delta_y) + saving * min(delta_x, delta_y)
+    return estimate
+
+def chebyshev(gridmap, target):
+    """
+        Returns a function that gives the Chebyshev distance from a cell index
+        to the target index, the number of moves on an open 8-connected map
+        times the cost of a straight move. A lower bound on any map
+    """
+    width, straight = gridmap.width, gridmap.straight_cost
+    target_x, target_y = target % width, target // width
+    def estimate(index):
+        return straight * max(abs(index % width - target_x), abs(index // width - target_y))
+    return estimate
+
+def zero(gridmap, target):
+    """
+        Returns a function that estimates 0 for every cell, which turns A*
+        into Dijkstra's algorithm
+    """
+    def estimate(index):
+        return 0
+    return estimate
+
+# Heuristics by name. Each one is called with the gridmap and the target
+# index and returns a function that estimates the distance from a cell index
+HEURISTICS = {
+    'manhattan': manhattan,
+    'octile': octile,
+    'chebyshev': chebyshev,
+    'zero': zero,
+}
+
+# Heuristics that never drop by more than the cost of the move on an
+# 8-connected map, the Manhattan distance overestimates diagonal moves
+DIAGONAL_HEURISTICS = ('octile', 'chebyshev', 'zero')
+
+def default_heuristic(gridmap):
+    """
+        Returns the name of the heuristic used when a search is not given one
+    """
+    return 'octile' if gridmap.connectivity == 8 else 'manhattan'
+
+def make_heuristic(gridmap, target, heuristic=None):
+    """
+        Returns a function that estimates the distance from a cell index to
+        the target index. heuristic is the name of one of the HEURISTICS, an
+        object with an estimator(gridmap, target) method or a function
+        h(node, target) on (x, y) nodes. None uses the default_heuristic
+
+        The named heuristics and the landmarks are consistent. A custom
+        heuristic only has to be admissible for astar, which reopens an
+        expanded node when a shorter route to it turns up (counted in
+        SearchStats.reopened). bidirectional_astar stops as soon as its
+        bound is met and needs a consistent heuristic
+    """
+    if heuristic is None:
+        heuristic = default_heuristic(gridmap)
+    if isinstance(heuristic, str):
+        if heuristic not in HEURISTICS:
+            raise ValueError('Unknown heuristic: {}'.format(heuristic))
+        return HEURISTICS[heuristic](gridmap, target)
+    if hasattr(heuristic, 'estimator'):
+        return heuristic.estimator(gridmap, target)
+    coords, target_node = gridmap.coords, gridmap.coords(target)
+    def estimate(index):
+        return heuristic(coords(index), target_node)
+    return estimate
+
+# Phases of a search timed by SearchStats
+PHASES = ('setup', 'heuristic', 'search', 'path')
+
+HOOKS = []      # callables notified of the events of every search
+
+class SearchStats:
+    """
+        Init:
+            expanded: number of nodes taken from the open set and expanded
+            generated: number of successors produced by the expansions
+            pushes: number of nodes inserted into the open set
+            pops: number of nodes taken out of the open set
+            decreased: number of times the priority of a queued node was lowered
+            reopened: number of expanded nodes put back into the open set
+                because a shorter route to them was found. Only astar reopens
+                nodes, and only with a heuristic that is not consistent
+            peak_open: the largest number of nodes in the open set at once
+            timings: seconds spent in each of the PHASES
+                setup: resetting the map and preparing the open set
+                heuristic: preparing the heuristic
+                search: the main loop
+                path: rebuilding the path
+
+        Methods:
+            phase(name): adds the time since the last phase ended to the phase name
+            count(...): records the counters at the end of the search
+            as_dict(): returns the counters and timings as a flat dictionary
+    """
+    def __init__(self):
+        self.expanded = 0
+        self.generated = 0
+        self.pushes = 0
+        self.pops = 0
+        self.decreased = 0
+        self.reopened = 0
+        self.peak_open = 0
+        self.timings = dict.fromkeys(PHASES, 0.0)
+        self.last = time.perf_counter()
+
+    def __repr__(self):
+        return 'SearchStats({})'.format(', '.join('{}={}'.format(name, value) \
+            for name, value in self.as_dict().items()))
+
+    def phase(self, name):
+        """
+            Ends a phase of the search, the time since the last phase ended
+            is added to the phase name
+        """
+        now = time.perf_counter()
+        self.timings[name] += now - self.last
+        self.last = now
+
+    def count(self, expanded, generated, pushes, pops, decreased, peak_open, reopened=0):
+        """
+            Records the counters of the search
+        """
+        self.expanded = expanded
+        self.generated = generated
+        self.pushes = pushes
+        self.pops = pops
+        self.decreased = decreased
+        self.reopened = reopened
+        self.peak_open = peak_open
+
+    def as_dict(self):
+        """
+            Returns the counters and the timings (as '<phase>_time' in
+            seconds) in one dictionary
+        """
+        values = {'expanded': self.expanded, 'generated': self.generated, \
+            'pushes': self.pushes, 'pops': self.pops, 'decreased': self.decreased, \
+            'reopened': self.reopened, 'peak_open': self.peak_open}
+        for name in PHASES:
+            values[name + '_time'] = self.timings[name]
+        return values
+
+class SearchResult:
+    """
+        Init:
+            path: list of nodes from the source to the target, empty if no path was found
+            distance: the length of the path, -1 if no path was found
+            cost: the sum of the costs of the moves along the path in straight
+                moves, the same as distance when every move costs 1
+            expanded: number of nodes taken from the open set and expanded
+            opened: number of nodes added to the open set
+            stats: the SearchStats of the search
+
+        Methods:
+            found(): returns true if a path was found
+    """
+    def __init__(self, path=None, expanded=0, opened=0, stats=None, cost=None):
+        self.path = path if path is not None else []
+        self.distance = len(self.path) - 1 if self.path else -1
+        self.cost = self.distance if cost is None else cost
+        self.expanded = expanded
+        self.opened = opened
+        self.stats = stats if stats is not None else SearchStats()
+
+    def __repr__(self):
+        return 'SearchResult(distance={}, expanded={}, opened={})'.format(
+            self.distance, self.expanded, self.opened)
+
+    def found(self):
+        """
+            Returns true if a path from the source to the target was found
+        """
+        return self.distance != -1
+
+def find_path(gridmap, source, target):
+    """
+        Finds the path by backtracking. Start at the target cell and keep
+        recording the previous cell until the source cell is reached.
+
+        Returns the path as (x, y) nodes ordered from the source to the target
+    """
+    previous = gridmap.previous
+    path = [gridmap.coords(target)]
+    index = target
+    while index != source:
+        index = previous[index]
+        path.append(gridmap.coords(index))
+    path.reverse()
+    return path
+
+def path_cost(gridmap, path):
+    """
+        Returns the cost of a path of (x, y) nodes, the sum of the costs of
+        the moves (in straight moves)
+    """
+    if not path:
+        return -1
+    costs, steps = gridmap.costs, gridmap.steps
+    cells = [gridmap.index(node) for node in path]
+    total = sum(steps[cell - last] * costs[cell] for last, cell in zip(cells, cells[1:]))
+    return scaled_cost(gridmap, total)
+
+def scaled_cost(gridmap, distance):
+    """
+        Converts a distance of the search state of the gridmap into the cost
+        in straight moves reported in SearchResult.cost
+    """
+    if gridmap.straight_cost == 1 or distance == -1:
+        return distance
+    return distance / gridmap.straight_cost
+
+def record_path(gridmap, path):
+    """
+        Writes a path of (x, y) nodes into the search state of the gridmap, as
+        if a search had just found it, so a path that did not come from a
+        search (a cached or repaired one) can be found and cleared like one
+    """
+    gridmap.reset()
+    previous = gm.NO_PARENT
+    for step, node in enumerate(path):
+        index = gridmap.index(node)
+        gridmap.touch(index)
+        gridmap.distance[index] = step
+        gridmap.previous[index] = previous
+        previous = index
+
+def add_hook(hook):
+    """
+        Adds a hook(event, node) that is notified of the events of every search
+    """
+    HOOKS.append(hook)
+
+def remove_hook(hook):
+    """
+        Removes a hook added with add_hook
+    """
+    HOOKS.remove(hook)
+
+def _observe(observer):
+    """
+        Returns the observer a search notifies: the observer itself when no
+        hooks are added, otherwise a function that notifies the observer and
+        every hook
+    """
+    if not HOOKS:
+        return observer
+    listeners = ([observer] if observer is not None else []) + list(HOOKS)
+    def notify(event, node):
+        for listener in listeners:
+            listener(event, node)
+    return notify
+
+def _notify(observer, gridmap, event, index):
+    """
+        Passes the event to the observer if one is attached
+    """
+    if observer is not None:
+        observer(event, gridmap.coords(index))
+
+def _step(observer):
+    """
+        Tells the observer that one iteration of the main loop has finished
+    """
+    if observer is not None:
+        observer('step', None)
+
+def make_frontier(frontier, max_step):
+    """
+        Returns an empty priority queue for the open set.
+
+        frontier is 'lazy', 'heap' or 'bucket' and max_step is the largest amount the
+        priority of a neighbour can exceed the priority of the current node
+    """
+    if frontier == 'lazy':
+        return minh.LazyHeap()
+    if frontier == 'heap':
+        return minh.IndexedMinHeap()
+    if frontier == 'bucket':
+        return bq.BucketQueue(max_step)
+    raise ValueError('Unknown frontier: {}'.format(frontier))
+
+def dijkstra(gridmap, source, target, observer=None, frontier='lazy'):
+    """
+        Dijkstra's algorithm finds the shortest path between a source and target node.
+        A move costs the cost of the cell moved into times the cost of the move.
+
+        The open set is a priority queue with decrease_key, so when a shorter
+        route to a queued node is found its priority is lowered (the default
+        LazyHeap pushes a new entry and skips the old one later).
+
+        Inputs: the gridmap, the source node, the target node, an optional observer
+            and the frontier ('lazy', 'heap', 'bucket' or 'wavefront')
+        Outputs: a SearchResult with the shortest path
+    """
+    if frontier == 'wavefront':
+        return wavefront_dijkstra(gridmap, source, target, observer)
+    stats = SearchStats()
+    observer = _observe(observer)
+    gridmap.reset()
+    stamp, epoch, touch = gridmap.stamp, gridmap.epoch, gridmap.touch
+    links, moves = gridmap.adjacency(), gridmap.moves
+    source, target = gridmap.index(source), gridmap.index(target)
+    distance, previous, costs = gridmap.distance, gridmap.previous, gridmap.costs
+    visited, inset = gridmap.visited, gridmap.inset
+    # a straight move costs 1 on a 4-connected map, the cost of the cell is enough
+    steps = gridmap.steps if gridmap.connectivity == 8 else None
+    if frontier == 'bucket' and isinstance(gridmap.diagonal_cost, float):
+        raise ValueError('The bucket frontier needs integer move costs')
+    openset = make_frontier(frontier, gridmap.max_move_cost() if frontier == 'bucket' else 1)
+    expanded = opened = generated = decreased = 0
+    peak, found = 1, False
+
+    touch(source)
+    distance[source] = 0
+    inset[source] = 1
+    openset.insert(source, 0)
+    stats.phase('setup')
+
+    while openset:
+        # Set the current node as the node with minimum distance
+        current = openset.extract_min()[1]
+
+        if current == target:           # reached the target!
+            found = True
+            break
+
+        visited[current] = 1
+        expanded += 1
+        _notify(observer, gridmap, 'visit', current)
+        current_dist = distance[current]
+        offsets = moves[links[current]]
+        generated += len(offsets)
+
+        for offset in offsets:
+            neighbour = current + offset
+            if stamp[neighbour] != epoch:   # first time this search sees the cell
+                touch(neighbour)
+            tentative_dist = current_dist + (costs[neighbour] if steps is None else \
+                steps[offset] * costs[neighbour])
+            if not visited[neighbour] and tentative_dist < distance[neighbour]:
+                distance[neighbour] = tentative_dist
+                previous[neighbour] = current
+
+                if inset[neighbour]:    # already queued, lower its priority
+                    openset.decrease_key(neighbour, tentative_dist)
+                    decreased += 1
+                else:
+                    inset[neighbour] = 1
+                    opened += 1
+                    openset.insert(neighbour, tentative_dist)
+                    _notify(observer, gridmap, 'open', neighbour)
+        if opened + 1 - expanded > peak:    # the open set only grows while expanding
+            peak = opened + 1 - expanded
+        _step(observer)
+    stats.phase('search')
+    stats.count(expanded, generated, opened + 1, expanded + found, decreased, peak)
+
+    path = find_path(gridmap, source, target) if found else None
+    stats.phase('path')
+    return SearchResult(path, expanded, opened, stats, \
+        scaled_cost(gridmap, distance[target]) if found else -1)
+
+def wavefront_dijkstra(gridmap, source, target, observer=None):
+    """
+        Dijkstra's algorithm on a grid where every move costs 1 is a
+        breadth-first search, so the cells can be expanded a whole layer at
+        a time with wavefront.distance_field. The search stops at the layer
+        of the target. The search state of the gridmap is not used.
+
+        Inputs: the gridmap, the source node, the target node and an optional observer
+        Outputs: a SearchResult with the shortest path
+    """
+    if not gridmap.uniform():
+        raise ValueError('The wavefront frontier needs every move to cost 1')
+    stats = SearchStats()
+    observer = _observe(observer)
+    stats.phase('setup')
+    field = wf.distance_field(gridmap, [source], target, observer)
+    stats.phase('search')
+    reached = field.distance_to(target) != -1
+    opened = max(field.reached - 1, 0)
+    stats.count(field.expanded, field.generated, opened + 1, field.expanded + reached, 0, \
+        field.peak)
+    path = field.path_to(target) if reached else None
+    stats.phase('path')
+    return SearchResult(path, field.expanded, opened, stats)
+
+def astar(gridmap, source, target, observer=None, frontier='lazy', heuristic=None):
+    """
+        The A* algorithm is an extention of Dijkstra where the Manhattan distance
+        (the octile distance on an 8-connected map) to the target is used to
+        guide the search towards the target node.
+
+        The open set is a priority queue with decrease_key. When a better route
+        to a queued node is found its fscore is lowered so the node is expanded
+        with its best distance. The heaps are keyed by (fscore, distance); the
+        bucket frontier is a TwoBucketQueue keyed by fscore only, since with unit
+        moves and the Manhattan heuristic a neighbour's fscore is either the same
+        as the current node's fscore or 2 larger, so it needs the 'manhattan'
+        heuristic. With terrain costs or diagonal moves a neighbour's fscore
+        is at most the largest cost of a move + the largest drop of the
+        heuristic (the cost of the longest move) larger, and a BucketQueue with
+        that many buckets is used instead. Every cell costs at least 1, so the
+        heuristics stay lower bounds.
+
+        On an 8-connected map the Manhattan distance overestimates diagonal
+        moves and A* would return paths that are too long, so a named
+        heuristic must be one of the DIAGONAL_HEURISTICS with any frontier
+        (the bucket frontier needs one of them, not a custom heuristic).
+
+        A custom heuristic that is admissible but not consistent can find a
+        shorter route to a node that was already expanded; the node is then
+        put back into the open set and expanded again.
+
+        Inputs: the gridmap, the source node, the target node, an optional observer,
+            the frontier ('lazy', 'heap' or 'bucket') and the heuristic
+        Outputs: a SearchResult with the shortest path
+    """
+    bucket = frontier == 'bucket'
+    if heuristic is None:
+        heuristic = default_heuristic(gridmap)
+    if bucket and isinstance(gridmap.diagonal_cost, float):
+        raise ValueError('The bucket frontier needs integer move costs')
+    if gridmap.connectivity == 8 and heuristic not in DIAGONAL_HEURISTICS and \
+        (bucket or isinstance(heuristic, str)):
+        raise ValueError('astar needs one of {} on an 8-connected map' \
+            .format(', '.join(DIAGONAL_HEURISTICS)))
+    if bucket and gridmap.connectivity == 4 and heuristic not in ('manhattan', 'zero'):
+        raise ValueError('The bucket frontier of astar needs the manhattan heuristic')
+    stats = SearchStats()
+    observer = _observe(observer)
+    gridmap.reset()
+    stamp, epoch, touch = gridmap.stamp, gridmap.epoch, gridmap.touch
+    links, moves = gridmap.adjacency(), gridmap.moves
+    source, target = gridmap.index(source), gridmap.index(target)
+    distance, previous, fscore = gridmap.distance, gridmap.previous, gridmap.fscore
+    visited, inset, costs = gridmap.visited, gridmap.inset, gridmap.costs
+    steps = gridmap.steps if gridmap.connectivity == 8 else None
+    if bucket and gridmap.uniform() and heuristic == 'manhattan':
+        openset = bq.TwoBucketQueue()
+    elif bucket:
+        longest = max(gridmap.steps.values())
+        openset = bq.BucketQueue(gridmap.max_move_cost() + longest)
+    else:
+        openset = make_frontier(frontier, 2)
+    expanded = opened = generated = decreased = reopened = 0
+    peak, found = 1, False
+    stats.phase('setup')
+
+    estimate = make_heuristic(gridmap, target, heuristic)
+    stats.phase('heuristic')
+
+    touch(source)
+    distance[source] = 0
+    fscore[source] = estimate(source)
+    inset[source] = 1
+    openset.insert(source, fscore[source] if bucket else (fscore[source], 0))
+
+    while openset:
+        # Set the current node as the node with minimum fscore value
+        current = openset.extract_min()[1]
+
+        if current == target:           # reached the target!
+            found = True
+            break
+
+        visited[current] = 1
+        expanded += 1
+        _notify(observer, gridmap, 'visit', current)
+        current_dist = distance[current]
+        offsets = moves[links[current]]
+        generated += len(offsets)
+
+        for offset in offsets:
+            neighbour = current + offset
+            if stamp[neighbour] != epoch:   # first time this search sees the cell
+                touch(neighbour)
+            tentative_dist = current_dist + (costs[neighbour] if steps is None else \
+                steps[offset] * costs[neighbour])
+            if tentative_dist < distance[neighbour]:
+                distance[neighbour] = tentative_dist
+                previous[neighbour] = current
+                fscore[neighbour] = tentative_dist + estimate(neighbour)
+                priority = fscore[neighbour] if bucket else (fscore[neighbour], tentative_dist)
+
+                if visited[neighbour]:  # inconsistent heuristic, expand it again
+                    visited[neighbour] = 0
+                    reopened += 1
+                    opened += 1
+                    openset.insert(neighbour, priority)
+                elif inset[neighbour]:  # already queued, lower its priority
+                    openset.decrease_key(neighbour, priority)
+                    decreased += 1
+                else:
+                    inset[neighbour] = 1
+                    opened += 1
+                    openset.insert(neighbour, priority)
+                    _notify(observer, gridmap, 'open', neighbour)
+        if opened + 1 - expanded > peak:    # the open set only grows while expanding
+            peak = opened + 1 - expanded
+        _step(observer)
+    stats.phase('search')
+    stats.count(expanded, generated, opened + 1, expanded + found, decreased, peak, \
+        reopened)
+
+    path = find_path(gridmap, source, target) if found else None
+    stats.phase('path')
+    return SearchResult(path, expanded, opened, stats, \
+        scaled_cost(gridmap, distance[target]) if found else -1)
+
+def greedy(gridmap, source, target, observer=None, heuristic=None):
+    """
+        The greedy best-first search only considers the heuristic value and chooses
+        the best option at each iteration. The path is not guaranteed to be optimal.
+        Nodes with the same heuristic value are taken cheapest cell first, and
+        each node keeps the cheapest route to it among the nodes expanded.
+
+        Inputs: the gridmap, the source node, the target node, an optional observer
+            and the heuristic
+        Outputs: a SearchResult with the path found
+    """
+    stats = SearchStats()
+    observer = _observe(observer)
+    gridmap.reset()
+    stamp, epoch, touch = gridmap.stamp, gridmap.epoch, gridmap.touch
+    links, moves = gridmap.adjacency(), gridmap.moves
+    source, target = gridmap.index(source), gridmap.index(target)
+    distance, previous, costs = gridmap.distance, gridmap.previous, gridmap.costs
+    visited, inset = gridmap.visited, gridmap.inset
+    steps = gridmap.steps if gridmap.connectivity == 8 else None
+    openset = minh.MinHeap()
+    expanded = opened = generated = 0
+    peak, found = 1, False
+    stats.phase('setup')
+
+    estimate = make_heuristic(gridmap, target, heuristic)
+    stats.phase('heuristic')
+
+    touch(source)
+    distance[source] = 0
+    inset[source] = 1
+    openset.insert((estimate(source), 0, source))
+
+    while openset:
+        # Set the current node as the node with minimum heuristic value
+        current = openset.extract_min()[2]
+
+        if current == target:           # reached the target!
+            found = True
+            break
+
+        visited[current] = 1
+        expanded += 1
+        _notify(observer, gridmap, 'visit', current)
+        current_dist = distance[current]
+        offsets = moves[links[current]]
+        generated += len(offsets)
+
+        for offset in offsets:
+            neighbour = current + offset
+            if stamp[neighbour] != epoch:   # first time this search sees the cell
+                touch(neighbour)
+            if not visited[neighbour]:
+                tentative_dist = current_dist + (costs[neighbour] if steps is None else \
+                    steps[offset] * costs[neighbour])
+                if tentative_dist < distance[neighbour]:
+                    distance[neighbour] = tentative_dist
+                    previous[neighbour] = current
+
+                if not inset[neighbour]:
+                    inset[neighbour] = 1
+                    opened += 1
+                    openset.insert((estimate(neighbour), costs[neighbour], neighbour))
+                    _notify(observer, gridmap, 'open', neighbour)
+        if opened + 1 - expanded > peak:    # the open set only grows while expanding
+            peak = opened + 1 - expanded
+        _step(observer)
+    stats.phase('search')
+    stats.count(expanded, generated, opened + 1, expanded + found, 0, peak)
+
+    path = find_path(gridmap, source, target) if found else None
+    stats.phase('path')
+    return SearchResult(path, expanded, opened, stats, \
+        scaled_cost(gridmap, distance[target]) if found else -1)
+
+def bfs(gridmap, source, target, observer=None):
+    """
+        The breadth-first search visits every node of the current depth before
+        moving onto the next depth level. On a grid without edge weights the path
+        found is optimal and the search is the same as Dijkstra.
+
+        Inputs: the gridmap, the source node, the target node and an optional observer
+        Outputs: a SearchResult with the shortest path
+    """
+    stats = SearchStats()
+    observer = _observe(observer)
+    gridmap.reset()
+    stamp, epoch, touch = gridmap.stamp, gridmap.epoch, gridmap.touch
+    links, moves = gridmap.adjacency(), gridmap.moves
+    source, target = gridmap.index(source), gridmap.index(target)
+    distance, previous = gridmap.distance, gridmap.previous
+    visited, inset = gridmap.visited, gridmap.inset
+    openset = deque([source])
+    expanded = opened = generated = 0
+    peak, found = 1, False
+
+    touch(source)
+    distance[source] = 0
+    inset[source] = 1
+    stats.phase('setup')
+
+    while openset:
+        current = openset.popleft()
+
+        if current == target:           # reached the target!
+            found = True
+            break
+
+        visited[current] = 1
+        expanded += 1
+        _notify(observer, gridmap, 'visit', current)
+        offsets = moves[links[current]]
+        generated += len(offsets)
+
+        for offset in offsets:
+            neighbour = current + offset
+            if stamp[neighbour] != epoch:   # first time this search sees the cell
+                touch(neighbour)
+            # a node enters the queue once so its first parent is the closest one
+            if not inset[neighbour]:
+                inset[neighbour] = 1
+                opened += 1
+                distance[neighbour] = distance[current] + 1
+                previous[neighbour] = current
+                openset.append(neighbour)
+                _notify(observer, gridmap, 'open', neighbour)
+        if opened + 1 - expanded > peak:    # the open set only grows while expanding
+            peak = opened + 1 - expanded
+        _step(observer)
+    stats.phase('search')
+    stats.count(expanded, generated, opened + 1, expanded + found, 0, peak)
+
+    path = find_path(gridmap, source, target) if found else None
+    stats.phase('path')
+    return SearchResult(path, expanded, opened, stats)
+
+def dfs(gridmap, source, target, observer=None):
+    """
+        DFS (depth first search) looks at the maze as a tree and searches along the
+        height of the tree first. This kind of search will not return the shortest path.
+
+        Inputs: the gridmap, the source node, the target node and an optional observer
+        Outputs: a SearchResult with the path found
+    """
+    stats = SearchStats()
+    observer = _observe(observer)
+    gridmap.reset()
+    stamp, epoch, touch = gridmap.stamp, gridmap.epoch, gridmap.touch
+    links, moves = gridmap.adjacency(), gridmap.moves
+    source, target = gridmap.index(source), gridmap.index(target)
+    distance, previous = gridmap.distance, gridmap.previous
+    visited, inset = gridmap.visited, gridmap.inset
+    openset = deque([source])
+    expanded = opened = generated = 0
+    peak, found = 1, False
+
+    touch(source)
+    distance[source] = 0
+    inset[source] = 1
+    stats.phase('setup')
+
+    while openset:
+        current = openset.pop()
+
+        if current == target:           # reached the target!
+            found = True
+            break
+
+        visited[current] = 1
+        expanded += 1
+        _notify(observer, gridmap, 'visit', current)
+        offsets = moves[links[current]]
+        generated += len(offsets)
+
+        for offset in offsets:
+            neighbour = current + offset
+            if stamp[neighbour] != epoch:   # first time this search sees the cell
+                touch(neighbour)
+            if not visited[neighbour]:
+                previous[neighbour] = current
+                distance[neighbour] = distance[current] + 1
+
+                if not inset[neighbour]:
+                    inset[neighbour] = 1
+                    opened += 1
+                    openset.append(neighbour)
+                    _notify(observer, gridmap, 'open', neighbour)
+        if opened + 1 - expanded > peak:    # the open set only grows while expanding
+            peak = opened + 1 - expanded
+        _step(observer)
+    stats.phase('search')
+    stats.count(expanded, generated, opened + 1, expanded + found, 0, peak)
+
+    path = find_path(gridmap, source, target) if found else None
+    stats.phase('path')
+    return SearchResult(path, expanded, opened, stats)
+
+def join_path(gridmap, source, target, meeting):
+    """
+        Joins the two halves of a bidirectional search into one path.
+
+        meeting is the (forward, backward) pair of neighbouring cells where the
+        two searches met. The backward half is written into the previous array
+        so the whole path can be found by backtracking from the target.
+    """
+    forward, backward = meeting
+    distance, previous = gridmap.distance, gridmap.previous
+    reverse_previous = gridmap.reverse_previous
+    previous[backward] = forward
+    distance[backward] = distance[forward] + 1
+    index = backward
+    while index != target:
+        following = reverse_previous[index]
+        previous[following] = index
+        distance[following] = distance[index] + 1
+        index = following
+    return find_path(gridmap, source, target)
+
+def _bidirectional(gridmap, source, target, observer, guided, heuristic='manhattan'):
+    """
+        Bidirectional best-first search shared by bidirectional_dijkstra and
+        bidirectional_astar. A forward search grows from the source and a
+        backward search grows from the target, each with its own indexed min
+        heap. The side with the smaller open set is expanded next.
+
+        Every time an edge reaches a cell that the other side has reached, the
+        length of the path through that edge is recorded if it is the shortest
+        so far. The search stops when no shorter path can exist:
+            dijkstra: min distance forward + min distance backward >= best path
+            astar: the min fscore of either open set >= best path
+
+        Every move counts 1, so the map must be 4-connected without terrain
+        costs.
+    """
+    if not gridmap.uniform():
+        raise ValueError('The bidirectional searches need a 4-connected map ' \
+            'without terrain costs')
+    stats = SearchStats()
+    observer = _observe(observer)
+    gridmap.reset()
+    stamp, epoch, touch = gridmap.stamp, gridmap.epoch, gridmap.touch
+    links, moves = gridmap.adjacency(), gridmap.moves
+    source, target = gridmap.index(source), gridmap.index(target)
+    if source == target:
+        return SearchResult([gridmap.coords(source)], stats=stats)
+
+    distances = (gridmap.distance, gridmap.reverse_distance)
+    previous = (gridmap.previous, gridmap.reverse_previous)
+    visited, inset = gridmap.visited, gridmap.inset
+    flags = (gm.FORWARD, gm.BACKWARD)
+    opensets = (minh.IndexedMinHeap(), minh.IndexedMinHeap())
+    expanded = opened = generated = decreased = 0
+    peak = 2
+    best, meeting = gm.INF, None
+    stats.phase('setup')
+
+    heuristics = (None, None)
+    if guided:
+        # the forward search heads to the target, the backward search to the source
+        heuristics = (make_heuristic(gridmap, target, heuristic), \
+            make_heuristic(gridmap, source, heuristic))
+    stats.phase('heuristic')
+
+    for side, start in ((0, source), (1, target)):
+        touch(start)
+        distances[side][start] = 0
+        inset[start] |= flags[side]
+        opensets[side].insert(start, heuristics[side](start) if guided else 0)
+
+    while opensets[0] and opensets[1]:
+        # stop when neither side can improve on the best path found so far
+        forward_min, backward_min = opensets[0].find_min()[0], opensets[1].find_min()[0]
+        if guided and max(forward_min, backward_min) >= best:
+            break
+        if not guided and forward_min + backward_min >= best:
+            break
+
+        side = 0 if len(opensets[0]) <= len(opensets[1]) else 1
+        distance, other_distance = distances[side], distances[1-side]
+        flag, openset = flags[side], opensets[side]
+
+        current = openset.extract_min()[1]
+        visited[current] |= flag
+        expanded += 1
+        _notify(observer, gridmap, 'visit', current)
+        tentative_dist = distance[current] + 1
+        offsets = moves[links[current]]
+        generated += len(offsets)
+
+        for offset in offsets:
+            neighbour = current + offset
+            if stamp[neighbour] != epoch:   # first time this search sees the cell
+                touch(neighbour)
+            # the other side has reached the neighbour, the two searches meet here
+            if other_distance[neighbour] != gm.INF and \
+                tentative_dist + other_distance[neighbour] < best:
+                best = tentative_dist + other_distance[neighbour]
+                meeting = (current, neighbour) if side == 0 else (neighbour, current)
+
+            if not visited[neighbour] & flag and tentative_dist < distance[neighbour]:
+                distance[neighbour] = tentative_dist
+                previous[side][neighbour] = current
+                priority = tentative_dist + heuristics[side](neighbour) if guided \
+                    else tentative_dist
+
+                if inset[neighbour] & flag:     # already queued, lower its priority
+                    openset.decrease_key(neighbour, priority)
+                    decreased += 1
+                else:
+                    inset[neighbour] |= flag
+                    opened += 1
+                    openset.insert(neighbour, priority)
+                    _notify(observer, gridmap, 'open', neighbour)
+        if opened + 2 - expanded > peak:    # the open sets only grow while expanding
+            peak = opened + 2 - expanded
+        _step(observer)
+    stats.phase('search')
+    stats.count(expanded, generated, opened + 2, expanded, decreased, peak)
+
+    path = join_path(gridmap, source, target, meeting) if meeting is not None else None
+    stats.phase('path')
+    return SearchResult(path, expanded, opened, stats)
+
+def bidirectional_dijkstra(gridmap, source, target, observer=None):
+    """
+        Runs Dijkstra's algorithm from the source and from the target at the same
+        time and joins the two searches where they meet.
+
+        Inputs: the gridmap, the source node, the target node and an optional observer
+        Outputs: a SearchResult with the shortest path
+    """
+    return _bidirectional(gridmap, source, target, observer, False)
+
+def bidirectional_astar(gridmap, source, target, observer=None, heuristic='manhattan'):
+    """
+        Runs A* from the source towards the target and from the target towards
+        the source at the same time and joins the two searches where they meet.
+
+        Inputs: the gridmap, the source node, the target node, an optional observer
+            and the heuristic
+        Outputs: a SearchResult with the shortest path
+    """
+    return _bidirectional(gridmap, source, target, observer, True, heuristic)
+
+def bidirectional_bfs(gridmap, source, target, observer=None):
+    """
+        Runs a breadth-first search from the source and from the target. Each
+        step expands one whole depth level of the side with the smaller queue.
+        Once a level has reached a cell seen by the other side, the shortest
+        path through that level is the shortest path overall.
+
+        Inputs: the gridmap, the source node, the target node and an optional observer
+        Outputs: a SearchResult with the shortest path
+    """
+    stats = SearchStats()
+    observer = _observe(observer)
+    gridmap.reset()
+    stamp, epoch, touch = gridmap.stamp, gridmap.epoch, gridmap.touch
+    links, moves = gridmap.adjacency(), gridmap.moves
+    source, target = gridmap.index(source), gridmap.index(target)
+    if source == target:
+        return SearchResult([gridmap.coords(source)], stats=stats)
+
+    distances = (gridmap.distance, gridmap.reverse_distance)
+    previous = (gridmap.previous, gridmap.reverse_previous)
+    visited, inset = gridmap.visited, gridmap.inset
+    flags = (gm.FORWARD, gm.BACKWARD)
+    opensets = (deque([source]), deque([target]))
+    expanded = opened = generated = 0
+    peak = 2
+    best, meeting = gm.INF, None
+
+    for side, start in ((0, source), (1, target)):
+        touch(start)
+        distances[side][start] = 0
+        inset[start] |= flags[side]
+    stats.phase('setup')
+
+    while opensets[0] and opensets[1] and meeting is None:
+        side = 0 if len(opensets[0]) <= len(opensets[1]) else 1
+        distance, other_distance = distances[side], distances[1-side]
+        flag, openset = flags[side], opensets[side]
+
+        for _ in range(len(openset)):   # expand one depth level
+            current = openset.popleft()
+            visited[current] |= flag
+            expanded += 1
+            _notify(observer, gridmap, 'visit', current)
+            tentative_dist = distance[current] + 1
+            offsets = moves[links[current]]
+            generated += len(offsets)
+
+            for offset in offsets:
+                neighbour = current + offset
+                if stamp[neighbour] != epoch:   # first time this search sees the cell
+                    touch(neighbour)
+                # the other side has reached the neighbour, the two searches meet here
+                if other_distance[neighbour] != gm.INF and \
+                    tentative_dist + other_distance[neighbour] < best:
+                    best = tentative_dist + other_distance[neighbour]
+                    meeting = (current, neighbour) if side == 0 else (neighbour, current)
+
+                if not inset[neighbour] & flag:
+                    inset[neighbour] |= flag
+                    opened += 1
+                    distance[neighbour] = tentative_dist
+                    previous[side][neighbour] = current
+                    openset.append(neighbour)
+                    _notify(observer, gridmap, 'open', neighbour)
+            if opened + 2 - expanded > peak:    # the queues only grow while expanding
+                peak = opened + 2 - expanded
+        _step(observer)
+    stats.phase('search')
+    stats.count(expanded, generated, opened + 2, expanded, 0, peak)
+
+    path = join_path(gridmap, source, target, meeting) if meeting is not None else None
+    stats.phase('path')
+    return SearchResult(path, expanded, opened, stats)
+
+def jump_point_search(gridmap, source, target, observer=None):
+    """
+        Jump Point Search is A* on a uniform-cost grid where only a few nodes
+        (the jump points) are added to the open set. From each node the search
+        keeps moving in a straight line until it reaches a node where the
+        optimal path could change direction:
+            1) the target
+            2) a node with a forced neighbour, a side cell that is open while
+                the cell behind it is a wall, so the only short way to reach
+                it is through this node
+            3) when moving vertically, a node from which a horizontal jump
+                finds a jump point
+        Paths that differ only in the order of their moves are never expanded
+        twice, so far fewer nodes are expanded than A* but the path found has
+        the same optimal length.
+
+        This is the variant for movement along the cardinal directions where
+        every move costs 1, the map must be 4-connected without terrain costs.
+
+        Inputs: the gridmap, the source node, the target node and an optional observer
+        Outputs: a SearchResult with the shortest path
+    """
+    if not gridmap.uniform():
+        raise ValueError('Jump point search needs a 4-connected map without terrain costs')
+    stats = SearchStats()
+    observer = _observe(observer)
+    gridmap.reset()
+    stamp, epoch, touch = gridmap.stamp, gridmap.epoch, gridmap.touch
+    width, height, cells = gridmap.width, gridmap.height, gridmap.cells
+    target_x, target_y = target
+    source, target = gridmap.index(source), gridmap.index(target)
+    distance, previous, fscore = gridmap.distance, gridmap.previous, gridmap.fscore
+    visited, inset = gridmap.visited, gridmap.inset
+    openset = minh.IndexedMinHeap()
+    expanded = opened = generated = decreased = 0
+    peak, found = 1, False
+
+    def walkable(xpos, ypos):
+        return 0 <= xpos < width and 0 <= ypos < height and \
+            cells[ypos * width + xpos] != gm.WALL
+
+    def jump_horizontal(xpos, ypos, step):
+        # move along the row until a jump point is found or a wall is hit
+        while True:
+            xpos += step
+            if not walkable(xpos, ypos):
+                return None
+            if xpos == target_x and ypos == target_y:
+                return (xpos, ypos)
+            if (walkable(xpos, ypos-1) and not walkable(xpos-step, ypos-1)) or \
+                (walkable(xpos, ypos+1) and not walkable(xpos-step, ypos+1)):
+                return (xpos, ypos)
+
+    def jump_vertical(xpos, ypos, step):
+        # move along the column until a jump point is found or a wall is hit
+        while True:
+            ypos += step
+            if not walkable(xpos, ypos):
+                return None
+            if xpos == target_x and ypos == target_y:
+                return (xpos, ypos)
+            if (walkable(xpos-1, ypos) and not walkable(xpos-1, ypos-step)) or \
+                (walkable(xpos+1, ypos) and not walkable(xpos+1, ypos-step)):
+                return (xpos, ypos)
+            if jump_horizontal(xpos, ypos, 1) or jump_horizontal(xpos, ypos, -1):
+                return (xpos, ypos)
+
+    def directions(index):
+        # the directions worth searching from a node given how it was reached
+        parent = previous[index]
+        if parent == gm.NO_PARENT:
+            return ((1, 0), (-1, 0), (0, 1), (0, -1))
+        step_x = (index % width > parent % width) - (index % width < parent % width)
+        step_y = (index // width > parent // width) - (index // width < parent // width)
+        if step_x:
+            return ((step_x, 0), (0, 1), (0, -1))
+        return ((0, step_y), (1, 0), (-1, 0))
+
+    touch(source)
+    distance[source] = 0
+    fscore[source] = heuristic(gridmap.coords(source), (target_x, target_y))
+    inset[source] = 1
+    openset.insert(source, (fscore[source], 0))
+    stats.phase('setup')
+
+    while openset:
+        current = openset.extract_min()[1]
+
+        if current == target:           # reached the target!
+            found = True
+            break
+
+        visited[current] = 1
+        expanded += 1
+        _notify(observer, gridmap, 'visit', current)
+        xpos, ypos = current % width, current // width
+
+        for step_x, step_y in directions(current):
+            if step_x:
+                jump_point = jump_horizontal(xpos, ypos, step_x)
+            else:
+                jump_point = jump_vertical(xpos, ypos, step_y)
+            if jump_point is None:
+                continue
+            generated += 1
+
+            neighbour = jump_point[1] * width + jump_point[0]
+            if stamp[neighbour] != epoch:   # first time this search sees the cell
+                touch(neighbour)
+            if visited[neighbour]:
+                continue
+            tentative_dist = distance[current] + heuristic((xpos, ypos), jump_point)
+            if tentative_dist < distance[neighbour]:
+                distance[neighbour] = tentative_dist
+                previous[neighbour] = current
+                fscore[neighbour] = tentative_dist + heuristic(jump_point, (target_x, target_y))
+
+                if inset[neighbour]:    # already queued, lower its priority
+                    openset.decrease_key(neighbour, (fscore[neighbour], tentative_dist))
+                    decreased += 1
+                else:
+                    inset[neighbour] = 1
+                    opened += 1
+                    openset.insert(neighbour, (fscore[neighbour], tentative_dist))
+                    _notify(observer, gridmap, 'open', neighbour)
+        if opened + 1 - expanded > peak:    # the open set only grows while expanding
+            peak = opened + 1 - expanded
+        _step(observer)
+    stats.phase('search')
+    stats.count(expanded, generated, opened + 1, expanded + found, decreased, peak)
+
+    path = None
+    if found:
+        fill_jumps(gridmap, source, target)
+        path = find_path(gridmap, source, target)
+    stats.phase('path')
+    return SearchResult(path, expanded, opened, stats)
+
+def fill_jumps(gridmap, source, target):
+    """
+        Jump Point Search only links jump points in its previous array. This
+        fills in the straight line of cells between each pair of jump points
+        on the path so the path can be found by backtracking.
+    """
+    width = gridmap.width
+    distance, previous = gridmap.distance, gridmap.previous
+    index = target
+    while index != source:
+        parent = previous[index]
+        # step from the parent towards the jump point one cell at a time
+        if index // width == parent // width:
+            step = 1 if index > parent else -1
+        else:
+            step = width if index > parent else -width
+        cell = parent
+        while cell != index:
+            gridmap.touch(cell + step)
+            previous[cell + step] = cell
+            distance[cell + step] = distance[cell] + 1
+            cell += step
+        index = parent
+
+ALGORITHMS = {
+    'dijkstra': dijkstra,
+    'astar': astar,
+    'greedy': greedy,
+    'bfs': bfs,
+    'dfs': dfs,
+    'bidirectional_dijkstra': bidirectional_dijkstra,
+    'bidirectional_astar': bidirectional_astar,
+    'bidirectional_bfs': bidirectional_bfs,
+    'jps': jump_point_search,
+}
+
+# Algorithms that add up the costs of the cells, the others count moves
+WEIGHTED = ('dijkstra', 'astar', 'greedy')
+
+# Algorithms that have a bidirectional version
+BIDIRECTIONAL = {
+    'dijkstra': 'bidirectional_dijkstra',
+    'astar': 'bidirectional_astar',
+    'bfs': 'bidirectional_bfs',
+}
+
+def find(gridmap, source, target, algorithm='astar', observer=None, **options):
+    """
+        Runs the named algorithm on the gridmap and returns its SearchResult.
+        Extra keyword options (such as frontier) are passed to the algorithm
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError('Unknown algorithm: {}'.format(algorithm))
+    result = ALGORITHMS[algorithm](gridmap, source, target, observer, **options)
+    if algorithm not in WEIGHTED and result.found() and not gridmap.uniform():
+        result.cost = path_cost(gridmap, result.path)
+    return result
@@ -0,0 +1,138 @@
+"""
+    sharedgrid.py publishes the walls of a map, and any arrays precomputed for
+    it, in one block of shared memory so several processes can search the same
+    map without each holding its own copy.
+
+    The process that owns the map creates a SharedGrid, which copies the cells
+    and the extra arrays into a multiprocessing.shared_memory block once. Other
+    processes attach to the block with the small picklable handle() and get
+    read-only views of it, nothing is copied. Only the search state (distance,
+    previous, ...) is private to each process because every search writes to it.
+
+    The neighbour masks of the map (GridMap.links) are published with the
+    cells under 'links', together with the moves they were built for, so the
+    other processes do not rebuild them. The moves table itself (GridMap.moves)
+    is a list of at most 256 tuples of offsets that set_connectivity computes
+    in microseconds, and tuples cannot live in shared memory, so it is made
+    again in each process.
+
+    Example:
+        shared = SharedGrid(gridmap)
+        # in another process
+        attached = SharedGrid.attach(shared.handle())
+        search.find(attached.gridmap(), (0, 0), (10, 10))
+        attached.close()
+        # when every process is done
+        shared.close()
+        shared.unlink()
+"""
+
+from array import array
+from multiprocessing import shared_memory
+import gridmap as gm
+
+class SharedGrid:
+    """
+        Init:
+            gridmap: the GridMap to publish (not needed when attaching)
+            extras: optional dict of name -> array.array of precomputed data
+            width: the number of cells along the x axis
+            height: the number of cells along the y axis
+            movement: the GridMap.movement of the published map
+            memory: the SharedMemory block holding the cells, the neighbour
+                masks and the extras
+            layout: dict of name -> (offset, typecode, length) of each array
+                in the block, the cells are stored under 'cells' and the
+                neighbour masks under 'links'
+
+        Methods:
+            attach(handle): opens a SharedGrid published by another process
+            handle(): returns the picklable information needed to attach
+            view(name): returns a read-only view of one array in the block
+            gridmap(): returns a GridMap with the moves of the published map
+                that searches over the shared cells and neighbour masks (and
+                the shared costs, if they were published as 'costs')
+            close(): closes the views and this process' access to the block
+            unlink(): frees the block, called once by the publishing process
+    """
+    def __init__(self, gridmap=None, extras=None, _attach=None):
+        self.views = []
+        if _attach is not None:
+            name, self.width, self.height, self.movement, self.layout = _attach
+            self.memory = shared_memory.SharedMemory(name=name)
+            return
+
+        self.width, self.height = gridmap.width, gridmap.height
+        self.movement = gridmap.movement()
+        arrays = {'cells': gridmap.cells, 'links': gridmap.adjacency()}
+        arrays.update(extras or {})
+        self.layout = {}
+        offset = 0
+        for name, values in arrays.items():
+            typecode = values.typecode if isinstance(values, array) else 'B'
+            itemsize = array(typecode).itemsize
+            offset = -(-offset // itemsize) * itemsize     # align to the item size
+            self.layout[name] = (offset, typecode, len(values))
+            offset += itemsize * len(values)
+
+        self.memory = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for name, values in arrays.items():
+            start, _, _ = self.layout[name]
+            data = memoryview(values).cast('B')
+            self.memory.buf[start:start + len(data)] = data
+
+    @classmethod
+    def attach(cls, handle):
+        """
+            Opens the SharedGrid described by a handle() from another process
+        """
+        return cls(_attach=handle)
+
+    def handle(self):
+        """
+            Returns the (block name, width, height, movement, layout) tuple that
+            another process passes to SharedGrid.attach
+        """
+        return (self.memory.name, self.width, self.height, self.movement, self.layout)
+
+    def view(self, name):
+        """
+            Returns a read-only memoryview of the named array in the block,
+            indexed the same way as the array that was published
+        """
+        offset, typecode, length = self.layout[name]
+        itemsize = array(typecode).itemsize
+        view = self.memory.buf[offset:offset + itemsize * length].cast(typecode).toreadonly()
+        self.views.append(view)
+        return view
+
+    def gridmap(self):
+        """
+            Returns a GridMap over the shared cells and neighbour masks, and
+            over the shared costs if an extra array named 'costs' was
+            published, with the moves of the published map. The walls, costs
+            and masks of the map are read-only, the search state belongs to
+            this process
+        """
+        costs = self.view('costs') if 'costs' in self.layout else None
+        gridmap = gm.GridMap(self.width, self.height, self.view('cells'), costs)
+        gridmap.set_connectivity(*self.movement)
+        gridmap.links = self.view('links')
+        return gridmap
+
+    def close(self):
+        """
+            Releases the views handed out and closes the block in this process.
+            GridMaps returned by gridmap() can no longer be used afterwards
+        """
+        for view in self.views:
+            view.release()
+        self.views = []
+        self.memory.close()
+
+    def unlink(self):
+        """
+            Frees the shared memory block. Only the publishing process calls
+            this, after every process has closed the block
+        """
+        self.memory.unlink()
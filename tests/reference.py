@@ -0,0 +1,86 @@
+"""
+    A plain Dijkstra for the tests to compare the searches against.
+
+    It reads the cells, the costs and the moves of a GridMap directly and
+    does not use the neighbour masks, the search state or any of the
+    frontiers of the search module, so it checks them independently.
+"""
+
+import heapq
+import random
+import gridmap as gm
+
+def moves(gridmap, index):
+    """
+        Returns the (neighbour, move cost) pairs of a cell, following the
+        connectivity and corner cutting rules of the map
+    """
+    width, cells = gridmap.width, gridmap.cells
+    xpos, ypos = index % width, index // width
+
+    def is_open(column, row):
+        return 0 <= column < width and 0 <= row < gridmap.height and \
+            cells[row * width + column] != gm.WALL
+
+    result = []
+    for delta_x, delta_y in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+        if is_open(xpos + delta_x, ypos + delta_y):
+            result.append(((ypos + delta_y) * width + xpos + delta_x, gridmap.straight_cost))
+    if gridmap.connectivity == 8:
+        for delta_x, delta_y in ((-1, -1), (1, -1), (-1, 1), (1, 1)):
+            if not is_open(xpos + delta_x, ypos + delta_y):
+                continue
+            beside = (is_open(xpos + delta_x, ypos), is_open(xpos, ypos + delta_y))
+            if any(beside) if gridmap.corner_cutting else all(beside):
+                result.append(((ypos + delta_y) * width + xpos + delta_x, \
+                    gridmap.diagonal_cost))
+    return result
+
+def costs_from(gridmap, source):
+    """
+        Returns a dict of the cost of the cheapest path, in straight moves,
+        from the (x, y) source to every cell it can reach
+    """
+    start = gridmap.index(source)
+    best = {start: 0}
+    queue = [(0, start)]
+    while queue:
+        cost, current = heapq.heappop(queue)
+        if cost > best[current]:
+            continue
+        for neighbour, step in moves(gridmap, current):
+            following = cost + step * gridmap.costs[neighbour]
+            if following < best.get(neighbour, following + 1):
+                best[neighbour] = following
+                heapq.heappush(queue, (following, neighbour))
+    return {index: cost / gridmap.straight_cost for index, cost in best.items()}
+
+def cost(gridmap, source, target):
+    """
+        Returns the cost of the cheapest path from source to target in
+        straight moves, -1 if there is none
+    """
+    return costs_from(gridmap, source).get(gridmap.index(target), -1)
+
+def random_map(seed, width=20, height=20, walls=0.25, terrain=0.0):
+    """
+        Returns a GridMap with a random share of walls and of cells with a
+        terrain cost from 2 to 9, and the list of its open (x, y) nodes
+    """
+    rng = random.Random(seed)
+    gridmap = gm.GridMap(width, height)
+    for index in range(gridmap.size):
+        if rng.random() < walls:
+            gridmap.set_status(index, 'wall')
+        elif rng.random() < terrain:
+            gridmap.set_cost(index, rng.randint(2, 9))
+    open_cells = [gridmap.coords(index) for index in range(gridmap.size) \
+        if gridmap.cells[index] != gm.WALL]
+    return gridmap, open_cells
+
+def queries(open_cells, count, seed=0):
+    """
+        Returns count random (source, target) pairs of open nodes
+    """
+    rng = random.Random(seed)
+    return [(rng.choice(open_cells), rng.choice(open_cells)) for _ in range(count)]
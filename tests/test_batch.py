@@ -0,0 +1,61 @@
+"""
+    Tests for the batch queries in batch.py, checked against the plain
+    Dijkstra in reference.py.
+
+    Run from the repository root with
+        python -m unittest discover tests
+"""
+
+import unittest
+import batch
+import pathcache
+import reference
+
+class SolveBatchTest(unittest.TestCase):
+    """
+        The worker processes answer every query the way a search in this
+        process does
+    """
+    def check(self, gridmap, queries, workers):
+        results = batch.solve_batch(gridmap, queries, workers=workers, algorithm='dijkstra')
+        self.assertEqual(len(results), len(queries))
+        for (source, target), result in zip(queries, results):
+            expected = reference.cost(gridmap, source, target)
+            self.assertAlmostEqual(result.cost, expected, msg=(source, target))
+            if result.found():
+                self.assertEqual(result.path[0], source)
+                self.assertEqual(result.path[-1], target)
+
+    def test_in_process(self):
+        gridmap, open_cells = reference.random_map(0, walls=0.35)
+        self.check(gridmap, reference.queries(open_cells, 40), 1)
+
+    def test_workers(self):
+        gridmap, open_cells = reference.random_map(1, 30, 30, walls=0.35)
+        queries = reference.queries(open_cells, 3 * batch.MIN_PARALLEL_QUERIES, 1)
+        self.check(gridmap, queries, 2)
+
+    def test_workers_weighted_diagonal(self):
+        gridmap, open_cells = reference.random_map(2, 30, 30, terrain=0.3)
+        gridmap.set_connectivity(8, 'exact')
+        queries = reference.queries(open_cells, 3 * batch.MIN_PARALLEL_QUERIES, 2)
+        self.check(gridmap, queries, 2)
+
+    def test_unknown_algorithm(self):
+        gridmap, _ = reference.random_map(0)
+        with self.assertRaises(ValueError):
+            batch.solve_batch(gridmap, [((0, 0), (1, 1), 'teleport')])
+
+    def test_cache_reused(self):
+        gridmap, open_cells = reference.random_map(3)
+        queries = reference.queries(open_cells, 30, 3)
+        cache = pathcache.PathCache(gridmap)
+        first = batch.solve_batch(gridmap, queries, workers=1, cache=cache)
+        hits = cache.hits
+        second = batch.solve_batch(gridmap, queries, workers=1, cache=cache)
+        self.assertGreater(cache.hits, hits)
+        for before, after in zip(first, second):
+            self.assertEqual(before.cost, after.cost)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+"""
+    Tests for the benchmark runner in benchmark.py on the sample scenarios.
+
+    Run from the repository root with
+        python -m unittest discover tests
+"""
+
+import io
+import os
+import unittest
+import contextlib
+import benchmark
+
+SCENARIO = os.path.join(benchmark.SAMPLES, 'random-40x40.map.scen')
+
+class UnsupportedAlgorithmTest(unittest.TestCase):
+    """
+        An algorithm that does not support the moves of a map is skipped
+    """
+    def test_jps_skipped_on_8_connected(self):
+        errors = io.StringIO()
+        with contextlib.redirect_stderr(errors):
+            rows = benchmark.run_scenarios(SCENARIO, ('astar', 'jps'), limit=5, \
+                movement=(8, 'exact', False))
+        self.assertEqual({row['algorithm'] for row in rows}, {'astar'})
+        self.assertEqual(len(rows), 5)
+        self.assertIn('skipping jps', errors.getvalue())
+        for row in rows:
+            self.assertAlmostEqual(row['cost'], row['octile_optimal'], places=3)
+
+    def test_jps_optimal_on_4_connected(self):
+        rows = benchmark.run_scenarios(SCENARIO, ('jps',), limit=5)
+        self.assertEqual(len(rows), 5)
+        for row in rows:
+            self.assertEqual(row['gap'], 0.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+    Tests for the region labels of components.py after the walls change,
+    checked against the plain Dijkstra in reference.py and a fresh labelling.
+
+    Run from the repository root with
+        python -m unittest discover tests
+"""
+
+import random
+import unittest
+import gridmap as gm
+import components
+import reference
+
+class EditTest(unittest.TestCase):
+    """
+        The locally updated labels split and merge the regions the same way
+        a fresh labelling does
+    """
+    def check(self, gridmap, regions):
+        fresh = components.Components(gridmap)
+        open_cells = [gridmap.coords(index) for index in range(gridmap.size) \
+            if gridmap.cells[index] != gm.WALL]
+        for node in open_cells[::20]:
+            reachable = reference.costs_from(gridmap, node)
+            for other in open_cells:
+                expected = gridmap.index(other) in reachable
+                self.assertEqual(regions.connected(node, other), expected, (node, other))
+                self.assertEqual(fresh.connected(node, other), expected)
+        for index in range(gridmap.size):
+            if gridmap.cells[index] == gm.WALL:
+                self.assertIsNone(regions.component(gridmap.coords(index)))
+
+    def run_edits(self, notify):
+        for seed in range(5):
+            rng = random.Random(seed)
+            gridmap, _ = reference.random_map(seed, walls=0.4)
+            regions = components.Components(gridmap)
+            for _ in range(10):
+                nodes = []
+                for _ in range(rng.randint(1, 4)):
+                    index = rng.randrange(gridmap.size)
+                    wall = gridmap.cells[index] == gm.WALL
+                    gridmap.set_status(index, 'empty' if wall else 'wall')
+                    nodes.append(gridmap.coords(index))
+                if notify:
+                    regions.cells_changed(nodes)
+                else:
+                    regions.update()
+                self.check(gridmap, regions)
+
+    def test_cells_changed(self):
+        self.run_edits(True)
+
+    def test_update(self):
+        self.run_edits(False)
+
+    def test_direct_writes(self):
+        gridmap, _ = reference.random_map(7, walls=0.3)
+        regions = components.Components(gridmap)
+        for column in range(gridmap.width):
+            gridmap.cells[gridmap.index((column, 10))] = gm.WALL
+        gridmap.invalidate()
+        regions.update()
+        self.check(gridmap, regions)
+        self.assertFalse(regions.connected((0, 0), (0, 19)))
+
+if __name__ == '__main__':
+    unittest.main()
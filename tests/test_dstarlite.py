@@ -0,0 +1,94 @@
+"""
+    Tests for the incremental planner in dstarlite.py, checked against the
+    plain Dijkstra in reference.py after the walls change.
+
+    Run from the repository root with
+        python -m unittest discover tests
+"""
+
+import random
+import unittest
+import gridmap as gm
+import dstarlite
+import search
+import reference
+
+def toggle(gridmap, rng, count):
+    """
+        Flips count random cells between open and wall and returns their nodes
+    """
+    nodes = []
+    for _ in range(count):
+        index = rng.randrange(gridmap.size)
+        gridmap.set_status(index, 'empty' if gridmap.cells[index] == gm.WALL else 'wall')
+        nodes.append(gridmap.coords(index))
+    return nodes
+
+class EditTest(unittest.TestCase):
+    """
+        The repaired search gives the same distances as a fresh search
+    """
+    def check(self, gridmap, planner, source, target):
+        expected = reference.cost(gridmap, source, target)
+        result = planner.plan(source, target)
+        if expected < 0:
+            self.assertFalse(result.found())
+            return
+        self.assertEqual(len(result.path) - 1, expected)
+        self.assertEqual(search.path_cost(gridmap, result.path), expected)
+        self.assertEqual(result.path[0], source)
+        self.assertEqual(result.path[-1], target)
+
+    def run_edits(self, notify):
+        for seed in range(10):
+            rng = random.Random(seed)
+            gridmap, open_cells = reference.random_map(seed)
+            planner = dstarlite.DStarLite(gridmap)
+            source, target = rng.choice(open_cells), rng.choice(open_cells)
+            for _ in range(15):
+                nodes = toggle(gridmap, rng, 3)
+                if notify:
+                    planner.cells_changed(nodes)
+                # move one endpoint or the other to an open cell
+                node = gridmap.coords(rng.randrange(gridmap.size))
+                if gridmap.cells[gridmap.index(node)] != gm.WALL:
+                    if rng.random() < 0.5:
+                        source = node
+                    else:
+                        target = node
+                for endpoint in (source, target):
+                    gridmap.set_status(gridmap.index(endpoint), 'empty')
+                if notify:
+                    planner.cells_changed([source, target])
+                self.check(gridmap, planner, source, target)
+
+    def test_cells_changed(self):
+        self.run_edits(True)
+
+    def test_without_cells_changed(self):
+        self.run_edits(False)
+
+    def test_direct_writes(self):
+        gridmap, open_cells = reference.random_map(3)
+        planner = dstarlite.DStarLite(gridmap)
+        source, target = open_cells[0], open_cells[-1]
+        self.check(gridmap, planner, source, target)
+        rng = random.Random(3)
+        for _ in range(40):
+            index = rng.randrange(gridmap.size)
+            if gridmap.coords(index) not in (source, target):
+                gridmap.cells[index] = gm.WALL
+        gridmap.invalidate()
+        self.check(gridmap, planner, source, target)
+
+    def test_refuses_other_maps(self):
+        gridmap, _ = reference.random_map(0, terrain=0.3)
+        with self.assertRaises(ValueError):
+            dstarlite.DStarLite(gridmap).plan((0, 0), (19, 19))
+        gridmap, _ = reference.random_map(0)
+        gridmap.set_connectivity(8)
+        with self.assertRaises(ValueError):
+            dstarlite.DStarLite(gridmap).plan((0, 0), (19, 19))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+"""
+    Tests for the flow fields in flowfield.py, checked against the plain
+    Dijkstra in reference.py.
+
+    Run from the repository root with
+        python -m unittest discover tests
+"""
+
+import random
+import unittest
+import gridmap as gm
+import flowfield as ff
+import reference
+
+class FlowFieldTest(unittest.TestCase):
+    """
+        A repaired field must give the same distances as a fresh search
+    """
+    def assert_matches(self, field, gridmap, target):
+        expected = reference.costs_from(gridmap, target)
+        for index in range(gridmap.size):
+            node = gridmap.coords(index)
+            self.assertEqual(field.distance_to(node), expected.get(index, -1), node)
+            path = field.path(node)
+            if path:
+                self.assertEqual(len(path) - 1, expected[index])
+                self.assertFalse(any(gridmap.is_wall(step) for step in path))
+
+    def test_repairs_after_edits(self):
+        for seed in range(5):
+            gridmap, open_cells = reference.random_map(seed, 15, 15)
+            rng = random.Random(seed)
+            target = rng.choice(open_cells)
+            field = ff.FlowField(gridmap, target)
+            self.assert_matches(field, gridmap, target)
+            for step in range(40):
+                index = rng.randrange(gridmap.size)
+                if gridmap.coords(index) == target:
+                    continue
+                gridmap.set_status(index, 'empty' if gridmap.cells[index] == gm.WALL else 'wall')
+                if step % 2:
+                    field.cells_changed([gridmap.coords(index)])
+                else:
+                    field.update()
+                self.assert_matches(field, gridmap, target)
+
+    def test_refuses_other_maps(self):
+        gridmap = gm.GridMap(10, 10)
+        fields = ff.FlowFields(gridmap)
+        fields.field((9, 9))
+        gridmap.set_connectivity(8)
+        with self.assertRaises(ValueError):
+            fields.field((9, 9))
+        with self.assertRaises(ValueError):
+            ff.FlowField(gridmap, (0, 0))
+        gridmap.set_connectivity(4)
+        gridmap.set_cost(5, 4)
+        with self.assertRaises(ValueError):
+            fields.path((0, 0), (9, 9))
+        gridmap.clear_costs()
+        self.assertEqual(len(fields.path((0, 0), (9, 9))), 19)
+
+if __name__ == '__main__':
+    unittest.main()
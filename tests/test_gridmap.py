@@ -0,0 +1,77 @@
+"""
+    Tests for the neighbour masks of gridmap.py, checked against a fresh
+    build and the moves of reference.py.
+
+    Run from the repository root with
+        python -m unittest discover tests
+"""
+
+import random
+import unittest
+import gridmap as gm
+import reference
+
+def fresh_links(gridmap):
+    """
+        Returns the neighbour masks of a new map with the same cells and moves
+    """
+    copy = gm.GridMap(gridmap.width, gridmap.height)
+    copy.cells[:] = gridmap.cells
+    copy.set_connectivity(*gridmap.movement())
+    copy.build_links()
+    return copy.links
+
+class LinksTest(unittest.TestCase):
+    """
+        The patched masks stay the same as masks built from scratch
+    """
+    def assert_links(self, gridmap):
+        self.assertEqual(gridmap.adjacency(), fresh_links(gridmap))
+        for index in range(gridmap.size):
+            if gridmap.cells[index] != gm.WALL:
+                expected = sorted(cell for cell, _ in reference.moves(gridmap, index))
+                self.assertEqual(sorted(gridmap.neighbours(index)), expected, index)
+
+    def test_set_status(self):
+        for movement in ((4,), (8, 'exact'), (8, 'integer', True)):
+            rng = random.Random(len(movement))
+            gridmap, _ = reference.random_map(len(movement), 15, 12)
+            gridmap.set_connectivity(*movement)
+            gridmap.adjacency()
+            for _ in range(60):
+                index = rng.randrange(gridmap.size)
+                wall = gridmap.cells[index] == gm.WALL
+                gridmap.set_status(index, 'empty' if wall else 'wall')
+                self.assertEqual(gridmap.links, fresh_links(gridmap), movement)
+            self.assert_links(gridmap)
+
+    def test_set_connectivity(self):
+        gridmap, _ = reference.random_map(5)
+        self.assert_links(gridmap)
+        for movement in ((8, 'exact'), (8, 'exact', True), (4,), (8, 'integer')):
+            gridmap.set_connectivity(*movement)
+            self.assert_links(gridmap)
+
+    def test_direct_writes(self):
+        gridmap, _ = reference.random_map(6)
+        version = gridmap.version
+        links = gridmap.adjacency()
+        rng = random.Random(6)
+        for _ in range(30):
+            gridmap.cells[rng.randrange(gridmap.size)] = gm.WALL
+        gridmap.invalidate()
+        self.assertGreater(gridmap.version, version)
+        self.assertIsNot(gridmap.adjacency(), links)
+        self.assert_links(gridmap)
+
+    def test_edges_do_not_wrap(self):
+        gridmap = gm.GridMap(5, 4)
+        gridmap.set_connectivity(8, 'exact', True)
+        for index in range(gridmap.size):
+            xpos, ypos = gridmap.coords(index)
+            for neighbour in gridmap.neighbours(index):
+                column, row = gridmap.coords(neighbour)
+                self.assertLessEqual(max(abs(column - xpos), abs(row - ypos)), 1)
+
+if __name__ == '__main__':
+    unittest.main()
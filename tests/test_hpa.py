@@ -0,0 +1,65 @@
+"""
+    Tests for the hierarchical planner in hpa.py.
+
+    Run from the repository root with
+        python -m unittest discover tests
+"""
+
+import random
+import unittest
+import gridmap as gm
+import hpa
+import search
+
+class SingleColumnTest(unittest.TestCase):
+    """
+        A map one cluster wide, where the cluster below a cluster is also the
+        next cluster number
+    """
+    def setUp(self):
+        self.map = gm.GridMap(4, 8)
+        self.hierarchy = hpa.Hierarchy(self.map, 4)
+
+    def test_entrances_are_adjacent(self):
+        for pairs in self.hierarchy.entrances.values():
+            for first, second in pairs:
+                self.assertIn(second, self.map.neighbours(first))
+
+    def test_paths_match_bfs(self):
+        rng = random.Random(0)
+        for index in range(self.map.size):
+            if rng.random() < 0.2:
+                self.map.set_status(index, 'wall')
+        self.hierarchy.build()
+        for source in range(self.map.size):
+            for target in range(self.map.size):
+                if self.map.cells[source] == gm.WALL or self.map.cells[target] == gm.WALL:
+                    continue
+                source_node, target_node = self.map.coords(source), self.map.coords(target)
+                expected = search.bfs(self.map, source_node, target_node)
+                result = self.hierarchy.find(source_node, target_node)
+                self.assertEqual(result.found(), expected.found())
+                if result.found():
+                    self.assertEqual(result.path[0], source_node)
+                    self.assertEqual(result.path[-1], target_node)
+                    self.assertGreaterEqual(result.distance, expected.distance)
+
+class UniformTest(unittest.TestCase):
+    """
+        HPA* counts every move as 1 and refuses other maps
+    """
+    def test_refuses_weighted_and_diagonal(self):
+        gridmap = gm.GridMap(16, 16)
+        gridmap.set_cost(3, 5)
+        with self.assertRaises(ValueError):
+            hpa.Hierarchy(gridmap, 4)
+        gridmap.clear_costs()
+        hierarchy = hpa.Hierarchy(gridmap, 4)
+        gridmap.set_connectivity(8)
+        with self.assertRaises(ValueError):
+            hierarchy.find((0, 0), (15, 15))
+        gridmap.set_connectivity(4)
+        self.assertEqual(hierarchy.find((0, 0), (15, 15)).distance, 30)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+"""
+    Tests for the ALT heuristic in landmarks.py.
+
+    Run from the repository root with
+        python -m unittest discover tests
+"""
+
+import random
+import unittest
+import gridmap as gm
+import landmarks as lm
+import search
+
+class ConnectivityTest(unittest.TestCase):
+    """
+        Landmark tables computed on a 4-connected map must not be used once
+        the map becomes 8-connected, their distances would overestimate
+    """
+    def setUp(self):
+        rng = random.Random(0)
+        self.map = gm.GridMap(30, 30)
+        for index in range(self.map.size):
+            if rng.random() < 0.25:
+                self.map.set_status(index, 'wall')
+        self.open_cells = [self.map.coords(index) for index in range(self.map.size) \
+            if self.map.cells[index] != gm.WALL]
+        self.rng = rng
+
+    def check_optimal(self, alt, queries=150):
+        for _ in range(queries):
+            source, target = self.rng.choice(self.open_cells), self.rng.choice(self.open_cells)
+            expected = search.find(self.map, source, target, 'dijkstra')
+            result = search.find(self.map, source, target, 'astar', heuristic=alt)
+            self.assertEqual(result.cost, expected.cost, (source, target))
+
+    def test_toggle_connectivity(self):
+        alt = lm.Landmarks(self.map, 8)
+        self.check_optimal(alt)
+        for diagonal in ('integer', 'exact'):
+            self.map.set_connectivity(8, diagonal)
+            self.check_optimal(alt)
+        self.map.set_connectivity(8, 'integer', corner_cutting=True)
+        self.check_optimal(alt)
+        self.map.set_connectivity(4)
+        self.check_optimal(alt)
+
+    def test_rebuilt_on_toggle_only(self):
+        alt = lm.Landmarks(self.map, 4)
+        self.assertFalse(alt.update())
+        self.map.set_connectivity(8)
+        self.assertTrue(alt.update())
+        self.assertFalse(alt.update())
+        self.map.set_cost(self.map.index(self.open_cells[0]), 5)
+        self.assertFalse(alt.update())
+
+if __name__ == '__main__':
+    unittest.main()
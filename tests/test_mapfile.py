@@ -0,0 +1,74 @@
+"""
+    Tests for the binary map files of mapfile.py.
+
+    Run from the repository root with
+        python -m unittest discover tests
+"""
+
+import os
+import tempfile
+import unittest
+import gridmap as gm
+import mapfile
+import search
+import reference
+
+class RoundTripTest(unittest.TestCase):
+    """
+        A saved map loads back with the same walls and endpoints and the
+        searches run over the mapped cells
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'test.gmap')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_walls_and_endpoints(self):
+        gridmap, open_cells = reference.random_map(0, 23, 17)
+        source, target = open_cells[0], open_cells[-1]
+        mapfile.save(self.path, gridmap, source, target)
+        loaded, loaded_source, loaded_target = mapfile.load(self.path)
+        self.assertEqual((loaded.width, loaded.height), (23, 17))
+        self.assertEqual(loaded.walls(), gridmap.walls())
+        self.assertEqual((loaded_source, loaded_target), (source, target))
+
+    def test_without_endpoints(self):
+        gridmap, _ = reference.random_map(1)
+        mapfile.save(self.path, gridmap)
+        _, source, target = mapfile.load(self.path)
+        self.assertIsNone(source)
+        self.assertIsNone(target)
+
+    def test_search_on_loaded_map(self):
+        gridmap, open_cells = reference.random_map(2)
+        mapfile.save(self.path, gridmap)
+        loaded, _, _ = mapfile.load(self.path)
+        for source, target in reference.queries(open_cells, 20, 2):
+            result = search.astar(loaded, source, target)
+            self.assertEqual(result.cost, reference.cost(gridmap, source, target))
+
+    def test_writable_copy(self):
+        gridmap, open_cells = reference.random_map(3)
+        source, target = open_cells[0], open_cells[-1]
+        mapfile.save(self.path, gridmap, source, target)
+        loaded, _, _ = mapfile.load(self.path, writable=True)
+        self.assertEqual(loaded.cells[loaded.index(source)], gm.START)
+        loaded.set_status(loaded.index(open_cells[1]), 'wall')
+        # the file keeps the saved walls
+        again, _, _ = mapfile.load(self.path)
+        self.assertEqual(again.walls(), gridmap.walls())
+
+    def test_bad_files(self):
+        with open(self.path, 'wb') as file:
+            file.write(b'GMAP')
+        with self.assertRaises(ValueError):
+            mapfile.load(self.path)
+        with open(self.path, 'wb') as file:
+            file.write(b'XXXX' + bytes(mapfile.HEADER.size))
+        with self.assertRaises(ValueError):
+            mapfile.load(self.path)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+"""
+    Tests for the search result cache of pathcache.py.
+
+    Run from the repository root with
+        python -m unittest discover tests
+"""
+
+import unittest
+import gridmap as gm
+import pathcache
+import reference
+
+class InvalidationTest(unittest.TestCase):
+    """
+        Results are reused while the map stays the same and dropped by every
+        kind of edit
+    """
+    def setUp(self):
+        self.map, open_cells = reference.random_map(0)
+        self.source, self.target = next(query for query in reference.queries(open_cells, 50) \
+            if reference.cost(self.map, *query) > 2)
+        self.cache = pathcache.PathCache(self.map)
+
+    def find(self):
+        return self.cache.find(self.source, self.target, 'dijkstra')
+
+    def assert_recomputed(self):
+        version = self.cache.stats()['version']
+        misses = self.cache.misses
+        result = self.find()
+        self.assertEqual(self.cache.stats()['version'], version + 1)
+        self.assertEqual(self.cache.misses, misses + 1)
+        self.assertAlmostEqual(result.cost, reference.cost(self.map, self.source, self.target))
+
+    def test_hits_and_misses(self):
+        first = self.find()
+        second = self.find()
+        self.assertIs(first, second)
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['size']), (1, 1, 1))
+        self.assertEqual(stats['hit_rate'], 0.5)
+        self.cache.find(self.source, self.target, 'astar')
+        self.assertEqual(self.cache.misses, 2)
+
+    def test_set_status(self):
+        self.find()
+        path = self.find().path
+        self.map.set_status(self.map.index(path[len(path) // 2]), 'wall')
+        self.assert_recomputed()
+
+    def test_same_status_keeps_results(self):
+        self.find()
+        self.map.set_status(self.map.index(self.source), 'start')
+        self.find()
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_set_cost(self):
+        self.find()
+        self.map.set_cost(self.map.index(self.target), 5)
+        self.assert_recomputed()
+
+    def test_set_connectivity(self):
+        self.find()
+        self.map.set_connectivity(8, 'exact')
+        self.assert_recomputed()
+
+    def test_direct_writes(self):
+        self.find()
+        self.map.cells[self.map.index(self.find().path[1])] = gm.WALL
+        self.map.invalidate()
+        self.assert_recomputed()
+
+    def test_capacity(self):
+        cache = pathcache.PathCache(self.map, capacity=2)
+        for target in ((0, 0), (1, 0), (2, 0)):
+            cache.find(self.source, target, 'bfs')
+        self.assertEqual(len(cache), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,278 @@
+"""
+    Tests for the searches in search.py, checked against the plain Dijkstra
+    in reference.py.
+
+    Run from the repository root with
+        python -m unittest discover tests
+"""
+
+import unittest
+import search
+import reference
+
+class FrontierTest(unittest.TestCase):
+    """
+        Every priority queue of the open set gives the cheapest path
+    """
+    def check_frontier(self, frontier, terrain):
+        for seed in range(15):
+            gridmap, open_cells = reference.random_map(seed, terrain=terrain)
+            for source, target in reference.queries(open_cells, 10, seed):
+                expected = reference.cost(gridmap, source, target)
+                for algorithm in (search.dijkstra, search.astar):
+                    result = algorithm(gridmap, source, target, frontier=frontier)
+                    self.assertEqual(result.cost, expected, (algorithm.__name__, seed))
+                    if result.found():
+                        self.assertEqual(search.path_cost(gridmap, result.path), expected)
+                        self.assertEqual(result.path[0], source)
+                        self.assertEqual(result.path[-1], target)
+
+    def test_lazy(self):
+        self.check_frontier('lazy', 0.0)
+        self.check_frontier('lazy', 0.3)
+
+    def test_heap(self):
+        self.check_frontier('heap', 0.0)
+        self.check_frontier('heap', 0.3)
+
+    def test_unknown(self):
+        gridmap, _ = reference.random_map(0)
+        with self.assertRaises(ValueError):
+            search.dijkstra(gridmap, (0, 0), (19, 19), frontier='fibonacci')
+
+class BucketFrontierTest(unittest.TestCase):
+    """
+        The bucket queue works with every integer move cost and refuses the
+        exact diagonal costs
+    """
+    def check_bucket(self, terrain, connectivity=4):
+        for seed in range(15):
+            gridmap, open_cells = reference.random_map(seed, terrain=terrain)
+            gridmap.set_connectivity(connectivity)
+            for source, target in reference.queries(open_cells, 10, seed):
+                expected = reference.cost(gridmap, source, target)
+                for algorithm in (search.dijkstra, search.astar):
+                    result = algorithm(gridmap, source, target, frontier='bucket')
+                    self.assertEqual(result.cost, expected, (algorithm.__name__, seed))
+
+    def test_unit_costs(self):
+        self.check_bucket(0.0)
+
+    def test_terrain_costs(self):
+        self.check_bucket(0.3)
+
+    def test_integer_diagonals(self):
+        self.check_bucket(0.0, 8)
+        self.check_bucket(0.3, 8)
+
+    def test_exact_diagonals_refused(self):
+        gridmap, _ = reference.random_map(0)
+        gridmap.set_connectivity(8, 'exact')
+        for algorithm in (search.dijkstra, search.astar):
+            with self.assertRaises(ValueError):
+                algorithm(gridmap, (0, 0), (19, 19), frontier='bucket')
+
+class BidirectionalTest(unittest.TestCase):
+    """
+        The bidirectional searches find the shortest path on uniform maps and
+        the weighted ones refuse the others
+    """
+    def test_matches_reference(self):
+        searches = (search.bidirectional_dijkstra, search.bidirectional_astar, \
+            search.bidirectional_bfs)
+        for seed in range(20):
+            gridmap, open_cells = reference.random_map(seed, 25, 25)
+            for source, target in reference.queries(open_cells, 10, seed):
+                expected = reference.cost(gridmap, source, target)
+                for algorithm in searches:
+                    result = algorithm(gridmap, source, target)
+                    self.assertEqual(result.cost, expected, (algorithm.__name__, seed))
+                    if result.found():
+                        self.assertEqual(search.path_cost(gridmap, result.path), expected)
+                        self.assertEqual(result.path[0], source)
+                        self.assertEqual(result.path[-1], target)
+
+    def test_same_node(self):
+        gridmap, open_cells = reference.random_map(0)
+        node = open_cells[0]
+        for algorithm in (search.bidirectional_dijkstra, search.bidirectional_bfs):
+            self.assertEqual(algorithm(gridmap, node, node).path, [node])
+
+    def test_refuses_other_maps(self):
+        gridmap, _ = reference.random_map(0, terrain=0.3)
+        for algorithm in (search.bidirectional_dijkstra, search.bidirectional_astar):
+            with self.assertRaises(ValueError):
+                algorithm(gridmap, (0, 0), (19, 19))
+        gridmap, _ = reference.random_map(0)
+        gridmap.set_connectivity(8)
+        for algorithm in (search.bidirectional_dijkstra, search.bidirectional_astar):
+            with self.assertRaises(ValueError):
+                algorithm(gridmap, (0, 0), (19, 19))
+
+class TerrainCostTest(unittest.TestCase):
+    """
+        A move costs the cost of the cell moved into
+    """
+    def test_optimal_searches(self):
+        for seed in range(15):
+            gridmap, open_cells = reference.random_map(seed, terrain=0.4)
+            for source, target in reference.queries(open_cells, 10, seed):
+                expected = reference.cost(gridmap, source, target)
+                for name in ('dijkstra', 'astar'):
+                    result = search.find(gridmap, source, target, name)
+                    self.assertEqual(result.cost, expected, (name, seed))
+                    if result.found():
+                        self.assertEqual(search.path_cost(gridmap, result.path), expected)
+
+    def test_greedy_cost(self):
+        for seed in range(10):
+            gridmap, open_cells = reference.random_map(seed, terrain=0.4)
+            for source, target in reference.queries(open_cells, 10, seed):
+                expected = reference.cost(gridmap, source, target)
+                result = search.greedy(gridmap, source, target)
+                self.assertEqual(result.found(), expected >= 0)
+                if result.found():
+                    self.assertEqual(result.cost, search.path_cost(gridmap, result.path))
+                    self.assertGreaterEqual(result.cost, expected)
+
+    def test_costs_change_the_path(self):
+        gridmap, _ = reference.random_map(0, walls=0.0)
+        self.assertEqual(search.dijkstra(gridmap, (0, 0), (19, 0)).cost, 19)
+        for column in range(1, 19):
+            gridmap.set_cost(gridmap.index((column, 0)), 9)
+        result = search.dijkstra(gridmap, (0, 0), (19, 0))
+        self.assertEqual(result.cost, 21)
+        self.assertNotIn((5, 0), result.path)
+        gridmap.clear_costs()
+        self.assertFalse(gridmap.weighted())
+        self.assertEqual(search.dijkstra(gridmap, (0, 0), (19, 0)).cost, 19)
+
+    def test_cost_range(self):
+        gridmap, _ = reference.random_map(0)
+        for cost in (0, 256):
+            with self.assertRaises(ValueError):
+                gridmap.set_cost(3, cost)
+
+class DiagonalMoveTest(unittest.TestCase):
+    """
+        Diagonal moves follow the diagonal cost and the corner cutting rule of
+        the map
+    """
+    def check(self, terrain, diagonal, corner_cutting):
+        for seed in range(10):
+            gridmap, open_cells = reference.random_map(seed, terrain=terrain)
+            gridmap.set_connectivity(8, diagonal, corner_cutting)
+            for source, target in reference.queries(open_cells, 10, seed):
+                expected = reference.cost(gridmap, source, target)
+                for name in ('dijkstra', 'astar'):
+                    result = search.find(gridmap, source, target, name)
+                    self.assertAlmostEqual(result.cost, expected, msg=(name, seed))
+                    if result.found():
+                        self.assertAlmostEqual(search.path_cost(gridmap, result.path), expected)
+
+    def test_integer(self):
+        self.check(0.0, 'integer', False)
+
+    def test_exact(self):
+        self.check(0.0, 'exact', False)
+
+    def test_corner_cutting(self):
+        self.check(0.0, 'exact', True)
+        self.check(0.0, 'integer', True)
+
+    def test_weighted(self):
+        self.check(0.4, 'integer', False)
+        self.check(0.4, 'exact', True)
+
+    def test_open_diagonal(self):
+        gridmap, _ = reference.random_map(0, walls=0.0)
+        gridmap.set_connectivity(8, 'exact')
+        self.assertAlmostEqual(search.dijkstra(gridmap, (0, 0), (19, 19)).cost, 19 * 2 ** 0.5)
+        gridmap.set_connectivity(8, 'integer')
+        self.assertAlmostEqual(search.dijkstra(gridmap, (0, 0), (19, 19)).cost, 19 * 1.4)
+
+    def test_corners(self):
+        gridmap, _ = reference.random_map(0, walls=0.0)
+        gridmap.set_status(gridmap.index((1, 0)), 'wall')
+        gridmap.set_connectivity(8, 'exact')
+        self.assertAlmostEqual(search.dijkstra(gridmap, (0, 0), (1, 1)).cost, 2)
+        gridmap.set_connectivity(8, 'exact', True)
+        self.assertAlmostEqual(search.dijkstra(gridmap, (0, 0), (1, 1)).cost, 2 ** 0.5)
+
+class DiagonalHeuristicTest(unittest.TestCase):
+    """
+        The Manhattan distance overestimates on an 8-connected map
+    """
+    def test_manhattan_refused_with_every_frontier(self):
+        gridmap, _ = reference.random_map(0)
+        gridmap.set_connectivity(8, 'exact')
+        for frontier in ('lazy', 'heap'):
+            with self.assertRaises(ValueError):
+                search.astar(gridmap, (0, 0), (19, 19), frontier=frontier, heuristic='manhattan')
+
+    def test_diagonal_heuristics_optimal(self):
+        for seed in range(20):
+            gridmap, open_cells = reference.random_map(seed)
+            gridmap.set_connectivity(8, 'exact')
+            for source, target in reference.queries(open_cells, 10, seed):
+                expected = reference.cost(gridmap, source, target)
+                for heuristic in search.DIAGONAL_HEURISTICS:
+                    result = search.astar(gridmap, source, target, heuristic=heuristic)
+                    self.assertAlmostEqual(result.cost, expected, msg=(seed, source, target))
+
+def patchy(node, target):
+    """
+        The Manhattan distance on every third diagonal and 0 elsewhere,
+        admissible but not consistent
+    """
+    if (node[0] + node[1]) % 3:
+        return 0
+    return abs(node[0] - target[0]) + abs(node[1] - target[1])
+
+class InconsistentHeuristicTest(unittest.TestCase):
+    """
+        astar reopens expanded nodes when an admissible heuristic that is not
+        consistent lets it reach them first by a longer route
+    """
+    def test_optimal_and_counted(self):
+        reopened = 0
+        for seed in range(20):
+            gridmap, open_cells = reference.random_map(seed, 30, 30, terrain=0.3)
+            for source, target in reference.queries(open_cells, 10, seed):
+                result = search.astar(gridmap, source, target, heuristic=patchy)
+                self.assertEqual(result.cost, reference.cost(gridmap, source, target), \
+                    (seed, source, target))
+                reopened += result.stats.reopened
+        self.assertGreater(reopened, 0)
+
+    def test_consistent_never_reopens(self):
+        gridmap, open_cells = reference.random_map(1, 30, 30, terrain=0.3)
+        for source, target in reference.queries(open_cells, 20):
+            self.assertEqual(search.astar(gridmap, source, target).stats.reopened, 0)
+
+class JumpPointTest(unittest.TestCase):
+    """
+        Jump point search finds the shortest path on 4-connected maps and
+        refuses the maps where it would not
+    """
+    def test_matches_reference(self):
+        for seed in range(20):
+            gridmap, open_cells = reference.random_map(seed, 25, 25)
+            for source, target in reference.queries(open_cells, 10, seed):
+                result = search.jump_point_search(gridmap, source, target)
+                self.assertEqual(result.cost, reference.cost(gridmap, source, target))
+                if result.found():
+                    self.assertEqual(search.path_cost(gridmap, result.path), result.cost)
+
+    def test_refuses_other_maps(self):
+        gridmap, _ = reference.random_map(0)
+        gridmap.set_connectivity(8)
+        with self.assertRaises(ValueError):
+            search.jump_point_search(gridmap, (0, 0), (19, 19))
+        gridmap.set_connectivity(4)
+        gridmap.set_cost(5, 3)
+        with self.assertRaises(ValueError):
+            search.jump_point_search(gridmap, (0, 0), (19, 19))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+"""
+    Tests for the shared memory maps in sharedgrid.py.
+
+    Run from the repository root with
+        python -m unittest discover tests
+"""
+
+import unittest
+import search
+import sharedgrid
+import reference
+
+class SharedGridTest(unittest.TestCase):
+    """
+        A map attached from the shared block searches like the original
+    """
+    def setUp(self):
+        self.map, self.open_cells = reference.random_map(3, 25, 25, terrain=0.2)
+        self.map.set_connectivity(8, 'exact')
+        self.shared = sharedgrid.SharedGrid(self.map, {'costs': self.map.costs})
+        self.attached = sharedgrid.SharedGrid.attach(self.shared.handle())
+
+    def tearDown(self):
+        self.attached.close()
+        self.shared.close()
+        self.shared.unlink()
+
+    def test_links_and_moves_published(self):
+        gridmap = self.attached.gridmap()
+        self.assertEqual(gridmap.movement(), self.map.movement())
+        self.assertIsInstance(gridmap.links, memoryview)
+        self.assertEqual(bytes(gridmap.links), bytes(self.map.adjacency()))
+        self.assertEqual(gridmap.moves, self.map.moves)
+
+    def test_searches_match_reference(self):
+        gridmap = self.attached.gridmap()
+        for source, target in reference.queries(self.open_cells, 20):
+            result = search.find(gridmap, source, target, 'dijkstra')
+            self.assertAlmostEqual(result.cost, reference.cost(self.map, source, target))
+
+if __name__ == '__main__':
+    unittest.main()
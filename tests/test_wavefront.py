@@ -0,0 +1,75 @@
+"""
+    Tests for the distance fields of wavefront.py, checked against the plain
+    Dijkstra in reference.py.
+
+    Run from the repository root with
+        python -m unittest discover tests
+"""
+
+import unittest
+import gridmap as gm
+import search
+import wavefront
+import reference
+
+class DistanceFieldTest(unittest.TestCase):
+    """
+        Both backends give the distance from the closest source and a parent
+        one move closer to it
+    """
+    def check(self, backend):
+        for seed in range(10):
+            gridmap, open_cells = reference.random_map(seed, 25, 25)
+            sources = open_cells[seed::97]
+            expected = {}
+            for source in sources:
+                for index, cost in reference.costs_from(gridmap, source).items():
+                    expected[index] = min(cost, expected.get(index, cost))
+            field = wavefront.distance_field(gridmap, sources, backend=backend)
+            for index in range(gridmap.size):
+                node = gridmap.coords(index)
+                self.assertEqual(field.distance_to(node), expected.get(index, -1), node)
+                if index in expected and node not in sources:
+                    parent = int(field.parent[index])
+                    self.assertIn(parent, gridmap.neighbours(index))
+                    self.assertEqual(int(field.distance[parent]), expected[index] - 1)
+                elif index not in expected:
+                    self.assertEqual(field.path_to(node), [])
+            self.assertEqual(field.reached, len(expected))
+
+    def test_python(self):
+        self.check('python')
+
+    @unittest.skipUnless(wavefront.NUMPY, 'numpy is not installed')
+    def test_numpy(self):
+        self.check('numpy')
+
+    def test_path(self):
+        gridmap, open_cells = reference.random_map(4)
+        source, target = open_cells[0], open_cells[-1]
+        path = wavefront.distance_field(gridmap, source).path_to(target)
+        expected = reference.cost(gridmap, source, target)
+        if expected >= 0:
+            self.assertEqual(path[0], source)
+            self.assertEqual(path[-1], target)
+            self.assertEqual(search.path_cost(gridmap, path), expected)
+
+    def test_dijkstra_frontier(self):
+        for seed in range(10):
+            gridmap, open_cells = reference.random_map(seed)
+            for source, target in reference.queries(open_cells, 10, seed):
+                result = search.dijkstra(gridmap, source, target, frontier='wavefront')
+                self.assertEqual(result.cost, reference.cost(gridmap, source, target))
+
+    def test_refuses_other_maps(self):
+        gridmap = gm.GridMap(10, 10)
+        gridmap.set_connectivity(8)
+        with self.assertRaises(ValueError):
+            wavefront.distance_field(gridmap, [(0, 0)])
+        gridmap.set_connectivity(4)
+        gridmap.set_cost(5, 3)
+        with self.assertRaises(ValueError):
+            search.dijkstra(gridmap, (0, 0), (9, 9), frontier='wavefront')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,203 @@
+"""
+    wavefront.py computes breadth-first distance fields with NumPy.
+
+    A breadth-first search from a set of sources reaches the cells in layers:
+    layer k holds every cell at distance k from the closest source. Instead of
+    taking the cells out of a queue one at a time, the wavefront expands a
+    whole layer with a few array operations: the indices of the layer are
+    shifted left, right, up and down, the shifted indices that are open and
+    not reached yet become the next layer, and their distance and parent are
+    written in one assignment each. The Python loop only runs once per layer.
+
+    The result is a DistanceField holding the distance and parent of every
+    cell, indexed like GridMap.cells (y * width + x). Cells that are not
+    reached have distance gridmap.INF and parent gridmap.NO_PARENT.
+
+    NumPy is optional. Without it (or with backend='python') the same field
+    is computed by a plain breadth-first search with the same results.
+
+    The layers only follow the left, right, top and bottom neighbours, the
+    map must be 4-connected.
+
+    Example:
+        field = distance_field(gridmap, [(0, 0)])
+        field.distance_to((39, 39)), field.path_to((39, 39))
+"""
+
+from array import array
+from collections import deque
+import gridmap as gm
+
+try:
+    import numpy as np
+except ImportError:     # the python backend is used instead
+    np = None
+
+NUMPY = np is not None
+BACKENDS = ('numpy', 'python')
+
+class DistanceField:
+    """
+        Init:
+            map: the GridMap the field was computed on
+            distance: the distance of every cell from the closest source, a
+                numpy int32 array or an array('i') for the python backend
+            parent: the index of the previous cell on a shortest path from a
+                source, NO_PARENT for the sources and unreached cells
+            layers: the number of layers expanded
+            reached: the number of cells reached, the sources included
+            expanded: the number of cells expanded
+            generated: the number of open neighbours of the expanded cells
+            peak: the largest layer
+
+        Methods:
+            distance_to(node): returns the distance of an (x, y) node, -1 if
+                it was not reached
+            path_to(node): returns the shortest path from the closest source
+                to an (x, y) node, empty if it was not reached
+    """
+    def __init__(self, gridmap, distance, parent, layers=0, reached=0, expanded=0, \
+        generated=0, peak=0):
+        self.map = gridmap
+        self.distance = distance
+        self.parent = parent
+        self.layers = layers
+        self.reached = reached
+        self.expanded = expanded
+        self.generated = generated
+        self.peak = peak
+
+    def distance_to(self, node):
+        """
+            Returns the distance of the node from the closest source, -1 if
+            no source reaches it
+        """
+        distance = int(self.distance[self.map.index(node)])
+        return -1 if distance == gm.INF else distance
+
+    def path_to(self, node):
+        """
+            Returns the path as (x, y) nodes from the closest source to the
+            node, empty if no source reaches it
+        """
+        index = self.map.index(node)
+        if self.distance[index] == gm.INF:
+            return []
+        path = [index]
+        while self.parent[path[-1]] != gm.NO_PARENT:
+            path.append(int(self.parent[path[-1]]))
+        path.reverse()
+        return [self.map.coords(cell) for cell in path]
+
+def distance_field(gridmap, sources, target=None, observer=None, backend=None):
+    """
+        Breadth-first distance field from the sources, a list of (x, y) nodes
+        or a single node. Sources that are walls are ignored.
+
+        If a target node is given the search stops once the target's layer is
+        reached. The observer is notified like the searches in search.py:
+        'visit' for the cells of each layer, 'open' for the cells of the next
+        layer and one 'step' per layer.
+
+        backend is 'numpy' or 'python', by default numpy when it is installed.
+
+        Returns a DistanceField. Raises ValueError on an 8-connected map
+    """
+    if gridmap.connectivity != 4:
+        raise ValueError('Distance fields need a 4-connected map')
+    if backend is None:
+        backend = 'numpy' if NUMPY else 'python'
+    if backend not in BACKENDS:
+        raise ValueError('Unknown backend: {}'.format(backend))
+    if backend == 'numpy' and not NUMPY:
+        raise ValueError('The numpy backend needs numpy to be installed')
+    if sources and isinstance(sources[0], int):    # a single node
+        sources = [sources]
+    sources = sorted({gridmap.index(node) for node in sources \
+        if gridmap.cells[gridmap.index(node)] != gm.WALL})
+    target = gridmap.index(target) if target is not None else None
+    if backend == 'numpy':
+        return _numpy_field(gridmap, sources, target, observer)
+    return _python_field(gridmap, sources, target, observer)
+
+def _notify_layer(observer, gridmap, layer, following):
+    """
+        Tells the observer that a layer was expanded into the following one
+    """
+    for index in layer:
+        observer('visit', gridmap.coords(int(index)))
+    for index in following:
+        observer('open', gridmap.coords(int(index)))
+    observer('step', None)
+
+def _numpy_field(gridmap, sources, target, observer):
+    """
+        Distance field with one set of array operations per layer
+    """
+    width, size = gridmap.width, gridmap.size
+    passable = np.frombuffer(gridmap.walls(), dtype=np.uint8) == 0
+    distance = np.full(size, gm.INF, dtype=np.int32)
+    parent = np.full(size, gm.NO_PARENT, dtype=np.int32)
+    layer = np.array(sources, dtype=np.int64)
+    distance[layer] = 0
+    layers = expanded = generated = peak = 0
+    reached = len(sources)
+
+    while layer.size and (target is None or distance[target] == gm.INF):
+        expanded += layer.size
+        peak = max(peak, layer.size)
+        column = layer % width
+        moves = (
+            (layer[column > 0], -1),
+            (layer[column < width - 1], 1),
+            (layer[layer >= width], -width),
+            (layer[layer < size - width], width),
+        )
+        cells = np.concatenate([chosen + step for chosen, step in moves])
+        origins = np.concatenate([chosen for chosen, _ in moves])
+        keep = passable[cells]
+        generated += int(np.count_nonzero(keep))
+        keep &= distance[cells] == gm.INF
+        following, first = np.unique(cells[keep], return_index=True)
+        layers += 1
+        reached += following.size
+        distance[following] = layers
+        parent[following] = origins[keep][first]
+        if observer is not None:
+            _notify_layer(observer, gridmap, layer, following)
+        layer = following
+    return DistanceField(gridmap, distance, parent, layers, int(reached), expanded, generated, \
+        peak)
+
+def _python_field(gridmap, sources, target, observer):
+    """
+        Distance field with a plain breadth-first search, layer by layer
+    """
+    distance = array('i', [gm.INF]) * gridmap.size
+    parent = array('i', [gm.NO_PARENT]) * gridmap.size
+    links, moves = gridmap.adjacency(), gridmap.moves
+    layer = deque(sources)
+    for index in layer:
+        distance[index] = 0
+    layers = expanded = generated = peak = 0
+    reached = len(sources)
+
+    while layer and (target is None or distance[target] == gm.INF):
+        expanded += len(layer)
+        peak = max(peak, len(layer))
+        layers += 1
+        following = deque()
+        for current in layer:
+            offsets = moves[links[current]]
+            generated += len(offsets)
+            for offset in offsets:
+                neighbour = current + offset
+                if distance[neighbour] == gm.INF:
+                    distance[neighbour] = layers
+                    parent[neighbour] = current
+                    following.append(neighbour)
+        reached += len(following)
+        if observer is not None:
+            _notify_layer(observer, gridmap, layer, following)
+        layer = following
+    return DistanceField(gridmap, distance, parent, layers, reached, expanded, generated, peak)